@@ -0,0 +1,79 @@
+"""
+Import-time budget for the numerical core.
+Each module is imported in a fresh interpreter (bytecode precompiled first, as after an install),
+once to warm the file cache and then several times; the median wall time of every titan.CORE
+module is compared with the budget, and the run fails if any CORE or SERVICES module pulls in
+matplotlib. numpy's own import time is reported alongside as the floor.
+Usage:
+    PYTHONPATH=src python benchmarks/import_budget.py                  # default 100 ms budget
+    PYTHONPATH=src python benchmarks/import_budget.py --budget-ms 150 --runs 11
+"""
+from __future__ import annotations
+import argparse
+import compileall
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+SRC = ROOT.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import titan  # noqa: E402  (package __init__ only; submodules are not loaded)
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{"s": dt, "plot": sorted(m for m in ("matplotlib", "matplotlib.pyplot") if m in sys.modules)}}))
+"""
+
+def time_import(module: str, runs: int) -> Dict[str, object]:
+    """Median / min import time of `module` over `runs` fresh interpreters."""
+    env = dict(os.environ, PYTHONPATH=str(SRC) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    times, plot = [], []
+    for _ in range(runs + 1):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)], env=env,
+                             capture_output=True, text=True, check=True).stdout
+        rec = json.loads(out.strip().splitlines()[-1])
+        times.append(rec["s"])
+        plot = rec["plot"]
+    times = times[1:]  # first run warms the file cache
+    return {"median_ms": float(np.median(times)) * 1e3, "min_ms": float(np.min(times)) * 1e3, "plotting": plot}
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--budget-ms", type=float, default=100.0, help="allowed median import time per core module")
+    ap.add_argument("--runs", type=int, default=7, help="fresh interpreters per module")
+    ap.add_argument("--modules", default="", help="comma-separated subset of titan.CORE / titan.SERVICES")
+    args = ap.parse_args(argv)
+
+    compileall.compile_dir(str(SRC), quiet=1)
+    modules = [m for m in args.modules.split(",") if m] or list(titan.CORE) + list(titan.SERVICES)
+    floor = time_import("numpy", args.runs)
+    print(f"{'numpy (floor)':28s} {floor['median_ms']:8.1f} ms")
+
+    failures = []
+    for name in modules:
+        r = time_import(f"titan.{name}", args.runs)
+        flag = ""
+        if r["plotting"]:
+            flag = "  imports " + ", ".join(r["plotting"])
+            failures.append(f"titan.{name}: imports {', '.join(r['plotting'])}")
+        if name not in titan.SERVICES and r["median_ms"] > args.budget_ms:
+            flag += "  OVER BUDGET"
+            failures.append(f"titan.{name}: {r['median_ms']:.1f} ms > {args.budget_ms:.0f} ms")
+        print(f"titan.{name:22s} {r['median_ms']:8.1f} ms  (+{r['median_ms'] - floor['median_ms']:6.1f} over numpy){flag}")
+
+    for line in failures:
+        print("FAIL", line)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Benchmark harness for the solver and sweep hot paths.
+Each case is timed at several problem sizes; per-call latency, throughput and peak traced memory
+are appended to a JSON history file and compared against a stored baseline. The run exits
+non-zero when any case is slower than baseline × (1 + threshold). Runs offline (stdlib + numpy).
+Usage:
+    PYTHONPATH=src python benchmarks/run_benchmarks.py                   # run, record, compare
+    PYTHONPATH=src python benchmarks/run_benchmarks.py --save-baseline   # accept this run as baseline
+    PYTHONPATH=src python benchmarks/run_benchmarks.py --quick --only lambert
+    PYTHONPATH=src python benchmarks/run_benchmarks.py --quick --profile    # + instrumentation report per case
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+
+from titan import instrument                                        # noqa: E402
+from titan.constants import mu_sun, a_earth, a_saturn          # noqa: E402
+from titan.lambert import lambert_universal, lambert_universal_batch  # noqa: E402
+from titan.porkchop import DAY, YEAR, circ_pos_vel, sweep_porkchop     # noqa: E402
+from titan.titan_flyby import post_flyby_vinf_saturn           # noqa: E402
+
+HISTORY = ROOT / "history.json"
+BASELINE = ROOT / "baseline.json"
+
+class Case(NamedTuple):
+    name: str                          # "<hot path>/<size label>"
+    n: int                             # work items per call (Lambert solves, grid cells, ...)
+    setup: Callable[[], Callable[[], object]]  # builds inputs, returns the timed callable
+
+# ==============================
+# Cases
+# ==============================
+def _lambert_pairs(n: int, seed: int = 0):
+    # Earth -> Saturn circular-orbit geometry over a spread of epochs and TOFs
+    rng = np.random.default_rng(seed)
+    t = rng.uniform(0.0, 2.0 * YEAR, n)
+    tof = rng.uniform(3.0 * YEAR, 10.0 * YEAR, n)
+    r1, _ = circ_pos_vel(a_earth, t, mu_sun)
+    r2, _ = circ_pos_vel(a_saturn, t + tof, mu_sun)
+    return r1, r2, tof
+
+def _case_lambert_scalar(n: int) -> Case:
+    def setup():
+        r1, r2, tof = _lambert_pairs(n)
+        def run():
+            with np.errstate(all="ignore"):
+                for k in range(n):
+                    try:
+                        lambert_universal(r1[k], r2[k], tof[k], mu_sun)
+                    except RuntimeError:
+                        pass
+        return run
+    return Case(f"lambert_universal/{n}", n, setup)
+
+def _case_lambert_batch(n: int) -> Case:
+    def setup():
+        r1, r2, tof = _lambert_pairs(n)
+        return lambda: lambert_universal_batch(r1, r2, tof, mu_sun)
+    return Case(f"lambert_universal_batch/{n}", n, setup)
+
+def _case_sweep(n: int) -> Case:
+    def setup():
+        t_dep = np.linspace(0.0, 3.0 * YEAR, n)
+        tof = np.linspace(4.0 * YEAR, 9.0 * YEAR, n)
+        return lambda: sweep_porkchop(t_dep, tof, a_earth, a_saturn, mu_sun)
+    return Case(f"sweep_porkchop/{n}x{n}", n * n, setup)
+
+def _case_flyby_heatmap(n: int) -> Case:
+    def setup():
+        ps = np.linspace(0.0, np.pi, n)
+        hs = np.linspace(100e3, 4000e3, n)
+        return lambda: post_flyby_vinf_saturn(5_500.0, ps[None, :], hs[:, None], prograde=True)
+    return Case(f"flyby_heatmap/{n}x{n}", n * n, setup)
+
+def build_cases(quick: bool) -> List[Case]:
+    if quick:
+        return [_case_lambert_scalar(100), _case_lambert_batch(10_000),
+                _case_sweep(64), _case_flyby_heatmap(256)]
+    return ([_case_lambert_scalar(n) for n in (100, 1_000)]
+            + [_case_lambert_batch(n) for n in (1_000, 10_000, 100_000)]
+            + [_case_sweep(n) for n in (64, 256, 512)]
+            + [_case_flyby_heatmap(n) for n in (128, 512, 2048)])
+
+# ==============================
+# Measurement
+# ==============================
+def measure(case: Case, repeats: int, min_time: float, profile: bool = False) -> Dict[str, float]:
+    """
+    Time one case: a warm-up call, then `repeats` rounds (at least min_time seconds in total),
+    then one extra call under tracemalloc for the peak of Python/numpy allocations. With
+    profile=True one more call runs under instrument.recording() and its report is attached
+    (timings stay uninstrumented).
+    """
+    fn = case.setup()
+    fn()  # warm-up: imports, caches, page faults
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = None
+    if profile:
+        with instrument.recording() as rec:
+            fn()
+        report = rec.report()
+
+    median = float(np.median(times))
+    out = {
+        "n": case.n,
+        "rounds": len(times),
+        "median_s": median,
+        "min_s": float(np.min(times)),
+        "latency_us": median / case.n * 1e6,
+        "throughput_per_s": case.n / median,
+        "peak_mem_mb": peak / 2**20,
+    }
+    if report is not None:
+        out["instrumentation"] = report
+    return out
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "node": platform.node(),
+    }
+
+# ==============================
+# History / baseline
+# ==============================
+def _load(path: Path, default):
+    if path.exists():
+        with open(path) as fh:
+            return json.load(fh)
+    return default
+
+def _dump(path: Path, obj) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w") as fh:
+        json.dump(obj, fh, indent=2)
+    tmp.replace(path)
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Names (with ratios) of cases whose median time exceeds baseline × (1 + threshold)."""
+    regressions = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            continue
+        ratio = r["median_s"] / b["median_s"]
+        if ratio > 1.0 + threshold:
+            regressions.append(f"{name}: {ratio:.2f}x baseline ({b['median_s']*1e3:.2f} -> {r['median_s']*1e3:.2f} ms)")
+    return regressions
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--quick", action="store_true", help="one small size per hot path")
+    ap.add_argument("--only", default="", help="run only cases whose name contains this substring")
+    ap.add_argument("--repeats", type=int, default=5, help="minimum timed rounds per case")
+    ap.add_argument("--min-time", type=float, default=0.5, help="minimum timed seconds per case")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="allowed slowdown vs baseline before failing (0.25 = 25%%)")
+    ap.add_argument("--history", type=Path, default=HISTORY)
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    ap.add_argument("--no-record", action="store_true", help="do not append to the history file")
+    ap.add_argument("--profile", action="store_true",
+                    help="attach an instrumentation report (iterations, fallbacks, stage timers) to each case")
+    args = ap.parse_args(argv)
+
+    cases = [c for c in build_cases(args.quick) if args.only in c.name]
+    results = {}
+    for case in cases:
+        r = measure(case, args.repeats, args.min_time, args.profile)
+        results[case.name] = r
+        print(f"{case.name:36s} {r['median_s']*1e3:10.2f} ms  {r['latency_us']:10.3f} us/item  "
+              f"{r['throughput_per_s']:12.0f} items/s  {r['peak_mem_mb']:8.1f} MB")
+        if args.profile:
+            c = r["instrumentation"]["counters"]
+            print("    " + "  ".join(f"{k}={v}" for k, v in c.items() if v))
+
+    run = {**environment(), "results": results}
+    if not args.no_record:
+        history = _load(args.history, [])
+        history.append(run)
+        _dump(args.history, history)
+
+    if args.save_baseline:
+        baseline = _load(args.baseline, {})
+        baseline.update(results)  # keep cases this run did not cover
+        _dump(args.baseline, baseline)
+        print(f"Saved baseline -> {args.baseline}")
+        return 0
+
+    regressions = compare(results, _load(args.baseline, {}), args.threshold)
+    for line in regressions:
+        print("REGRESSION", line)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from pathlib import Path
-from constants import a_earth, a_saturn, mu_sun
-from transfers import hohmann_dv
-from plotting import plot_hohmann_orbits
+from titan.constants import a_earth, a_saturn, mu_sun
+from titan.transfers import hohmann_dv
+from titan.plotting import plot_hohmann_orbits
 
 def main() -> None:
     r1, r2 = a_earth, a_saturn
@@ -1,15 +1,15 @@
 """
 Earth→Saturn Hohmann transfer quick-look with Δv, TOF, and arrival v∞ estimates.
 Generates: docs/hohmann_earth_saturn.png
-Run (flat src layout):
+Run (after `pip install -e .`, or with PYTHONPATH=src):
     PYTHONPATH=src python examples/earth_to_saturn_hohmann.py
 """
 from __future__ import annotations
 import os
-from constants import a_earth, a_saturn, mu_sun
-from transfers import hohmann_dv
-from patched_conics import arrival_vinf_heliocentric, titan_relative_vinf_bounds
-from plotting import plot_hohmann_orbits
+from titan.constants import a_earth, a_saturn, mu_sun
+from titan.transfers import hohmann_dv
+from titan.patched_conics import arrival_vinf_heliocentric, titan_relative_vinf_bounds
+from titan.plotting import plot_hohmann_orbits
 
 def main() -> None:
     r1, r2 = a_earth, a_saturn
@@ -1,10 +1,17 @@
 from __future__ import annotations
 import numpy as np
 import matplotlib.pyplot as plt
-from titan_flyby import post_flyby_vinf_saturn, titan_orbital_speed
+from titan.mission_pipeline import run_pipeline
+from titan.porkchop import DAY, YEAR
+from titan.titan_flyby import post_flyby_vinf_saturn, titan_orbital_speed
 
 def main() -> None:
-    V_in = 5_500.0  # m/s at Saturn from your quick-look
+    # Saturn-relative speed at Titan's orbit for the cheapest Earth→Saturn→Titan cell of a coarse
+    # 2030–2035 pipeline run (instead of a hand-copied quick-look value)
+    result = run_pipeline(np.linspace(0.0, 5 * 365.25 * DAY, 120), np.linspace(4.0, 11.0, 60) * YEAR)
+    best = min((o for o in result.opportunities if o.cell), key=lambda o: o.total_dv)
+    V_in = best.cell["v_titan"]  # m/s
+    print(f"V_in = {V_in:.0f} m/s (departure day {best.t_dep / DAY:.0f}, TOF {best.tof / YEAR:.2f} y)")
     VT = titan_orbital_speed()
 
     # Sweep alignment angle psi in [0, π] and altitude 100–4000 km
@@ -12,11 +19,7 @@ def main() -> None:
     hs = np.linspace(100e3, 4000e3, 121)
 
     # Heatmap of outgoing Saturn-relative v∞ after a prograde turn
-    H = np.zeros((hs.size, ps.size))
-    for i, h in enumerate(hs):
-        for j, p in enumerate(ps):
-            Vout, vinf_t_in, delta = post_flyby_vinf_saturn(V_in, p, h, prograde=True)
-            H[i, j] = Vout
+    H, vinf_t_in, delta = post_flyby_vinf_saturn(V_in, ps[None, :], hs[:, None], prograde=True)  # (hs, ps)
 
     plt.figure(figsize=(8,4.8))
     im = plt.imshow(
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import numpy as np
 import matplotlib.pyplot as plt
-from titan_flyby import turn_angle
+from titan.titan_flyby import turn_angle
 
 def main() -> None:
     R_TITAN = 2_575_000.0  # m
@@ -10,7 +10,7 @@ def main() -> None:
 
     plt.figure(figsize=(7,5))
     for v in vinfs:
-        deltas = [turn_angle(v, R_TITAN + h) for h in hs]
+        deltas = turn_angle(v, R_TITAN + hs)
         plt.plot(hs/1000.0, np.degrees(deltas), label=f"{v/1000:.0f} km/s")
 
     plt.xlabel("Periapsis altitude above Titan (km)")
@@ -1,11 +1,11 @@
 """
 Titan-relative v∞ sanity bounds given a Saturn-relative v∞.
 This is a quick vector-add bound, not a full patched-conics flyby solution.
-Run (flat src layout):
+Run (after `pip install -e .`, or with PYTHONPATH=src):
     PYTHONPATH=src python examples/titan_flyby_sanity.py
 """
 from __future__ import annotations
-from patched_conics import titan_relative_vinf_bounds
+from titan.patched_conics import titan_relative_vinf_bounds
 
 def main() -> None:
     # Example: pick a representative Saturn v∞ (e.g., from the Hohmann quick-look)
@@ -0,0 +1,39 @@
+"""
+Quick-look astrodynamics for the Titan mission study (Δv, TOF, v∞, porkchop sweeps, flybys).
+Importing the package loads nothing but this file; submodules load on first attribute access,
+so `import titan` followed by `titan.transfers.hohmann_dv(...)` only pays for transfers (and numpy).
+The numerical core never imports matplotlib; plotting (and PorkchopProgress.snapshot) import it
+when a figure is drawn. benchmarks/import_budget.py checks the import-time budget.
+Usage:
+    from titan.transfers import hohmann_dv
+    import titan; titan.lambert.lambert_universal_batch(...)
+"""
+from __future__ import annotations
+import importlib
+
+__version__ = "0.1.0"
+
+# Numerical core: never imports plotting libraries
+CORE = (
+    "constants", "transfers", "transfer_trades", "patched_conics", "titan_flyby", "titan_tour", "mission_pipeline",
+    "sweep_graph", "gravity_assist", "lambert",
+    "ephemeris", "cache", "instrument", "porkchop", "porkchop_adaptive", "porkchop_store", "porkchop_export",
+    "launch_window", "stats", "dispersions", "propagate",
+)
+# Long-running entry points (asyncio, process pool); no plotting either
+SERVICES = ("job_server",)
+# Needs matplotlib (the "plot" extra)
+PLOTTING = ("plotting",)
+
+def __getattr__(name: str):
+    # PEP 562: load submodules lazily on first access
+    if name in CORE or name in SERVICES or name in PLOTTING:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(CORE) + list(SERVICES) + list(PLOTTING))
+
+__all__ = ["CORE", "SERVICES", "PLOTTING", "__version__"]
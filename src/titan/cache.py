@@ -0,0 +1,182 @@
+"""
+Content-addressed result cache for per-cell evaluations (Lambert solutions, ephemeris states).
+Keys are built from the inputs themselves: a namespace digest of the fixed context (body radii,
+mu, branch flag, ...) plus the per-cell inputs (epoch, TOF) quantized to a fixed resolution.
+Two tiers: an in-memory LRU and an optional on-disk SQLite file with size-based eviction.
+Usage:
+    from titan.cache import ResultCache
+    cache = ResultCache(max_entries=2_000_000, disk_path="cache/porkchop.sqlite")
+"""
+from __future__ import annotations
+import hashlib
+import sqlite3
+import time
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Tuple
+
+_SQL_CHUNK = 500  # keys per IN (...) query, below SQLite's host-parameter limit
+
+class ResultCache:
+    """
+    Fixed-width float64 records keyed by (namespace, quantized input row).
+
+    Args:
+        max_entries    : in-memory LRU capacity (records)
+        disk_path      : optional SQLite file for the persistent tier
+        disk_max_bytes : disk-tier size budget; least recently used rows are evicted past it
+        resolution     : quantum applied to key inputs (same units as the inputs, e.g. 1e-3 s)
+    """
+
+    def __init__(self, max_entries: int = 1_000_000, disk_path: str | Path | None = None,
+                 disk_max_bytes: int = 1 << 30, resolution: float = 1e-3):
+        self.max_entries = int(max_entries)
+        self.disk_max_bytes = int(disk_max_bytes)
+        self.resolution = float(resolution)
+        self._mem: OrderedDict[bytes, bytes] = OrderedDict()
+        self._db = None
+        if disk_path is not None:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path))
+            self._db.execute("CREATE TABLE IF NOT EXISTS entries "
+                             "(key BLOB PRIMARY KEY, value BLOB NOT NULL, last_used INTEGER NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+            self._db.commit()
+        self.reset_stats()
+
+    # ---- keys ----
+    @staticmethod
+    def namespace(*parts) -> bytes:
+        """16-byte digest of the fixed context shared by a batch of keys."""
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+
+    def make_keys(self, ns: bytes, cols: np.ndarray) -> List[bytes]:
+        """One key per row of `cols` (N, k): ns + int64 row of round(cols / resolution)."""
+        q = np.round(np.asarray(cols, dtype=float) / self.resolution).astype(np.int64)
+        q = np.ascontiguousarray(q.reshape(q.shape[0], -1))
+        w = q.shape[1] * 8
+        buf = q.tobytes()
+        return [ns + buf[i:i + w] for i in range(0, len(buf), w)]
+
+    # ---- lookup / insert ----
+    def get_many(self, keys: List[bytes], width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up records for `keys`.
+        Returns:
+            (values, hit) with values (N, width) float64 (NaN where missed) and hit (N,) bool.
+        """
+        n = len(keys)
+        values = np.full((n, width), np.nan)
+        hit = np.zeros(n, dtype=bool)
+        mem = self._mem
+        found = {}
+        for i, k in enumerate(keys):
+            v = mem.get(k)
+            if v is not None:
+                mem.move_to_end(k)
+                found[i] = v
+        self.stats["mem_hits"] += len(found)
+
+        if self._db is not None and len(found) < n:
+            missing = [i for i in range(n) if i not in found]
+            from_disk = self._disk_get([keys[i] for i in missing])
+            for i in missing:
+                v = from_disk.get(keys[i])
+                if v is not None:
+                    found[i] = v
+                    self._mem_put(keys[i], v)
+            self.stats["disk_hits"] += len(from_disk)
+
+        if found:
+            idx = np.fromiter(found.keys(), dtype=np.int64, count=len(found))
+            values[idx] = np.frombuffer(b"".join(found.values()), dtype=np.float64).reshape(-1, width)
+            hit[idx] = True
+        self.stats["misses"] += n - len(found)
+        return values, hit
+
+    def put_many(self, keys: List[bytes], values: np.ndarray) -> None:
+        """Insert records (N, width) for `keys` into every enabled tier."""
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        buf = values.tobytes()
+        w = values.shape[1] * 8 if values.ndim > 1 else 8
+        blobs = [buf[i:i + w] for i in range(0, len(buf), w)]
+        for k, v in zip(keys, blobs):
+            self._mem_put(k, v)
+        if self._db is not None:
+            now = time.time_ns()
+            self._db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                                 [(k, v, now) for k, v in zip(keys, blobs)])
+            self._db.commit()
+            self._disk_evict()
+
+    def _mem_put(self, key: bytes, value: bytes) -> None:
+        mem = self._mem
+        mem[key] = value
+        mem.move_to_end(key)
+        while len(mem) > self.max_entries:
+            mem.popitem(last=False)
+            self.stats["mem_evictions"] += 1
+
+    # ---- disk tier ----
+    def _disk_get(self, keys: List[bytes]) -> dict:
+        out = {}
+        now = time.time_ns()
+        for c in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[c:c + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = self._db.execute(f"SELECT key, value FROM entries WHERE key IN ({marks})", chunk).fetchall()
+            if rows:
+                hit_keys = [r[0] for r in rows]
+                self._db.execute(f"UPDATE entries SET last_used = ? WHERE key IN ({','.join('?' * len(hit_keys))})",
+                                 [now] + hit_keys)
+            out.update(rows)
+        self._db.commit()
+        return out
+
+    def disk_bytes(self) -> int:
+        """Bytes in use by the disk tier (allocated pages minus free pages)."""
+        if self._db is None:
+            return 0
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        pages = self._db.execute("PRAGMA page_count").fetchone()[0]
+        free = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * page_size
+
+    def _disk_evict(self) -> None:
+        # Drop the least recently used ~10% of rows per pass until under budget
+        while self.disk_bytes() > self.disk_max_bytes:
+            n = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if n == 0:
+                break
+            n_drop = max(1, n // 10)
+            self._db.execute("DELETE FROM entries WHERE key IN "
+                             "(SELECT key FROM entries ORDER BY last_used LIMIT ?)", (n_drop,))
+            self._db.commit()
+            self.stats["disk_evictions"] += n_drop
+
+    # ---- housekeeping ----
+    def reset_stats(self) -> None:
+        self.stats = dict(mem_hits=0, disk_hits=0, misses=0, mem_evictions=0, disk_evictions=0)
+
+    @property
+    def hit_rate(self) -> float:
+        s = self.stats
+        total = s["mem_hits"] + s["disk_hits"] + s["misses"]
+        return (s["mem_hits"] + s["disk_hits"]) / total if total else 0.0
+
+    def clear(self) -> None:
+        self._mem.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._mem)
+
+__all__ = ["ResultCache"]
@@ -1,14 +1,17 @@
 """
 Basic constants for Titan mission quick-look studies (SI units).
 Usage:
-    from constants import AU, mu_sun, a_earth, a_saturn, a_titan, circ_speed
+    from titan.constants import AU, mu_sun, a_earth, a_saturn, a_titan, R_EARTH, circ_speed
 """
 from __future__ import annotations
 import numpy as np
 
 # Grav. parameters (GM) in m^3/s^2 (approx standard values)
 mu_sun: float    = 1.32712440018e20
+mu_venus: float  = 3.24858592e14
 mu_earth: float  = 3.986004418e14
+mu_mars: float   = 4.282837e13
+mu_jupiter: float = 1.26686534e17
 mu_saturn: float = 3.7931187e16
 mu_titan: float  = 8.978e12
 
@@ -17,13 +20,22 @@ AU: float       = 1.495978707e11           # Astronomical Unit [m]
 a_earth: float  = 1.000 * AU               # Earth heliocentric mean distance [m]
 a_saturn: float = 9.537 * AU               # Saturn heliocentric mean distance [m]
 a_titan: float  = 1_221_870e3              # Titan orbital radius about Saturn [m] (~1.22187e6 km)
+R_EARTH: float  = 6378.0e3                 # Earth radius for LEO parking orbits [m]
 
 def circ_speed(mu: float, r: float) -> float:
     """Circular orbital speed at radius r around body with GM=mu."""
     return float(np.sqrt(mu / r))
 
+def circ_speed_array(mu: float | np.ndarray, r: float | np.ndarray,
+                     out: np.ndarray | None = None) -> np.ndarray:
+    """Array version of circ_speed: broadcasts mu and r, sqrt taken in place."""
+    if out is None:
+        out = np.empty(np.broadcast_shapes(np.shape(mu), np.shape(r)))
+    np.divide(mu, r, out=out)
+    return np.sqrt(out, out=out)
+
 __all__ = [
-    "mu_sun", "mu_earth", "mu_saturn", "mu_titan",
-    "AU", "a_earth", "a_saturn", "a_titan",
-    "circ_speed",
+    "mu_sun", "mu_venus", "mu_earth", "mu_mars", "mu_jupiter", "mu_saturn", "mu_titan",
+    "AU", "a_earth", "a_saturn", "a_titan", "R_EARTH",
+    "circ_speed", "circ_speed_array",
 ]
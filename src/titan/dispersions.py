@@ -0,0 +1,215 @@
+"""
+Monte Carlo dispersion analysis for the Earth→Saturn arrival and the Titan flyby.
+Dispersions in departure epoch, time of flight, injection Δv and flyby altitude are pushed in
+large vectorized batches through the batch Lambert solver, a two-body coast and
+post_flyby_vinf_saturn. Each batch draws from its own child of one SeedSequence, so a run is
+reproducible for a given seed no matter how many workers execute it. Only streaming statistics
+(count, mean, variance, extrema, a fixed-bin quantile sketch) are kept, never the samples.
+Usage:
+    from titan.dispersions import Dispersions, run_monte_carlo
+    res = run_monte_carlo(10_000_000, t_dep, tof, Dispersions(sigma_t_dep=DAY, sigma_dv_inj=5.0),
+                          h_flyby=1000e3, psi=0.5, workers=8)
+    res.stats["vinf_arr"].quantile([0.01, 0.5, 0.99])
+"""
+from __future__ import annotations
+import os
+import time
+import numpy as np
+from typing import Dict, NamedTuple, Tuple
+from .constants import mu_sun, mu_earth, mu_saturn, a_earth, a_saturn, a_titan, R_EARTH
+from .ephemeris import CircularOrbit
+from .lambert import lambert_universal_batch, stumpCS_array
+from .porkchop import dv_from_leo
+from .stats import StreamingStats
+from .titan_flyby import post_flyby_vinf_saturn
+from . import instrument
+
+OUTPUTS = ("dv_leo", "vinf_dep", "vinf_arr", "miss_distance", "vinf_titan", "turn_angle", "vinf_saturn_out")
+
+class Dispersions(NamedTuple):
+    sigma_t_dep: float = 0.0   # departure epoch 1-σ (s)
+    sigma_tof: float = 0.0     # time of flight 1-σ (s)
+    sigma_dv_inj: float = 0.0  # injection burn magnitude 1-σ at LEO perigee (m/s)
+    sigma_h: float = 0.0       # Titan flyby altitude 1-σ (m)
+
+# ================================
+# Sample path
+# ================================
+def _kepler_coast(r0: np.ndarray, v0: np.ndarray, dt: np.ndarray, mu: float,
+                  maxiter: int = 30, tol: float = 1e-10) -> Tuple[np.ndarray, np.ndarray]:
+    # Universal-variable two-body coast of (N, 3) states over dt (N,), Newton on χ
+    r0n = np.linalg.norm(r0, axis=-1)
+    vr0 = np.einsum("ij,ij->i", r0, v0) / r0n
+    alpha = 2.0 / r0n - np.einsum("ij,ij->i", v0, v0) / mu
+    smu = np.sqrt(mu)
+    chi = smu * np.abs(alpha) * dt
+    # Newton only on rows still moving; rows that converge or go non-finite (e.g. a NaN sample) drop out
+    act = np.flatnonzero(np.isfinite(chi))
+    for _ in range(maxiter):
+        if act.size == 0:
+            break
+        x, r0a, vra, al = chi[act], r0n[act], vr0[act], alpha[act]
+        z = al * x * x
+        C, S = stumpCS_array(z)
+        F = r0a * vra / smu * x * x * C + (1 - al * r0a) * x**3 * S + r0a * x - smu * dt[act]
+        dF = r0a * vra / smu * x * (1 - z * S) + (1 - al * r0a) * x * x * C + r0a
+        step = F / dF
+        x = x - step
+        chi[act] = x
+        act = act[np.isfinite(x) & ~(np.abs(step) <= tol * np.maximum(np.abs(x), 1.0))]
+    z = alpha * chi * chi
+    C, S = stumpCS_array(z)
+    f = 1 - chi * chi / r0n * C
+    g = dt - chi**3 * S / smu
+    r = f[:, None] * r0 + g[:, None] * v0
+    rn = np.linalg.norm(r, axis=-1)
+    fdot = smu / (rn * r0n) * (alpha * chi**3 * S - chi)
+    gdot = 1 - chi * chi / rn * C
+    v = fdot[:, None] * r0 + gdot[:, None] * v0
+    return r, v
+
+@instrument.timed("dispersions.batch")
+def _sample_batch(seed: np.random.SeedSequence, n: int, nominal: dict, disp: Dispersions,
+                  edges: Dict[str, Tuple[float, float]] | None, bins: int) -> Dict[str, StreamingStats] | Dict[str, np.ndarray]:
+    """
+    Draw n samples and run them through the chain. With edges=None the raw outputs are returned
+    (pilot batch used to size the sketches); otherwise per-output StreamingStats.
+    """
+    rng = np.random.default_rng(seed)
+    dep, arr = CircularOrbit(nominal["a_dep"], nominal["mu"]), CircularOrbit(nominal["a_arr"], nominal["mu"])
+    t_dep = nominal["t_dep"] + disp.sigma_t_dep * rng.standard_normal(n)
+    tof = nominal["tof"] + disp.sigma_tof * rng.standard_normal(n)
+    d_inj = disp.sigma_dv_inj * rng.standard_normal(n)
+    h = nominal["h_flyby"] + disp.sigma_h * rng.standard_normal(n)
+
+    # targeted transfer for the dispersed epoch / TOF
+    r1, vE = dep.states(t_dep)
+    r2, vS = arr.states(t_dep + tof)
+    sol = lambert_universal_batch(r1, r2, tof, nominal["mu"], long_way=nominal["long_way"], z0=nominal["z0"])
+    vinf_vec = sol.v1 - vE
+    vinf_dep = np.linalg.norm(vinf_vec, axis=-1)
+    dv_leo = dv_from_leo(vinf_dep, nominal["leo_alt_km"])
+
+    # injection error: burn magnitude error at LEO perigee, direction as targeted
+    r_leo = R_EARTH + nominal["leo_alt_km"] * 1e3
+    v_esc2 = 2.0 * mu_earth / r_leo
+    v_peri = np.sqrt(vinf_dep**2 + v_esc2) + d_inj
+    with np.errstate(invalid="ignore"):
+        vinf_flown = np.sqrt(v_peri**2 - v_esc2)   # NaN if the burn no longer escapes
+        v0 = vE + vinf_vec * (vinf_flown / vinf_dep)[:, None]
+    with instrument.timer("dispersions.coast"):
+        r_sc, v_sc = _kepler_coast(r1, v0, tof, nominal["mu"])
+    vinf_arr = np.linalg.norm(v_sc - vS, axis=-1)
+    miss = np.linalg.norm(r_sc - r2, axis=-1)
+
+    # Titan flyby: Saturn-relative speed at Titan's orbital radius from the arrival v∞ (vis-viva)
+    v_at_titan = np.sqrt(vinf_arr**2 + 2.0 * mu_saturn / a_titan)
+    v_out, vinf_t, delta = post_flyby_vinf_saturn(v_at_titan, nominal["psi"], h, prograde=nominal["prograde"])
+
+    out = dict(dv_leo=dv_leo, vinf_dep=vinf_dep, vinf_arr=vinf_arr, miss_distance=miss,
+               vinf_titan=vinf_t, turn_angle=delta, vinf_saturn_out=v_out)
+    if edges is None:
+        return out
+    stats = {}
+    for name in OUTPUTS:
+        st = StreamingStats(*edges[name], bins=bins)
+        st.update(out[name])
+        stats[name] = st
+    return stats
+
+def _run_batch(args: tuple):
+    # Process-pool entry point: (batch args..., record) -> (stats, instrumentation report or None)
+    *batch, record = args
+    with instrument.recording(enabled=record) as rec:
+        stats = _sample_batch(*batch)
+    return stats, (rec.report() if rec is not None else None)
+
+# ================================
+# Driver
+# ================================
+class MonteCarloResult(NamedTuple):
+    n_samples: int
+    stats: Dict[str, StreamingStats]  # one per name in OUTPUTS (SI units; turn_angle in rad)
+    seed: int
+    wall_time: float
+
+    def summary(self) -> Dict[str, dict]:
+        return {name: st.summary() for name, st in self.stats.items()}
+
+def run_monte_carlo(n_samples: int, t_dep: float, tof: float, disp: Dispersions,
+                    h_flyby: float = 1000e3, psi: float = 0.0, prograde: bool = True,
+                    a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                    leo_alt_km: float = 300.0, long_way: bool | None = None,
+                    seed: int = 0, batch_size: int = 250_000, workers: int | None = 1,
+                    bins: int = 4096, pilot: int = 20_000) -> MonteCarloResult:
+    """
+    Monte Carlo over departure epoch, TOF, injection Δv and flyby altitude.
+    Each sample re-targets the dispersed (t_dep, tof) with the batch Lambert solver (dv_leo,
+    vinf_dep), flies the injection error through a two-body coast (vinf_arr and miss_distance at
+    the dispersed arrival epoch), and maps the resulting Saturn-relative speed at Titan's orbit
+    through post_flyby_vinf_saturn at the dispersed altitude (vinf_titan, turn_angle,
+    vinf_saturn_out).
+    Args:
+        n_samples   : total samples
+        t_dep, tof  : nominal departure epoch and time of flight (s), circular-orbit phasing as in porkchop
+        disp        : Dispersions (1-σ values)
+        h_flyby     : nominal Titan flyby altitude (m)
+        psi         : alignment angle between Saturn-relative velocity and Titan's velocity (rad)
+        prograde    : flyby turn direction (as in post_flyby_vinf_saturn)
+        long_way    : Lambert branch; None picks the cheaper branch at the nominal point
+        seed        : root seed; batch k uses SeedSequence(seed).spawn(...)[k]
+        batch_size  : samples per vectorized batch (bounds memory per worker)
+        workers     : process count; 1 runs in-process, None uses os.cpu_count()
+        bins, pilot : quantile-sketch resolution, and the size of the pilot batch that sets each
+                      sketch's range (its spread is widened 4×; outliers beyond land in end bins)
+    Returns:
+        MonteCarloResult
+    """
+    start = time.perf_counter()
+    if long_way is None:
+        from .porkchop import solve_points
+        short = solve_points(t_dep, tof, a_dep, a_arr, mu, use_long_way=False, leo_alt_km=leo_alt_km)[0]
+        both = solve_points(t_dep, tof, a_dep, a_arr, mu, use_long_way=True, leo_alt_km=leo_alt_km)[0]
+        long_way = bool(both < short)
+    nominal = dict(t_dep=float(t_dep), tof=float(tof), h_flyby=float(h_flyby), psi=float(psi),
+                   prograde=bool(prograde), a_dep=float(a_dep), a_arr=float(a_arr), mu=float(mu),
+                   leo_alt_km=float(leo_alt_km), long_way=bool(long_way))
+    # every sample's Lambert solve warm-starts from the nominal transfer's z
+    r1n, _ = CircularOrbit(a_dep, mu).states(t_dep)
+    r2n, _ = CircularOrbit(a_arr, mu).states(t_dep + tof)
+    nominal["z0"] = float(lambert_universal_batch(r1n, r2n, tof, mu, long_way=long_way).z)
+
+    root = np.random.SeedSequence(seed)
+    pilot_seed, batch_root = root.spawn(2)
+    raw = _sample_batch(pilot_seed, pilot, nominal, disp, None, bins)
+    edges = {}
+    for name in OUTPUTS:
+        x = raw[name][np.isfinite(raw[name])]
+        lo, hi = (float(x.min()), float(x.max())) if x.size else (0.0, 1.0)
+        pad = 1.5 * (hi - lo) or max(abs(lo), 1.0) * 1e-6
+        edges[name] = (lo - pad, hi + pad)
+
+    sizes = [batch_size] * (n_samples // batch_size)
+    if n_samples % batch_size:
+        sizes.append(n_samples % batch_size)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    record = workers > 1 and instrument.active() is not None
+    jobs = [(s, n, nominal, disp, edges, bins, record) for s, n in zip(batch_root.spawn(len(sizes)), sizes)]
+
+    stats = {name: StreamingStats(*edges[name], bins=bins) for name in OUTPUTS}
+    if workers <= 1:
+        parts = map(_run_batch, jobs)
+        for part, _ in parts:
+            for name in OUTPUTS:
+                stats[name].merge(part[name])
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part, report in pool.map(_run_batch, jobs):
+                instrument.merge(report)
+                for name in OUTPUTS:
+                    stats[name].merge(part[name])
+    return MonteCarloResult(int(n_samples), stats, int(seed), time.perf_counter() - start)
+
+__all__ = ["Dispersions", "StreamingStats", "MonteCarloResult", "run_monte_carlo", "OUTPUTS"]
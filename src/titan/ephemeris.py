@@ -0,0 +1,238 @@
+"""
+Pluggable ephemeris layer: analytic orbits and precomputed, interpolated state tables.
+Every ephemeris exposes states(t) -> (r, v) with shape t.shape + (3,) (m, m/s) and a hashable
+`key` used for cache namespaces, so porkchop.solve_cells / sweep_porkchop can take any of them.
+  - CircularOrbit : the circular, coplanar model behind porkchop.circ_pos_vel
+  - KeplerOrbit   : mean Keplerian elements with secular rates (JPL approximate elements for
+                    Earth and Saturn, Laplace-plane mean elements for Titan)
+  - HermiteTable  : states sampled at fixed epochs and evaluated with vectorized cubic Hermite
+                    interpolation; the table is one float64 coefficient array that can be memory-mapped
+Epochs for KeplerOrbit are seconds past J2000 (2000-01-01 12:00 TDB).
+Usage:
+    from titan.ephemeris import kepler_orbit, HermiteTable
+    earth = HermiteTable.build(kepler_orbit("earth"), t_start, t_end, step=DAY)
+    r, v = earth.states(t)
+    grid = sweep_porkchop(t_dep, tof, ephem_dep=earth, ephem_arr=kepler_orbit("saturn"))
+"""
+from __future__ import annotations
+import json
+import numpy as np
+from pathlib import Path
+from typing import NamedTuple, Tuple
+from .constants import AU, mu_sun, mu_saturn
+from . import instrument
+
+DAY = 86400.0
+CENTURY = 36525.0 * DAY
+
+# ================================
+# Analytic orbits
+# ================================
+class CircularOrbit:
+    """Circular orbit of radius a in the ecliptic plane, phase 0 at t = 0 (the porkchop default)."""
+
+    def __init__(self, a: float, mu: float = mu_sun):
+        self.a, self.mu = float(a), float(mu)
+
+    @property
+    def key(self) -> tuple:
+        return ("circ_pos_vel", self.a, self.mu)
+
+    @instrument.timed("ephemeris.circular")
+    def states(self, t: float | np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        a = self.a
+        n = np.sqrt(self.mu / a**3)
+        c, s = np.cos(n * t), np.sin(n * t)
+        zero = np.zeros_like(c)
+        r = np.stack([a * c, a * s, zero], axis=-1)
+        v = np.stack([-a * n * s, a * n * c, zero], axis=-1)
+        return r, v
+
+class KeplerElements(NamedTuple):
+    a: float          # semi-major axis (m)
+    e: float          # eccentricity
+    inc: float        # inclination (rad)
+    raan: float       # longitude of the ascending node Ω (rad)
+    argp: float       # argument of periapsis ω (rad)
+    M0: float         # mean anomaly at t = 0 (rad)
+    n: float          # mean-anomaly rate (rad/s)
+    a_dot: float = 0.0     # secular rates per second
+    e_dot: float = 0.0
+    inc_dot: float = 0.0
+    raan_dot: float = 0.0
+    argp_dot: float = 0.0
+
+def _from_jpl(a_au, e, inc, L, varpi, node, a_au_dot, e_dot, inc_dot, L_dot, varpi_dot, node_dot) -> KeplerElements:
+    # JPL "approximate positions of the planets" row: AU, degrees, rates per Julian century
+    d = np.radians
+    return KeplerElements(
+        a=a_au * AU, e=e, inc=d(inc), raan=d(node), argp=d(varpi - node), M0=d(L - varpi),
+        n=d(L_dot - varpi_dot) / CENTURY,
+        a_dot=a_au_dot * AU / CENTURY, e_dot=e_dot / CENTURY, inc_dot=d(inc_dot) / CENTURY,
+        raan_dot=d(node_dot) / CENTURY, argp_dot=d(varpi_dot - node_dot) / CENTURY,
+    )
+
+# Mean elements at J2000 (heliocentric ecliptic J2000 for the planets, valid 1800-2050;
+# Saturn-centric Laplace plane for Titan, apsidal and nodal periods ~703 yr)
+ELEMENTS = {
+    "venus": (_from_jpl(0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255,
+                        0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418), mu_sun),
+    "earth": (_from_jpl(1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0,
+                        0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0), mu_sun),
+    "mars": (_from_jpl(1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891,
+                       0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343), mu_sun),
+    "jupiter": (_from_jpl(5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909,
+                          -0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106), mu_sun),
+    "saturn": (_from_jpl(9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448,
+                         -0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794), mu_sun),
+    "titan": (KeplerElements(a=1_221_865e3, e=0.0288, inc=np.radians(0.306), raan=np.radians(28.060),
+                             argp=np.radians(180.532), M0=np.radians(163.310),
+                             n=np.radians(22.5769768) / DAY,
+                             raan_dot=-2 * np.pi / (703.0 * 365.25 * DAY),
+                             argp_dot=2 * np.pi / (703.0 * 365.25 * DAY)), mu_saturn),
+}
+
+class KeplerOrbit:
+    """
+    Two-body orbit from mean elements with secular rates. Kepler's equation is solved with a
+    fixed number of vectorized Newton passes (enough for e < 0.3 to round-off).
+    """
+
+    def __init__(self, elements: KeplerElements, mu: float, name: str = "", kepler_iter: int = 6):
+        self.el, self.mu, self.name, self.kepler_iter = elements, float(mu), name, kepler_iter
+
+    @property
+    def key(self) -> tuple:
+        return ("kepler", self.name) + tuple(float(x) for x in self.el) + (self.mu,)
+
+    @instrument.timed("ephemeris.kepler")
+    def states(self, t: float | np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        el = self.el
+        t = np.asarray(t, dtype=float)
+        a = el.a + el.a_dot * t
+        e = el.e + el.e_dot * t
+        inc = el.inc + el.inc_dot * t
+        raan = el.raan + el.raan_dot * t
+        argp = el.argp + el.argp_dot * t
+        M = np.remainder(el.M0 + el.n * t, 2 * np.pi)
+
+        E = M + e * np.sin(M)
+        for _ in range(self.kepler_iter):
+            E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+        cE, sE = np.cos(E), np.sin(E)
+        b = np.sqrt(1 - e * e)
+        # perifocal position and its time derivative; E - e sin E = M gives
+        # dE/dt = (n + de/dt sin E) / (1 - e cos E)
+        xp, yp = a * (cE - e), a * b * sE
+        Edot = (el.n + el.e_dot * sE) / (1 - e * cE)
+        vxp = el.a_dot * (cE - e) - a * (sE * Edot + el.e_dot)
+        vyp = el.a_dot * b * sE - a * e * el.e_dot / b * sE + a * b * cE * Edot
+
+        cO, sO = np.cos(raan), np.sin(raan)
+        cw, sw = np.cos(argp), np.sin(argp)
+        ci, si = np.cos(inc), np.sin(inc)
+        # P, Q: first two columns of R3(-Ω) R1(-i) R3(-ω)
+        P = np.stack([cO * cw - sO * sw * ci, sO * cw + cO * sw * ci, sw * si], axis=-1)
+        Q = np.stack([-cO * sw - sO * cw * ci, -sO * sw + cO * cw * ci, cw * si], axis=-1)
+        # their rates from the node, periapsis and inclination drifts (dP/dω = Q, dQ/dω = -P)
+        dP_di = np.stack([sO * sw * si, -cO * sw * si, sw * ci], axis=-1)
+        dQ_di = np.stack([sO * cw * si, -cO * cw * si, cw * ci], axis=-1)
+        zP = np.stack([-P[..., 1], P[..., 0], np.zeros_like(cO)], axis=-1)  # ẑ × P = dP/dΩ
+        zQ = np.stack([-Q[..., 1], Q[..., 0], np.zeros_like(cO)], axis=-1)
+        Pdot = el.raan_dot * zP + el.argp_dot * Q + el.inc_dot * dP_di
+        Qdot = el.raan_dot * zQ - el.argp_dot * P + el.inc_dot * dQ_di
+
+        r = xp[..., None] * P + yp[..., None] * Q
+        v = vxp[..., None] * P + vyp[..., None] * Q + xp[..., None] * Pdot + yp[..., None] * Qdot
+        return r, v
+
+def kepler_orbit(name: str) -> KeplerOrbit:
+    """KeplerOrbit for one of the built-in bodies in ELEMENTS ("venus", "earth", "mars", "jupiter", "saturn", "titan")."""
+    el, mu = ELEMENTS[name]
+    return KeplerOrbit(el, mu, name=name)
+
+# ================================
+# Interpolated state tables
+# ================================
+class HermiteTable:
+    """
+    Piecewise cubic Hermite ephemeris on epochs t0 + k*step. Interval k stores the power-basis
+    coefficients of the cubic through (r, v) at both of its nodes, as one (3, 4, n-1) float64
+    array (component, power, interval). Position error scales as step**4; velocity is the
+    derivative of the same cubic (step**3) and is continuous at the nodes.
+    The component-major layout keeps every query a 1-D gather plus contiguous Horner passes.
+    """
+
+    def __init__(self, t0: float, step: float, coef: np.ndarray, mu: float, name: str = "",
+                 source_key: str = ""):
+        self.t0, self.step, self.mu = float(t0), float(step), float(mu)
+        self.coef = coef
+        self.name = name
+        self.source_key = source_key
+
+    @classmethod
+    def build(cls, source, t_start: float, t_end: float, step: float, name: str = "") -> "HermiteTable":
+        """Sample `source.states` on [t_start, t_end] (extended to a whole number of steps)."""
+        n = int(np.ceil((t_end - t_start) / step)) + 1
+        r, v = source.states(t_start + step * np.arange(n))
+        y0, y1 = r[:-1].T, r[1:].T                    # (3, n-1)
+        m0, m1 = step * v[:-1].T, step * v[1:].T      # node slopes in units of s = (t - t_k) / step
+        coef = np.stack([y0, m0, 3 * (y1 - y0) - 2 * m0 - m1, 2 * (y0 - y1) + m0 + m1], axis=1)
+        return cls(t_start, step, np.ascontiguousarray(coef), getattr(source, "mu", np.nan),
+                   name or getattr(source, "name", ""), repr(getattr(source, "key", "")))
+
+    @property
+    def n_intervals(self) -> int:
+        return self.coef.shape[-1]
+
+    @property
+    def t_end(self) -> float:
+        return self.t0 + self.step * self.n_intervals
+
+    @property
+    def key(self) -> tuple:
+        return ("hermite", self.name, self.t0, self.step, self.n_intervals, self.source_key)
+
+    @instrument.timed("ephemeris.hermite")
+    def states(self, t: float | np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        t = np.asarray(t, dtype=float)
+        x = ((t - self.t0) / self.step).reshape(-1)
+        if x.size and (np.min(x) < 0.0 or np.max(x) > self.n_intervals):
+            raise ValueError(f"HermiteTable {self.name!r}: epoch outside [{self.t0}, {self.t_end}]")
+        k = np.minimum(x.astype(np.intp), self.n_intervals - 1)
+        s = x - k
+        c = np.take(self.coef, k, axis=2)             # (3, 4, N)
+        r = np.empty((3, x.size))
+        v = np.empty((3, x.size))
+        s3 = 3.0 * s
+        for j in range(3):
+            c0, c1, c2, c3 = c[j]
+            rj, vj = r[j], v[j]
+            np.multiply(c3, s, out=rj); rj += c2; rj *= s; rj += c1; rj *= s; rj += c0
+            np.multiply(c3, s3, out=vj); vj += c2; vj += c2; vj *= s; vj += c1
+        v *= 1.0 / self.step
+        # (3, N) -> t.shape + (3,) as transposed views, no copy
+        return r.T.reshape(t.shape + (3,)), v.T.reshape(t.shape + (3,))
+
+    def save(self, path: str | Path) -> None:
+        """Write <path>.npy (the coefficient array) and <path>.json (epochs, step, provenance)."""
+        path = Path(path)
+        np.save(path.with_suffix(".npy"), self.coef)
+        meta = dict(t0=self.t0, step=self.step, mu=self.mu, name=self.name, source_key=self.source_key,
+                    layout="(component xyz, power 0..3, interval)", units="m in s = (t - t_k) / step")
+        with open(path.with_suffix(".json"), "w") as fh:
+            json.dump(meta, fh, indent=2)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "HermiteTable":
+        """Open a saved table; with mmap=True coefficients are paged in only when queried."""
+        path = Path(path)
+        with open(path.with_suffix(".json")) as fh:
+            meta = json.load(fh)
+        coef = np.load(path.with_suffix(".npy"), mmap_mode="r" if mmap else None)
+        return cls(meta["t0"], meta["step"], coef, meta["mu"], meta["name"], meta["source_key"])
+
+__all__ = [
+    "DAY", "CENTURY", "CircularOrbit", "KeplerElements", "KeplerOrbit", "ELEMENTS", "kepler_orbit",
+    "HermiteTable",
+]
@@ -0,0 +1,421 @@
+"""
+Multiple-gravity-assist (MGA) search for Earth → Saturn trajectories with Venus, Earth, Mars or
+Jupiter flybys. Bodies follow the mean-element ephemerides of ephemeris.py, and epochs are seconds
+past J2000. Each leg is a heliocentric Lambert arc (lambert_multirev, both ways, with complete
+revolutions on same-body legs). At each flyby, the incoming and outgoing v∞ are matched by a
+powered flyby: one periapsis burn, with the turn solved from the titan_flyby.turn_angle half-angles.
+A sequence is searched leg by leg as a beam search, like titan_tour.search_tours:
+  - the first level is the launch grid × first-leg TOFs, limited by the launch v∞,
+  - a node is dropped when no outgoing v∞ that reaches the next body can be matched within the
+    flyby Δv limit (v∞-matching bound: Oberth-optimal burn at rp_min against the Hohmann-type
+    minimum v∞ between the two orbits),
+  - a node is dropped when its Δv so far plus an optimistic remainder exceeds dv_max, or when its
+    time so far plus the shortest remaining legs exceeds tof_max,
+  - near-duplicate nodes (same body, epoch bin and v∞ bin) keep only the cheapest,
+  - the beam_width nodes with the lowest optimistic total cost survive.
+Sequences × launch-span chunks are independent jobs, run on a process pool.
+Usage:
+    from titan.gravity_assist import search_mga, flyby_sequences, SearchSettings
+    best = search_mga((t0, t0 + 10 * YEAR), max_flybys=3, workers=8)
+    best[0].sequence, best[0].total_dv, best[0].epochs
+"""
+from __future__ import annotations
+import os
+import numpy as np
+from itertools import islice, product
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+from .constants import mu_sun, mu_venus, mu_earth, mu_mars, mu_jupiter
+from .ephemeris import DAY, ELEMENTS, kepler_orbit
+from .lambert import lambert_multirev
+from .mission_pipeline import ArrivalPlan, saturn_insertion
+from .porkchop import dv_from_leo
+from .titan_flyby import rp_from_turn, turn_angle
+from .transfers import hohmann_dv_array
+from . import instrument
+
+YEAR = 365.25 * DAY
+
+class FlybyBody(NamedTuple):
+    mu: float      # GM (m^3/s^2)
+    rp_min: float  # lowest allowed flyby periapsis radius (m)
+
+FLYBY_BODIES: Dict[str, FlybyBody] = {
+    "venus":   FlybyBody(mu_venus, 6_351.8e3),     # 300 km altitude
+    "earth":   FlybyBody(mu_earth, 6_778.1e3),     # 400 km altitude
+    "mars":    FlybyBody(mu_mars, 3_596.2e3),      # 200 km altitude
+    "jupiter": FlybyBody(mu_jupiter, 671_492e3),   # ~9.4 R_J, radiation limit of Cassini-type designs
+}
+
+# ================================
+# Powered flyby
+# ================================
+def flyby_dv(vinf_in: np.ndarray, vinf_out: np.ndarray, mu: float, rp_min: float,
+             newton_iter: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Δv of a powered flyby that turns the incoming v∞ vector into the outgoing one.
+    The incoming and outgoing hyperbolas meet at periapsis rp, where one tangential burn changes
+    the speed. Each hyperbola turns the v∞ by half its turn_angle, so the total turn is
+    δ(rp) = (turn_angle(|v_in|, rp) + turn_angle(|v_out|, rp)) / 2. rp is solved for the required
+    turn by Newton in log rp, starting from the symmetric rp_from_turn. If even rp_min cannot turn
+    the v∞ far enough, the flyby is flown at rp_min and the missing turn Δ is paid after the flyby
+    as an impulse of 2 |v_out| sin(Δ/2).
+    Args:
+        vinf_in, vinf_out : (..., 3) planet-relative v∞ vectors before / after the flyby (m/s)
+        mu, rp_min        : planet GM (m^3/s^2) and lowest periapsis radius (m)
+    Returns:
+        (dv, rp): (...) Δv (m/s) and periapsis radius (m); NaN where an input is NaN.
+    """
+    vi = np.linalg.norm(vinf_in, axis=-1)
+    vo = np.linalg.norm(vinf_out, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        cos_d = np.einsum("...k,...k->...", vinf_in, vinf_out) / (vi * vo)
+        d_req = np.arccos(np.clip(cos_d, -1.0, 1.0))
+        d_rpmin = 0.5 * (turn_angle(vi, rp_min, mu) + turn_angle(vo, rp_min, mu))
+        short = d_req > d_rpmin
+        ki, ko = mu / vi**2, mu / vo**2
+        x_min = np.log(rp_min)
+        x = np.maximum(np.log(rp_from_turn(np.sqrt(vi * vo), np.maximum(d_req, 1e-12), mu)), x_min)
+        for _ in range(newton_iter):
+            rp = np.exp(x)
+            g = np.arctan(ki / rp) + np.arctan(ko / rp) - d_req
+            dg = -(ki * rp / (rp * rp + ki * ki) + ko * rp / (rp * rp + ko * ko))
+            x = np.maximum(x - g / dg, x_min)
+        rp = np.where(short, rp_min, np.exp(x))
+        dv = np.abs(np.sqrt(vo**2 + 2.0 * mu / rp) - np.sqrt(vi**2 + 2.0 * mu / rp))
+        dv += np.where(short, 2.0 * vo * np.sin(0.5 * (d_req - d_rpmin)), 0.0)
+    return dv, rp
+
+# ================================
+# Sequences and bounds
+# ================================
+def _apsides(name: str) -> Tuple[float, float, float]:
+    # (perihelion, aphelion, semi-major axis) of a body's mean orbit at J2000
+    el = ELEMENTS[name][0]
+    return el.a * (1.0 - el.e), el.a * (1.0 + el.e), el.a
+
+def flyby_sequences(bodies: Sequence[str] = ("venus", "earth", "jupiter"), max_flybys: int = 3,
+                    start: str = "earth", target: str = "saturn") -> List[Tuple[str, ...]]:
+    """
+    Candidate body sequences from `start` to `target` with 0 .. max_flybys flybys. Once a flyby is
+    beyond the start orbit, later flybys may not move back inward: (E, V, E, J, S) is kept and
+    (E, J, V, S) is not.
+    """
+    a_start = _apsides(start)[2]
+    out = []
+    for n in range(max_flybys + 1):
+        for seq in product(bodies, repeat=n):
+            a = [_apsides(b)[2] for b in seq]
+            if any(a[i] > a_start and a[j] < a[i] for i in range(n) for j in range(i + 1, n)):
+                continue
+            out.append((start,) + seq + (target,))
+    return out
+
+def vinf_bounds(a_name: str, b_name: str, margin: float = 0.2) -> Tuple[float, float]:
+    """
+    Optimistic (departure, arrival) v∞ (m/s) of any transfer from body A's orbit to body B's: the
+    Hohmann v∞ between the closest apsides of the two orbits, reduced by `margin` for inclination and
+    the planets' eccentric speeds. It is 0 for same-body legs and for orbits whose radii overlap.
+    """
+    qa, Qa, aa = _apsides(a_name)
+    qb, Qb, ab = _apsides(b_name)
+    if a_name == b_name:
+        return 0.0, 0.0
+    r1, r2 = (Qa, qb) if aa < ab else (qa, Qb)
+    if (aa < ab) != (r1 < r2):
+        return 0.0, 0.0
+    dv1, dv2, _ = hohmann_dv_array(r1, r2, mu_sun)
+    return float(dv1) * (1.0 - margin), float(dv2) * (1.0 - margin)
+
+def leg_tof_range(a_name: str, b_name: str) -> Tuple[float, float]:
+    """Default leg TOF range (s): 0.4-1.6 × the Hohmann time, or 1-2.2 periods for a return to the same body."""
+    _, _, aa = _apsides(a_name)
+    _, _, ab = _apsides(b_name)
+    if a_name == b_name:
+        period = 2.0 * np.pi * np.sqrt(aa**3 / mu_sun)
+        return 1.0 * period, 2.2 * period
+    th = np.pi * np.sqrt((0.5 * (aa + ab))**3 / mu_sun)
+    return 0.4 * th, 1.6 * th
+
+# ================================
+# Beam search over one sequence
+# ================================
+class SearchSettings(NamedTuple):
+    n_tof: int = 32                  # TOF samples per leg
+    max_revs: int = 1                # complete revolutions searched on same-body legs
+    leo_alt_km: float = 300.0        # launch parking orbit
+    vinf_dep_max: float = 11_000.0   # launch v∞ limit (m/s); direct Earth → Saturn needs ~10.3 km/s
+    dv_flyby_max: float = 1_000.0    # flyby Δv limit (m/s); a few m/s searches unpowered flybys only
+    dv_max: float = 14_000.0         # total Δv budget (m/s)
+    tof_max: float = 12.0 * YEAR     # launch to arrival (s)
+    beam_width: int = 2_000          # nodes kept per level
+    t_bin: float = 4.0 * DAY         # memo bins for near-duplicate nodes
+    v_bin: float = 100.0
+    plan: ArrivalPlan | None = ArrivalPlan()  # Saturn orbit insertion; None counts no arrival burn
+    n_keep: int = 5                  # trajectories returned per job
+    leg_tof: Dict[Tuple[str, str], Tuple[float, float]] | None = None  # per-leg TOF range overrides
+
+class MGATrajectory(NamedTuple):
+    sequence: Tuple[str, ...]  # bodies from launch to arrival
+    epochs: List[float]        # launch, flyby and arrival epochs (s past J2000)
+    revs: List[int]            # complete heliocentric revolutions of each leg
+    long_way: List[bool]       # Δν > π geometry of each leg
+    vinf_dep: float            # launch v∞ (m/s)
+    dv_leo: float              # launch Δv from LEO (m/s)
+    dv_flyby: List[float]      # periapsis (plus turn-deficit) Δv of each flyby (m/s)
+    rp_flyby: List[float]      # flyby periapsis radii (m)
+    vinf_arr: float            # Saturn arrival v∞ (m/s)
+    dv_soi: float              # Saturn orbit insertion Δv (m/s)
+    total_dv: float            # dv_leo + sum(dv_flyby) + dv_soi (m/s)
+
+    @property
+    def tof(self) -> float:
+        return self.epochs[-1] - self.epochs[0]
+
+    @property
+    def n_flybys(self) -> int:
+        return len(self.sequence) - 2
+
+class _Level(NamedTuple):
+    # back-pointers of the nodes kept at one level (one entry per node)
+    parent: np.ndarray    # node index in the previous level (launch grid index at level 0)
+    tof: np.ndarray       # leg time of flight (s)
+    revs: np.ndarray      # complete revolutions of the leg
+    long_way: np.ndarray  # Δν > π geometry of the leg
+    dv: np.ndarray        # launch or flyby Δv spent at the start of the leg (m/s)
+    rp: np.ndarray        # flyby periapsis radius (m), NaN at launch
+    vinf: np.ndarray      # launch or flyby-out v∞ magnitude (m/s)
+
+_LAMBERT_CHUNK = 1 << 14  # (node, TOF) Lambert problems per lambert_multirev call
+
+def _expand(ephem: Dict[str, object], a_name: str, b_name: str, t: np.ndarray, tofs: np.ndarray,
+            revs: int) -> Iterator[Tuple[slice, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    # Lambert arcs from body A at epochs t (B,) over tofs (T,), in node chunks. Yields
+    # (node slice, v∞ out at A (b, T, K, 3), v∞ in at B (b, T, K, 3), branch revs (K,), branch long_way (K,)).
+    step = max(1, _LAMBERT_CHUNK // tofs.size)
+    for n0 in range(0, t.size, step):
+        nodes = slice(n0, min(n0 + step, t.size))
+        rA, vA = ephem[a_name].states(t[nodes])
+        rB, vB = ephem[b_name].states(t[nodes, None] + tofs[None, :])
+        sol = lambert_multirev(rA[:, None, :], rB, tofs[None, :], mu_sun, max_revs=revs)
+        yield nodes, sol.v1 - vA[:, None, None, :], sol.v2 - vB[:, :, None, :], sol.revs, sol.long_way
+
+def _backtrack(seq: Tuple[str, ...], levels: List[_Level], m: int, t_launch: np.ndarray,
+               vinf_arr: float, dv_soi: float, total: float) -> MGATrajectory:
+    # Walk parent pointers from entry m of the last level back to the launch grid
+    tofs, revs, lw, dvs, rps, vinf = [], [], [], [], [], []
+    for lv in levels[::-1]:
+        tofs.append(float(lv.tof[m]))
+        revs.append(int(lv.revs[m]))
+        lw.append(bool(lv.long_way[m]))
+        dvs.append(float(lv.dv[m]))
+        rps.append(float(lv.rp[m]))
+        vinf.append(float(lv.vinf[m]))
+        m = int(lv.parent[m])
+    tofs, revs, lw, dvs, rps = tofs[::-1], revs[::-1], lw[::-1], dvs[::-1], rps[::-1]
+    epochs = [float(t_launch[m])]
+    for tof in tofs:
+        epochs.append(epochs[-1] + tof)
+    return MGATrajectory(seq, epochs, revs, lw, vinf[-1], dvs[0], dvs[1:], rps[1:], vinf_arr, dv_soi, total)
+
+def search_sequence(sequence: Sequence[str], t_launch: np.ndarray, settings: SearchSettings = SearchSettings(),
+                    ephem: Dict[str, object] | None = None, stats: dict | None = None) -> List[MGATrajectory]:
+    """
+    Beam search of one body sequence over a grid of launch epochs (s past J2000).
+    Args:
+        sequence : bodies from launch to arrival, e.g. ("earth", "venus", "earth", "jupiter", "saturn")
+        t_launch : (n,) launch epochs
+        settings : SearchSettings
+        ephem    : body name -> ephemeris (default kepler_orbit for every body)
+        stats    : optional dict updated with "lambert", "feasible", "matching_pruned",
+                   "bound_pruned", "memo_pruned", "trajectories"
+    Returns:
+        Up to settings.n_keep MGATrajectory, cheapest first.
+    """
+    if stats is None:
+        stats = {}
+    for key in ("lambert", "feasible", "matching_pruned", "bound_pruned", "memo_pruned", "trajectories"):
+        stats.setdefault(key, 0)
+    s = settings
+    seq = tuple(sequence)
+    n_legs = len(seq) - 1
+    ephem = {b: (ephem or {}).get(b) or kepler_orbit(b) for b in seq}
+    tof_ranges = [(s.leg_tof or {}).get((a, b)) or leg_tof_range(a, b) for a, b in zip(seq[:-1], seq[1:])]
+    grids = [np.linspace(lo, hi, s.n_tof) for lo, hi in tof_ranges]
+    bounds = [vinf_bounds(a, b) for a, b in zip(seq[:-1], seq[1:])]
+    min_rest_time = np.append(np.cumsum([lo for lo, _ in tof_ranges][::-1])[::-1], 0.0)  # legs k.. end
+
+    def soi(vinf: np.ndarray) -> np.ndarray:
+        if s.plan is None:
+            return np.zeros_like(vinf)
+        return saturn_insertion(vinf, s.plan.rp_soi, s.plan.ra_capture)
+
+    def flyby_floor(body: str, vinf_in: np.ndarray, vinf_out_min: float) -> np.ndarray:
+        # cheapest flyby Δv that leaves with at least vinf_out_min: Oberth-optimal burn at rp_min
+        c = 2.0 * FLYBY_BODIES[body].mu / FLYBY_BODIES[body].rp_min
+        return np.maximum(np.sqrt(vinf_out_min**2 + c) - np.sqrt(vinf_in**2 + c), 0.0)
+
+    if bounds[0][0] > s.vinf_dep_max:
+        return []  # even the cheapest first leg needs more launch v∞ than allowed
+    arrival_floor = float(soi(np.array(bounds[-1][1])))
+
+    t_launch = np.asarray(t_launch, dtype=float)
+    levels: List[_Level] = []
+    # nodes at the current body: epoch, launch epoch, v∞ in (3) and Δv so far
+    t_node, t0_node = t_launch, t_launch
+    vin_node = np.full((t_launch.size, 3), np.nan)
+    cost_node = np.zeros(t_launch.size)
+
+    for k in range(n_legs):
+        a_name, b_name = seq[k], seq[k + 1]
+        last = k == n_legs - 1
+        revs = s.max_revs if a_name == b_name else 0
+        parts = []
+        for nodes, vout, vin_next, br_revs, br_long in _expand(ephem, a_name, b_name, t_node, grids[k], revs):
+            stats["lambert"] += vout.shape[0] * grids[k].size
+            vo = np.linalg.norm(vout, axis=-1)  # (b, T, K)
+            if k == 0:
+                dv = dv_from_leo(vo, s.leo_alt_km)
+                rp = np.full(vo.shape, np.nan)
+                ok = vo <= s.vinf_dep_max
+            else:
+                fb = FLYBY_BODIES[a_name]
+                dv, rp = flyby_dv(vin_node[nodes][:, None, None, :], vout, fb.mu, fb.rp_min)
+                ok = dv <= s.dv_flyby_max
+            cost = cost_node[nodes][:, None, None] + dv
+            vi_next = np.linalg.norm(vin_next, axis=-1)
+            t_next = np.broadcast_to(t_node[nodes][:, None, None] + grids[k][None, :, None], vo.shape)
+            ok &= np.isfinite(cost) & np.isfinite(vi_next)
+            stats["feasible"] += int(np.count_nonzero(ok))
+            if last:
+                score = cost + soi(vi_next)
+            else:
+                # v∞-matching bound at the next flyby, plus the cheapest possible arrival
+                floor = flyby_floor(b_name, vi_next, bounds[k + 1][0])
+                match = floor <= s.dv_flyby_max
+                stats["matching_pruned"] += int(np.count_nonzero(ok & ~match))
+                ok &= match
+                score = cost + floor + arrival_floor
+            elapsed = t_next - t0_node[nodes][:, None, None]
+            keep = ok & (score <= s.dv_max) & (elapsed + min_rest_time[k + 1] <= s.tof_max)
+            stats["bound_pruned"] += int(np.count_nonzero(ok & ~keep))
+            i, j, c = np.nonzero(keep)
+            parts.append((nodes.start + i, grids[k][j], br_revs[c], br_long[c], dv[i, j, c], rp[i, j, c],
+                          vo[i, j, c], score[i, j, c], cost[i, j, c], vin_next[i, j, c], vi_next[i, j, c],
+                          t_next[i, j, c]))
+        cols = [np.concatenate([p[m] for p in parts]) for m in range(12)]
+        parent, tof, lv_revs, lv_long, dv, rp, vo, score, cost, vin, vi, t_next = cols
+        if parent.size == 0:
+            return []
+        order = np.argsort(score, kind="stable")
+
+        if last:
+            order = order[:s.n_keep]
+            levels.append(_Level(parent[order], tof[order], lv_revs[order], lv_long[order],
+                                 dv[order], rp[order], vo[order]))
+            out = [_backtrack(seq, levels, m, t_launch, float(vi[o]), float(score[o] - cost[o]), float(score[o]))
+                   for m, o in enumerate(order)]
+            stats["trajectories"] += len(out)
+            return out
+
+        # near-duplicate nodes (epoch bin, v∞ bin) keep only the cheapest, then the beam is cut
+        keys = np.column_stack([np.round(t_next / s.t_bin), np.round(vin / s.v_bin)]).astype(np.int64)[order]
+        _, first = np.unique(keys, axis=0, return_index=True)
+        stats["memo_pruned"] += order.size - first.size
+        order = order[np.sort(first)][:s.beam_width]
+
+        levels.append(_Level(parent[order], tof[order], lv_revs[order], lv_long[order],
+                             dv[order], rp[order], vo[order]))
+        t0_node = t0_node[parent[order]]
+        t_node, vin_node, cost_node = t_next[order], vin[order], cost[order]
+    return []
+
+# ================================
+# Parallel driver
+# ================================
+def _search_job(args: tuple) -> tuple:
+    # Process-pool entry point: (sequence, t_launch, settings, ephem) -> (trajectories, stats)
+    seq, t_launch, settings, ephem = args
+    stats: dict = {}
+    return search_sequence(seq, t_launch, settings, ephem, stats), stats
+
+def iter_mga(launch_span: Tuple[float, float], bodies: Sequence[str] = ("venus", "earth", "jupiter"),
+             max_flybys: int = 3, launch_step: float = 5.0 * DAY, chunk: float = YEAR,
+             settings: SearchSettings = SearchSettings(), sequences: Sequence[Tuple[str, ...]] | None = None,
+             ephem: Dict[str, object] | None = None, workers: int | None = 1,
+             stats: dict | None = None) -> Iterator[Tuple[Tuple[str, ...], List[MGATrajectory]]]:
+    """
+    Run search_sequence for every (sequence, launch chunk) job, on a process pool when workers > 1.
+    Yields (sequence, trajectories) as jobs finish (any order when pooled); at most one job per
+    worker is in flight.
+    Args:
+        launch_span : (first, last) launch epoch (s past J2000)
+        bodies, max_flybys : flyby bodies and depth for flyby_sequences (ignored if `sequences` given)
+        launch_step : launch grid spacing (s)
+        chunk       : launch-span length per job (s)
+        ephem       : body name -> ephemeris (default kepler_orbit); must be picklable when pooled
+        stats       : optional dict summed over jobs (keys as in search_sequence)
+    """
+    if sequences is None:
+        sequences = flyby_sequences(bodies, max_flybys)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if stats is None:
+        stats = {}
+    t_all = np.arange(launch_span[0], launch_span[1] + 0.5 * launch_step, launch_step)
+    n_per = max(1, int(round(chunk / launch_step)))
+    jobs = ((tuple(seq), t_all[i:i + n_per], settings, ephem)
+            for seq in sequences for i in range(0, t_all.size, n_per))
+
+    def merge(job_stats: dict) -> None:
+        for key, v in job_stats.items():
+            stats[key] = stats.get(key, 0) + v
+
+    if workers <= 1:
+        for job in jobs:
+            with instrument.timer("mga.job"):
+                found, job_stats = _search_job(job)
+            merge(job_stats)
+            yield job[0], found
+        return
+
+    # imported here, as in porkchop: concurrent.futures.process is ~15 ms of import time
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {pool.submit(_search_job, job): job[0] for job in islice(jobs, workers)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                seq = pending.pop(f)
+                job = next(jobs, None)
+                if job is not None:
+                    pending[pool.submit(_search_job, job)] = job[0]
+                found, job_stats = f.result()
+                merge(job_stats)
+                yield seq, found
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+def search_mga(launch_span: Tuple[float, float], bodies: Sequence[str] = ("venus", "earth", "jupiter"),
+               max_flybys: int = 3, per_sequence: int = 1, **kwargs) -> List[MGATrajectory]:
+    """
+    Best trajectories of every sequence over the launch span, cheapest first.
+    Args:
+        per_sequence : trajectories kept per sequence (from distinct launch chunks first)
+        kwargs       : iter_mga arguments (launch_step, chunk, settings, sequences, ephem, workers, stats)
+    Returns:
+        List of MGATrajectory sorted by total_dv.
+    """
+    best: Dict[Tuple[str, ...], List[MGATrajectory]] = {}
+    for seq, found in iter_mga(launch_span, bodies, max_flybys, **kwargs):
+        if found:
+            best.setdefault(seq, []).extend(found)
+    out = []
+    for found in best.values():
+        out.extend(sorted(found, key=lambda tr: tr.total_dv)[:per_sequence])
+    return sorted(out, key=lambda tr: tr.total_dv)
+
+__all__ = [
+    "YEAR", "FlybyBody", "FLYBY_BODIES", "flyby_dv", "flyby_sequences", "vinf_bounds", "leg_tof_range",
+    "SearchSettings", "MGATrajectory", "search_sequence", "iter_mga", "search_mga",
+]
@@ -0,0 +1,208 @@
+"""
+Opt-in instrumentation for the solver and sweep layers: counters, histograms (integer values such
+as iteration counts, log-binned magnitudes such as residuals) and per-stage timers.
+Nothing is recorded unless a Recorder is active; disabled hooks cost one module-global check.
+Process-pool sweeps (porkchop, dispersions) record in the workers and merge into the caller's Recorder.
+Usage:
+    from titan import instrument
+    with instrument.recording() as rec:
+        sweep_porkchop(t_dep, tof)
+    print(rec.format())          # or rec.report() for a JSON-serializable dict
+"""
+from __future__ import annotations
+import functools
+import time
+import numpy as np
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List
+
+_ACTIVE: "Recorder | None" = None
+_NULL = nullcontext()
+
+class Recorder:
+    """
+    Accumulates counters, histograms and timers by dotted name ("lambert.batch.iterations", ...).
+
+    Args:
+        bins_per_decade : resolution of log-binned histograms
+    """
+
+    def __init__(self, bins_per_decade: int = 4):
+        self.bins_per_decade = int(bins_per_decade)
+        self.counters: Dict[str, int] = {}
+        self.int_hist: Dict[str, np.ndarray] = {}       # name -> counts indexed by value
+        self.log_hist: Dict[str, Dict[int, int]] = {}   # name -> {floor(log10|x| * bpd): count}
+        self.timers: Dict[str, List[float]] = {}        # name -> [calls, total_s, max_s]
+
+    # ---- recording ----
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def observe_int(self, name: str, values) -> None:
+        """Histogram of non-negative integer values (e.g. iteration counts)."""
+        v = np.asarray(values, dtype=np.int64).reshape(-1)
+        if v.size == 0:
+            return
+        old = self.int_hist.get(name)
+        size = max(int(v.max()) + 1, 0 if old is None else old.size)
+        counts = np.bincount(v, minlength=size)
+        if old is not None:
+            counts[:old.size] += old
+        self.int_hist[name] = counts
+
+    def observe_log(self, name: str, values) -> None:
+        """Log10-binned histogram of |values|; zeros and non-finite values get their own counters."""
+        v = np.abs(np.asarray(values, dtype=float).reshape(-1))
+        finite = np.isfinite(v)
+        pos = finite & (v > 0)
+        if (~finite).any():
+            self.count(name + ".nonfinite", int((~finite).sum()))
+        if (finite & ~pos).any():
+            self.count(name + ".zero", int((finite & ~pos).sum()))
+        if not pos.any():
+            return
+        k = np.floor(np.log10(v[pos]) * self.bins_per_decade).astype(np.int64)
+        keys, counts = np.unique(k, return_counts=True)
+        h = self.log_hist.setdefault(name, {})
+        for key, c in zip(keys.tolist(), counts.tolist()):
+            h[key] = h.get(key, 0) + c
+
+    def add_time(self, name: str, seconds: float) -> None:
+        t = self.timers.get(name)
+        if t is None:
+            self.timers[name] = [1, seconds, seconds]
+        else:
+            t[0] += 1
+            t[1] += seconds
+            t[2] = max(t[2], seconds)
+
+    # ---- output ----
+    def report(self) -> dict:
+        """Plain-Python (JSON-serializable) snapshot; Recorder.merge accepts it back."""
+        ints = {}
+        for name, c in self.int_hist.items():
+            n = int(c.sum())
+            values = np.flatnonzero(c)
+            cdf = np.cumsum(c) / max(n, 1)
+            ints[name] = dict(n=n, mean=float((np.arange(c.size) * c).sum() / max(n, 1)),
+                              p50=int(np.searchsorted(cdf, 0.5)), p90=int(np.searchsorted(cdf, 0.9)),
+                              max=int(values[-1]) if values.size else 0,
+                              counts={int(k): int(c[k]) for k in values})
+        logs = {}
+        for name, h in self.log_hist.items():
+            bpd = self.bins_per_decade
+            logs[name] = dict(n=int(sum(h.values())), bins_per_decade=bpd,
+                              bins=[[10.0 ** (k / bpd), 10.0 ** ((k + 1) / bpd), h[k]] for k in sorted(h)])
+        timers = {name: dict(calls=int(t[0]), total_s=t[1], mean_s=t[1] / t[0], max_s=t[2])
+                  for name, t in self.timers.items()}
+        return dict(counters=dict(sorted(self.counters.items())), timers=dict(sorted(timers.items())),
+                    int_histograms=dict(sorted(ints.items())), log_histograms=dict(sorted(logs.items())))
+
+    def merge(self, report: dict) -> None:
+        """Add a report from another Recorder (e.g. a pool worker) into this one."""
+        for name, n in report["counters"].items():
+            self.count(name, n)
+        for name, t in report["timers"].items():
+            old = self.timers.get(name)
+            if old is None:
+                self.timers[name] = [t["calls"], t["total_s"], t["max_s"]]
+            else:
+                old[0] += t["calls"]
+                old[1] += t["total_s"]
+                old[2] = max(old[2], t["max_s"])
+        for name, h in report["int_histograms"].items():
+            self.observe_int(name, np.repeat([int(k) for k in h["counts"]], list(h["counts"].values())))
+        for name, h in report["log_histograms"].items():
+            if h["bins_per_decade"] != self.bins_per_decade:
+                raise ValueError("Recorder.merge: log histograms use different bins_per_decade")
+            dst = self.log_hist.setdefault(name, {})
+            for lo, _, c in h["bins"]:
+                k = int(round(np.log10(lo) * self.bins_per_decade))
+                dst[k] = dst.get(k, 0) + c
+
+    def format(self) -> str:
+        """Human-readable text form of report()."""
+        rep = self.report()
+        lines = ["timers:"]
+        for name, t in rep["timers"].items():
+            lines.append(f"  {name:34s} {t['calls']:8d} calls {t['total_s']*1e3:11.2f} ms "
+                         f"(mean {t['mean_s']*1e3:.3f} ms, max {t['max_s']*1e3:.3f} ms)")
+        lines.append("counters:")
+        for name, n in rep["counters"].items():
+            lines.append(f"  {name:34s} {n:12d}")
+        lines.append("histograms:")
+        for name, h in rep["int_histograms"].items():
+            lines.append(f"  {name:34s} n={h['n']} mean={h['mean']:.2f} p50={h['p50']} p90={h['p90']} max={h['max']}")
+        for name, h in rep["log_histograms"].items():
+            lines.append(f"  {name:34s} n={h['n']}")
+            for lo, hi, c in h["bins"]:
+                lines.append(f"    [{lo:9.2e}, {hi:9.2e})  {c}")
+        return "\n".join(lines)
+
+# ================================
+# Hooks
+# ================================
+def active() -> Recorder | None:
+    """The Recorder currently collecting, or None (hooks skip all work then)."""
+    return _ACTIVE
+
+@contextmanager
+def recording(recorder: Recorder | None = None, enabled: bool = True) -> Iterator[Recorder | None]:
+    """
+    Activate a Recorder for the block (a fresh one unless given). Nested blocks collect separately
+    and are merged into the enclosing Recorder on exit. With enabled=False the block runs untouched
+    and yields None.
+    """
+    global _ACTIVE
+    if not enabled:
+        yield None
+        return
+    rec = recorder if recorder is not None else Recorder()
+    outer, _ACTIVE = _ACTIVE, rec
+    try:
+        yield rec
+    finally:
+        _ACTIVE = outer
+        if outer is not None and outer is not rec:
+            outer.merge(rec.report())
+
+def merge(report: dict | None) -> None:
+    """Merge a worker's report into the active Recorder (no-op when none is active or report is None)."""
+    if _ACTIVE is not None and report is not None:
+        _ACTIVE.merge(report)
+
+class _Timer:
+    __slots__ = ("rec", "name", "t0")
+
+    def __init__(self, rec: Recorder, name: str):
+        self.rec, self.name = rec, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rec.add_time(self.name, time.perf_counter() - self.t0)
+        return False
+
+def timer(name: str):
+    """Context manager timing its block under `name`; a shared no-op context when disabled."""
+    return _NULL if _ACTIVE is None else _Timer(_ACTIVE, name)
+
+def timed(name: str) -> Callable:
+    """Decorator form of timer() for whole functions."""
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rec = _ACTIVE
+            if rec is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                rec.add_time(name, time.perf_counter() - t0)
+        return wrapper
+    return deco
+
+__all__ = ["Recorder", "active", "recording", "merge", "timer", "timed"]
@@ -0,0 +1,309 @@
+"""
+Local asyncio job server for porkchop sweeps and Titan flyby maps.
+Clients send one JSON job spec per line over stdin/stdout, a Unix socket or a localhost TCP port;
+results stream back as JSON lines tagged with the job id. Compute runs on a process pool.
+Work is shared across jobs and clients:
+  - porkchop cells are cached in-process (cache.ResultCache) keyed on the sweep settings and the
+    quantized (t_dep, tof) pair, so overlapping grids only solve the cells not seen before,
+  - identical tiles (and identical flyby maps) that are already running are awaited, not resubmitted.
+Job specs:
+    {"id": "a", "kind": "porkchop", "t_dep": {"start": 0, "stop": 9.5e7, "num": 140},
+     "tof": {"start": 1.26e8, "stop": 3.47e8, "num": 110}, "use_long_way": false, "leo_alt_km": 300}
+    {"id": "b", "kind": "flyby_map", "vinf_saturn": 5500, "psi": {"start": 0, "stop": 3.1416, "num": 181},
+     "h": [100e3, 1000e3, 4000e3], "prograde": true}
+    {"id": "c", "kind": "stats"}
+Axes are either explicit lists or {"start", "stop", "num"} (np.linspace); all values SI.
+Replies: "accepted", then "tile" messages (porkchop) or one "result" (flyby_map), then "done";
+"error" on a bad spec or a failed job. NaN is sent as null.
+Usage:
+    python -m titan.job_server --stdio
+    python -m titan.job_server --unix /tmp/titan_jobs.sock --workers 8
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Awaitable, Callable, Tuple
+from .constants import mu_sun, a_earth, a_saturn, mu_titan
+from .cache import ResultCache
+from .porkchop import iter_tiles, solve_points
+from .titan_flyby import post_flyby_vinf_saturn
+
+Send = Callable[[dict], Awaitable[None]]
+
+# ================================
+# Pool entry points (top level so they pickle)
+# ================================
+def _solve_pairs(t_dep: np.ndarray, tof: np.ndarray, settings: dict) -> np.ndarray:
+    # (N, 3) [dv_leo, vinf_dep, vinf_arr] for scattered (t_dep, tof) pairs
+    return np.stack(solve_points(t_dep, tof, **settings), axis=-1)
+
+def _flyby_map(vinf_saturn: float, psi: np.ndarray, h: np.ndarray, prograde: bool, mu_t: float) -> tuple:
+    H, vinf_t, delta = post_flyby_vinf_saturn(vinf_saturn, psi[None, :], h[:, None], mu_t=mu_t, prograde=prograde)
+    return np.broadcast_to(H, (h.size, psi.size)), np.broadcast_to(vinf_t, (h.size, psi.size)), delta
+
+# ================================
+# Spec helpers
+# ================================
+def _axis(spec) -> np.ndarray:
+    if isinstance(spec, dict):
+        return np.linspace(float(spec["start"]), float(spec["stop"]), int(spec["num"]))
+    return np.asarray(spec, dtype=float).reshape(-1)
+
+def _jsonable(a: np.ndarray) -> list:
+    # nested lists with NaN/inf -> None (strict JSON)
+    a = np.asarray(a, dtype=float)
+    out = a.astype(object)
+    out[~np.isfinite(a)] = None
+    return out.tolist()
+
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        h.update(p.tobytes() if isinstance(p, np.ndarray) else repr(p).encode())
+    return h.hexdigest()
+
+# ================================
+# Server
+# ================================
+class JobServer:
+    """
+    Job dispatcher shared by every connection.
+
+    Args:
+        workers       : process-pool size (None → os.cpu_count())
+        tile          : (n_tof, n_dep) cells per porkchop tile sent to the pool
+        cache_entries : in-memory porkchop cell cache capacity
+        cache_path    : optional SQLite file so the cell cache survives restarts
+    """
+
+    def __init__(self, workers: int | None = None, tile: Tuple[int, int] = (128, 128),
+                 cache_entries: int = 4_000_000, cache_path: str | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.tile = tuple(tile)
+        self.cache = ResultCache(max_entries=cache_entries, disk_path=cache_path)
+        self._inflight: dict = {}
+        self.stats = dict(jobs=0, tiles=0, tiles_shared=0, cells=0, cells_solved=0)
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+        self.cache.close()
+
+    async def _shared(self, key: str, make: Callable[[], Awaitable]):
+        # Run make() once per key; concurrent callers with the same key await the same task
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["tiles_shared"] += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(make())
+        self._inflight[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def run(self, spec: dict, send: Send) -> None:
+        """Execute one job spec, streaming replies through `send`."""
+        job_id = spec.get("id")
+        try:
+            kind = spec["kind"]
+            if kind == "porkchop":
+                await self._porkchop(job_id, spec, send)
+            elif kind == "flyby_map":
+                await self._flyby(job_id, spec, send)
+            elif kind == "stats":
+                await send({"id": job_id, "type": "stats", **self.stats, "cache": dict(self.cache.stats)})
+            else:
+                raise ValueError(f"unknown job kind {kind!r}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # bad specs and compute failures alike (BrokenProcessPool, MemoryError, ...) end the job, not the connection
+            await send({"id": job_id, "type": "error", "message": f"{type(exc).__name__}: {exc}"})
+
+    # ---- porkchop ----
+    async def _porkchop(self, job_id, spec: dict, send: Send) -> None:
+        start = time.perf_counter()
+        t_dep, tof = _axis(spec["t_dep"]), _axis(spec["tof"])
+        settings = dict(a_dep=float(spec.get("a_dep", a_earth)), a_arr=float(spec.get("a_arr", a_saturn)),
+                        mu=float(spec.get("mu", mu_sun)), use_long_way=bool(spec.get("use_long_way", False)),
+                        leo_alt_km=float(spec.get("leo_alt_km", 300.0)))
+        ns = self.cache.namespace("job_server.porkchop", tuple(sorted(settings.items())))
+        tiles = list(iter_tiles(tof.size, t_dep.size, self.tile))
+        self.stats["jobs"] += 1
+        await send({"id": job_id, "type": "accepted", "shape": [tof.size, t_dep.size], "tiles": len(tiles)})
+
+        best = (np.inf, -1, -1)
+        # at most one tile per pool worker in flight for this job, refilled as tiles finish, so a
+        # large grid neither queues every tile on the executor nor holds all their inputs at once
+        jobs = iter(tiles)
+        pending = set()
+
+        def submit(tile) -> None:
+            si, sj = tile
+            pending.add(asyncio.ensure_future(self._porkchop_tile(ns, settings, t_dep[sj], tof[si], (si, sj))))
+
+        for tile in islice(jobs, self.workers):
+            submit(tile)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    tile = next(jobs, None)
+                    if tile is not None:
+                        submit(tile)
+                    (si, sj), vals, n_cached = fut.result()
+                    dv = vals[..., 0]
+                    if np.isfinite(dv).any():
+                        i, j = np.unravel_index(np.nanargmin(dv), dv.shape)
+                        if dv[i, j] < best[0]:
+                            best = (float(dv[i, j]), si.start + int(i), sj.start + int(j))
+                    await send({"id": job_id, "type": "tile", "tof_slice": [si.start, si.stop],
+                                "dep_slice": [sj.start, sj.stop], "cached_cells": n_cached,
+                                "dv_leo": _jsonable(dv), "vinf_dep": _jsonable(vals[..., 1]),
+                                "vinf_arr": _jsonable(vals[..., 2])})
+        finally:
+            for f in pending:
+                f.cancel()
+        done = {"id": job_id, "type": "done", "elapsed_s": time.perf_counter() - start}
+        if np.isfinite(best[0]):
+            done.update(min_dv_leo=best[0], min_tof=float(tof[best[1]]), min_t_dep=float(t_dep[best[2]]))
+        await send(done)
+
+    async def _porkchop_tile(self, ns: bytes, settings: dict, t_dep: np.ndarray, tof: np.ndarray, where) -> tuple:
+        self.stats["tiles"] += 1
+        key = _digest(ns, t_dep, tof)
+        vals, n_cached = await self._shared(key, lambda: self._solve_tile(ns, settings, t_dep, tof))
+        return where, vals, n_cached
+
+    async def _solve_tile(self, ns: bytes, settings: dict, t_dep: np.ndarray, tof: np.ndarray) -> tuple:
+        shape = (tof.size, t_dep.size)
+        cols = np.stack(np.broadcast_arrays(t_dep[None, :], tof[:, None]), axis=-1).reshape(-1, 2)
+        keys = self.cache.make_keys(ns, cols)
+        vals, hit = self.cache.get_many(keys, 3)
+        miss = ~hit
+        self.stats["cells"] += hit.size
+        if miss.any():
+            loop = asyncio.get_running_loop()
+            solved = await loop.run_in_executor(self.pool, _solve_pairs, cols[miss, 0], cols[miss, 1], settings)
+            vals[miss] = solved
+            self.cache.put_many([k for k, m in zip(keys, miss) if m], solved)
+            self.stats["cells_solved"] += int(miss.sum())
+        return vals.reshape(shape + (3,)), int(hit.sum())
+
+    # ---- flyby map ----
+    async def _flyby(self, job_id, spec: dict, send: Send) -> None:
+        start = time.perf_counter()
+        vinf = float(spec["vinf_saturn"])
+        psi, h = _axis(spec["psi"]), _axis(spec["h"])
+        prograde = bool(spec.get("prograde", True))
+        mu_t = float(spec.get("mu_titan", mu_titan))
+        self.stats["jobs"] += 1
+        await send({"id": job_id, "type": "accepted", "shape": [h.size, psi.size]})
+        loop = asyncio.get_running_loop()
+        H, vinf_t, delta = await self._shared(
+            _digest("flyby_map", vinf, psi, h, prograde, mu_t),
+            lambda: loop.run_in_executor(self.pool, _flyby_map, vinf, psi, h, prograde, mu_t))
+        await send({"id": job_id, "type": "result", "vinf_saturn_out": _jsonable(H),
+                    "vinf_titan": _jsonable(vinf_t), "turn_angle": _jsonable(delta)})
+        await send({"id": job_id, "type": "done", "elapsed_s": time.perf_counter() - start})
+
+# ================================
+# Transports
+# ================================
+async def _serve_lines(server: JobServer, lines, write: Callable[[bytes], Awaitable[None]]) -> None:
+    # One connection: every line is a job, jobs run concurrently, replies are written whole lines
+    tasks = set()
+
+    async def send(msg: dict) -> None:
+        await write((json.dumps(msg, allow_nan=False) + "\n").encode())
+
+    async for raw in lines:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            spec = json.loads(raw)
+            if not isinstance(spec, dict):
+                raise ValueError("job spec must be a JSON object")
+        except ValueError as exc:
+            await send({"id": None, "type": "error", "message": f"bad JSON: {exc}"})
+            continue
+        task = asyncio.ensure_future(server.run(spec, send))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+async def _stream_lines(reader: asyncio.StreamReader):
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        yield line
+
+async def serve_stdio(server: JobServer) -> None:
+    """Read job specs from stdin until EOF; write replies to stdout."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    out = sys.stdout.buffer
+
+    async def write(data: bytes) -> None:
+        out.write(data)
+        out.flush()
+
+    await _serve_lines(server, _stream_lines(reader), write)
+
+async def _handle_client(server: JobServer, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    async def write(data: bytes) -> None:
+        writer.write(data)
+        await writer.drain()
+    try:
+        await _serve_lines(server, _stream_lines(reader), write)
+    finally:
+        writer.close()
+
+async def serve_socket(server: JobServer, unix_path: str | None = None, port: int | None = None) -> None:
+    """Serve clients on a Unix socket or on 127.0.0.1:port until cancelled."""
+    handler = lambda r, w: _handle_client(server, r, w)  # noqa: E731
+    if unix_path is not None:
+        srv = await asyncio.start_unix_server(handler, path=unix_path)
+    else:
+        srv = await asyncio.start_server(handler, host="127.0.0.1", port=port)
+    async with srv:
+        await srv.serve_forever()
+
+def main(argv: list | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Local job server for porkchop sweeps and flyby maps")
+    where = ap.add_mutually_exclusive_group(required=True)
+    where.add_argument("--stdio", action="store_true", help="JSON lines on stdin/stdout")
+    where.add_argument("--unix", metavar="PATH", help="listen on a Unix socket")
+    where.add_argument("--tcp", metavar="PORT", type=int, help="listen on 127.0.0.1:PORT")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--cache", metavar="SQLITE", default=None, help="persistent porkchop cell cache")
+    args = ap.parse_args(argv)
+
+    server = JobServer(workers=args.workers, cache_path=args.cache)
+    try:
+        if args.stdio:
+            asyncio.run(serve_stdio(server))
+        else:
+            asyncio.run(serve_socket(server, unix_path=args.unix, port=args.tcp))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+__all__ = ["JobServer", "serve_stdio", "serve_socket"]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,730 @@
+"""
+Universal-variable Lambert solvers for heliocentric quick-look sweeps: single-rev (scalar,
+batched, and grid with warm starts from neighbouring cells) and a multi-revolution mode that
+enumerates every feasible branch. Single-rev solves use a safeguarded Halley iteration on z.
+Usage:
+    from titan.lambert import lambert_universal, lambert_universal_batch, lambert_universal_grid, lambert_multirev
+"""
+from __future__ import annotations
+import numpy as np
+from typing import NamedTuple
+from . import instrument
+
+# Status codes reported per element by lambert_universal_batch
+LAMBERT_OK          = 0   # residual below tol/rtol, or iteration reached a fixed point
+LAMBERT_MAXITER     = 1   # budget exhausted with a large residual (velocities still returned, as in the scalar solver)
+LAMBERT_DEGENERATE  = 2   # A ≈ 0 (scalar solver raises "Lambert: A≈0")
+LAMBERT_INFEASIBLE  = 3   # y <= 0 or non-finite at the final z (scalar solver raises "Lambert: y<=0"),
+                          # or no single-rev root in [Z_MIN, Z_MAX) (method="halley")
+
+# ================================
+# Stumpff functions
+# ================================
+def stumpC(z: float) -> float:
+    if z > 0:  return (1 - np.cos(np.sqrt(z))) / z
+    if z < 0:  return (np.cosh(np.sqrt(-z)) - 1) / (-z)
+    return 0.5
+
+def stumpS(z: float) -> float:
+    if z > 0:
+        s = np.sqrt(z)
+        return (s - np.sin(s)) / (s**3)
+    if z < 0:
+        s = np.sqrt(-z)
+        return (np.sinh(s) - s) / (s**3)
+    return 1.0 / 6.0
+
+def stumpCS_array(z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Element-wise Stumpff C(z) and S(z) for an array of z, using the same branches as stumpC/stumpS.
+    """
+    z = np.asarray(z, dtype=float)
+    C = np.full(z.shape, 0.5)
+    S = np.full(z.shape, 1.0 / 6.0)
+
+    pos = z > 0
+    if pos.any():
+        zp = z[pos]
+        s = np.sqrt(zp)
+        C[pos] = (1 - np.cos(s)) / zp
+        S[pos] = (s - np.sin(s)) / (s**3)
+
+    neg = z < 0
+    if neg.any():
+        zn = z[neg]
+        s = np.sqrt(-zn)
+        C[neg] = (np.cosh(s) - 1) / (-zn)
+        S[neg] = (np.sinh(s) - s) / (s**3)
+    return C, S
+
+# Taylor coefficients of C(z) = Σ (-z)^k/(2k+2)! and S(z) = Σ (-z)^k/(2k+3)!, used near z = 0
+# where the closed-form derivatives cancel
+_C_SERIES = np.array([(-1.0)**k / np.prod(np.arange(1.0, 2*k + 3)) for k in range(10)])
+_S_SERIES = np.array([(-1.0)**k / np.prod(np.arange(1.0, 2*k + 4)) for k in range(10)])
+_SERIES_Z = 0.1
+
+def _stumpff_d2(z: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    C, S and their first and second z-derivatives for an array of z:
+    C' = (1 - zS - 2C) / 2z,  S' = (C - 3S) / 2z,  differentiated once more for C'', S''.
+    For |z| < 0.1 all six come from the Taylor series (stumpCS_array loses digits there).
+    """
+    C, S = stumpCS_array(z)
+    small = np.abs(z) < _SERIES_Z
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dC = (1 - z*S - 2*C) / (2*z)
+        dS = (C - 3*S) / (2*z)
+        d2C = (-S - z*dS - 2*dC) / (2*z) - dC / z
+        d2S = (dC - 3*dS) / (2*z) - dS / z
+    if small.any():
+        zs = z[small]
+        k = np.arange(_C_SERIES.size)
+        z0 = zs[:, None] ** k
+        C[small] = z0 @ _C_SERIES
+        S[small] = z0 @ _S_SERIES
+        zp = zs[:, None] ** np.maximum(k - 1, 0)
+        zpp = zs[:, None] ** np.maximum(k - 2, 0)
+        dC[small] = zp @ (k * _C_SERIES)
+        dS[small] = zp @ (k * _S_SERIES)
+        d2C[small] = zpp @ (k * (k - 1) * _C_SERIES)
+        d2S[small] = zpp @ (k * (k - 1) * _S_SERIES)
+    return C, S, dC, dS, d2C, d2S
+
+# ================================
+# Single-rev Lambert (universal variables)
+# ================================
+def _newton_z_scalar(A: float, r1n: float, r2n: float, sqrt_mu_dt: float, z: float,
+                     rec: instrument.Recorder | None) -> tuple[float, int, bool]:
+    # The original scalar iteration: Newton on F(z) in a [-40, 40] bracket, bisection fallback and a
+    # z += 0.1 nudge where C or y is infeasible. Returns (z, passes, |F| < 1e-8).
+    z_low, z_up = -40.0, 40.0
+    F = np.inf
+    n_iter = n_bisect = n_nudge = 0
+    for n_iter in range(1, 121):
+        C, S = stumpC(z), stumpS(z)
+        if C <= 0:  z += 0.1; n_nudge += 1; continue
+        y = r1n + r2n + A * (z*S - 1) / np.sqrt(C)
+        if y <= 0:  z += 0.1; n_nudge += 1; continue
+
+        chi = np.sqrt(y / C)
+        F = chi**3 * S + A * np.sqrt(y) - sqrt_mu_dt
+        if abs(F) < 1e-8: break
+
+        if z == 0.0:
+            dC, dS = -1/6, -1/120
+        else:
+            dC = (0.5*z*(S - 2*C) - C) / z
+            dS = (0.5*z*(1 - 4*C) - 3*S) / (3*z)
+
+        dy_dz   = (A/(2*np.sqrt(C))) * (S + z*dS) - (A*(z*S - 1)*dC) / (2*C**1.5)
+        dchi_dz = (0.5/np.sqrt(y*C)) * (dy_dz*C - y*dC) / C
+        dFdz    = 3*chi**2*dchi_dz*S + chi**3*dS + (A/(2*np.sqrt(y))) * dy_dz
+
+        if not np.isfinite(dFdz) or dFdz == 0:
+            if F > 0: z_up = min(z_up, z)
+            else:     z_low = max(z_low, z)
+            z = 0.5*(z_low + z_up)
+            n_bisect += 1
+        else:
+            z_new = z - F/dFdz
+            if F > 0: z_up = min(z_up, z)
+            else:     z_low = max(z_low, z)
+            if z_new < z_low or z_new > z_up:
+                z = 0.5*(z_low + z_up)
+                n_bisect += 1
+            else:
+                z = z_new
+    if rec is not None:
+        rec.count("lambert.scalar.bisections", n_bisect)
+        rec.count("lambert.scalar.nudges", n_nudge)
+    return z, n_iter, abs(F) < 1e-8
+
+def lambert_universal(r1: np.ndarray, r2: np.ndarray, dt: float, mu: float,
+                      long_way: bool = False, z0: float | None = None,
+                      method: str = "halley") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Single-rev Lambert problem in universal variables.
+    Args:
+        r1, r2   : position vectors (m)
+        dt       : time of flight (s)
+        mu       : primary GM (m^3/s^2)
+        long_way : Δν > π branch
+        z0       : starting z (e.g. the converged z of a neighbouring problem); default 0
+        method   : "halley" (safeguarded Halley, see _halley_z) or "newton" (the original iteration,
+                   kept for reproducing older results)
+    Returns:
+        (v1, v2) in m/s. Raises RuntimeError for degenerate geometry (A≈0), y <= 0 at the
+        solution, or (halley) no single-rev root in the z bracket.
+    """
+    r1n, r2n = np.linalg.norm(r1), np.linalg.norm(r2)
+    cos_dnu = np.clip(np.dot(r1, r2) / (r1n * r2n), -1.0, 1.0)
+    dnu = np.arccos(cos_dnu)
+    if long_way:
+        dnu = 2*np.pi - dnu
+
+    rec = instrument.active()
+    A = np.sin(dnu) * np.sqrt(r1n * r2n / (1 - np.cos(dnu)))
+    if np.isclose(A, 0.0):
+        if rec is not None:
+            rec.count("lambert.scalar.degenerate")
+        raise RuntimeError("Lambert: A≈0")
+
+    sqrt_mu_dt = np.sqrt(mu) * dt
+    z_start = 0.0 if z0 is None else float(z0)
+    if method == "halley":
+        zk, itk, okk = _halley_z(np.array([A]), np.array([r1n]), np.array([r2n]), np.array([sqrt_mu_dt]),
+                                 np.array([z_start]), 1e-8, 1e-10, 120, prefix="lambert.scalar")
+        z, n_iter, converged = float(zk[0]), int(itk[0]), bool(okk[0])
+    elif method == "newton":
+        z, n_iter, converged = _newton_z_scalar(A, r1n, r2n, sqrt_mu_dt, z_start, rec)
+    else:
+        raise ValueError(f"lambert_universal: unknown method {method!r}")
+
+    C, S = stumpC(z), stumpS(z)
+    y = r1n + r2n + A * (z*S - 1) / np.sqrt(C)
+    if rec is not None:
+        rec.count("lambert.scalar.calls")
+        rec.observe_int("lambert.scalar.iterations", [n_iter])
+        if y > 0:
+            rec.observe_log("lambert.scalar.residual", [(np.sqrt(y / C)**3 * S + A * np.sqrt(y) - sqrt_mu_dt) / sqrt_mu_dt])
+        else:
+            rec.count("lambert.scalar.infeasible")
+        if not converged:
+            rec.count("lambert.scalar.maxiter")
+    if y <= 0: raise RuntimeError("Lambert: y<=0")
+    if method == "halley" and not converged and z <= Z_MIN:
+        raise RuntimeError("Lambert: no single-rev root in the z bracket")
+
+    f = 1 - y / r1n
+    g = A * np.sqrt(y / mu)
+    gdot = 1 - y / r2n
+    v1 = (r2 - f*r1) / g
+    v2 = (gdot*r2 - r1) / g
+    return v1, v2
+
+# ================================
+# Batched single-rev Lambert (NumPy, element-wise masks)
+# ================================
+def _iterate_z(A: np.ndarray, r1n: np.ndarray, r2n: np.ndarray, sqrt_mu_dt: np.ndarray,
+               tol: float, maxiter: int, z0: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run the original (method="newton") lambert_universal z-iteration element-wise on flat arrays.
+    Returns (z, iterations, retired_early) where retired_early marks |F| < tol or a fixed point.
+    """
+    n = A.size
+    z = np.zeros(n) if z0 is None else np.array(z0, dtype=float)
+    iterations = np.full(n, maxiter, dtype=np.int32)
+    retired_early = np.zeros(n, dtype=bool)
+
+    idx = np.arange(n)
+    zs = z.copy()
+    z_low = np.full(n, -40.0)
+    z_up = np.full(n, 40.0)
+    Aa, r1a, r2a, Fa = A, r1n, r2n, sqrt_mu_dt
+    rec = instrument.active()
+    n_bisect = n_nudge = 0
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for it in range(maxiter):
+            if idx.size == 0:
+                break
+            C, S = stumpCS_array(zs)
+            sqC = np.sqrt(C)
+            y = r1a + r2a + Aa * (zs*S - 1) / sqC
+            nudge = (C <= 0) | (y <= 0)
+
+            chi = np.sqrt(y / C)
+            chi3 = chi**3
+            sqy = np.sqrt(y)
+            F = chi3 * S + Aa * sqy - Fa
+            done = ~nudge & (np.abs(F) < tol)
+
+            z0 = zs == 0.0
+            dC = np.where(z0, -1/6, (0.5*zs*(S - 2*C) - C) / zs)
+            dS = np.where(z0, -1/120, (0.5*zs*(1 - 4*C) - 3*S) / (3*zs))
+
+            dy_dz   = (Aa/(2*sqC)) * (S + zs*dS) - (Aa*(zs*S - 1)*dC) / (2*C**1.5)
+            dchi_dz = (0.5/np.sqrt(y*C)) * (dy_dz*C - y*dC) / C
+            dFdz    = 3*chi**2*dchi_dz*S + chi3*dS + (Aa/(2*sqy)) * dy_dz
+
+            step = ~nudge & ~done
+            Fpos = F > 0
+            z_up = np.where(step & Fpos, np.minimum(z_up, zs), z_up)
+            z_low = np.where(step & ~Fpos, np.maximum(z_low, zs), z_low)
+
+            z_new = zs - F/dFdz
+            bisect = ~np.isfinite(dFdz) | (dFdz == 0) | (z_new < z_low) | (z_new > z_up)
+            z_next = np.where(bisect, 0.5*(z_low + z_up), z_new)
+            z_next = np.where(nudge, zs + 0.1, np.where(done, zs, z_next))
+            if rec is not None:
+                n_bisect += int(np.count_nonzero(step & bisect))
+                n_nudge += int(np.count_nonzero(nudge))
+
+            # A fixed point of the update (z unchanged, not a nudge) stays put for the rest of the
+            # loop, so it can be retired without changing the answer.
+            retire = done | (step & (z_next == zs))
+            zs = z_next
+
+            if retire.any():
+                ridx = idx[retire]
+                z[ridx] = zs[retire]
+                # the scalar loop breaks on the pass that detects |F| < tol
+                iterations[ridx] = it + 1
+                retired_early[ridx] = True
+                keep = ~retire
+                idx, zs, z_low, z_up = idx[keep], zs[keep], z_low[keep], z_up[keep]
+                Aa, r1a, r2a, Fa = Aa[keep], r1a[keep], r2a[keep], Fa[keep]
+
+    z[idx] = zs
+    if rec is not None:
+        rec.count("lambert.batch.bisections", n_bisect)
+        rec.count("lambert.batch.nudges", n_nudge)
+    return z, iterations, retired_early
+
+Z_MIN = -40.0            # lower end of the single-rev z bracket (as in the legacy iteration)
+Z_MAX = 4 * np.pi**2     # C(z) -> 0 here: the single-rev branch ends
+
+def _halley_z(A: np.ndarray, r1n: np.ndarray, r2n: np.ndarray, sqrt_mu_dt: np.ndarray, z0: np.ndarray,
+              tol: float, rtol: float, maxiter: int,
+              prefix: str = "lambert.batch") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Safeguarded Halley iteration on F(z) = χ³S + A√y - √μ·t, element-wise on flat arrays.
+    F increases monotonically on the single-rev branch, so every evaluation tightens a bracket
+    [z_low, z_up] inside [Z_MIN, Z_MAX]. A Halley step that leaves the bracket falls back to
+    Newton, then to bisection; y <= 0 (z too small for this geometry) raises z_low instead of
+    nudging z. The first fallback towards an untouched lower bound probes Z_MIN itself, so
+    problems with no root in the bracket (F(Z_MIN) > 0) stop at once. Elements retire when
+    |F| <= max(tol, rtol·√μ·t) (converged) or when z stops changing or the probe fails (not converged).
+    Returns (z, iterations, converged).
+    """
+    n = A.size
+    z = np.empty(n)
+    iterations = np.full(n, maxiter, dtype=np.int32)
+    converged = np.zeros(n, dtype=bool)
+
+    idx = np.arange(n)
+    zs = np.where(np.isfinite(z0), np.clip(z0, Z_MIN, np.nextafter(Z_MAX, 0.0)), 0.0)
+    z_low = np.full(n, Z_MIN)
+    z_up = np.full(n, Z_MAX)
+    probed = np.zeros(n, dtype=bool)
+    Aa, r1a, r2a, Fa = A, r1n, r2n, sqrt_mu_dt
+    thr = np.maximum(tol, rtol * sqrt_mu_dt)
+    rec = instrument.active()
+    n_bisect = n_newton = 0
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for it in range(maxiter):
+            if idx.size == 0:
+                break
+            C, S, dC, dS, d2C, d2S = _stumpff_d2(zs)
+            sqC = np.sqrt(C)
+            C32 = C * sqC
+            u = zs*S - 1
+            du = S + zs*dS
+            d2u = 2*dS + zs*d2S
+            y = r1a + r2a + Aa * u / sqC
+            bad = ~(y > 0)
+
+            w = y / C
+            sw, sy = np.sqrt(w), np.sqrt(y)
+            F = w*sw*S + Aa*sy - Fa
+            done = ~bad & (np.abs(F) <= thr)
+
+            # y(z), w(z) = y/C and F(z) = w^1.5 S + A√y, differentiated twice
+            dy = Aa * (du/sqC - 0.5*u*dC/C32)
+            d2y = Aa * (d2u/sqC - du*dC/C32 + 0.75*u*dC*dC/(C32*C) - 0.5*u*d2C/C32)
+            dw = (dy*C - y*dC) / (C*C)
+            d2w = (d2y*C - y*d2C) / (C*C) - 2*dC*dw/C
+            dF = 1.5*sw*dw*S + w*sw*dS + 0.5*Aa*dy/sy
+            d2F = (0.75*dw*dw*S/sw + 1.5*sw*d2w*S + 3*sw*dw*dS + w*sw*d2S
+                   + 0.5*Aa*(d2y/sy - 0.5*dy*dy/(y*sy)))
+
+            live = ~done
+            z_low = np.where(live & (bad | (F < 0)), np.maximum(z_low, zs), z_low)
+            z_up = np.where(live & ~bad & (F > 0), np.minimum(z_up, zs), z_up)
+
+            z_h = zs - 2*F*dF / (2*dF*dF - F*d2F)
+            z_n = zs - F/dF
+            ok_h = ~bad & np.isfinite(z_h) & (z_h > z_low) & (z_h < z_up)
+            ok_n = ~bad & ~ok_h & np.isfinite(z_n) & (z_n > z_low) & (z_n < z_up)
+            fallback = ~ok_h & ~ok_n
+            probe = fallback & ~probed & (z_low == Z_MIN)
+            probed |= probe
+            z_next = np.where(ok_h, z_h, np.where(ok_n, z_n, np.where(probe, Z_MIN, 0.5*(z_low + z_up))))
+            z_next = np.where(done, zs, z_next)
+            if rec is not None:
+                n_newton += int(np.count_nonzero(live & ok_n))
+                n_bisect += int(np.count_nonzero(live & fallback))
+
+            no_root = live & ~bad & (zs == Z_MIN) & (F > 0)
+            retire = done | no_root | (z_next == zs)
+            zs = np.where(no_root, Z_MIN, z_next)
+            if retire.any():
+                ridx = idx[retire]
+                z[ridx] = zs[retire]
+                iterations[ridx] = it + 1
+                converged[ridx] = done[retire]
+                keep = ~retire
+                idx, zs, z_low, z_up, thr = idx[keep], zs[keep], z_low[keep], z_up[keep], thr[keep]
+                probed, Aa, r1a, r2a, Fa = probed[keep], Aa[keep], r1a[keep], r2a[keep], Fa[keep]
+
+    z[idx] = zs
+    if rec is not None:
+        rec.count(prefix + ".bisections", n_bisect)
+        rec.count(prefix + ".newton_fallbacks", n_newton)
+    return z, iterations, converged
+
+def _geometry(R1: np.ndarray, R2: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # |r1|, |r2| and cos Δν for flat (n, 3) position arrays
+    r1n = np.sqrt(np.einsum("ij,ij->i", R1, R1))
+    r2n = np.sqrt(np.einsum("ij,ij->i", R2, R2))
+    cos_dnu = np.clip(np.einsum("ij,ij->i", R1, R2) / (r1n * r2n), -1.0, 1.0)
+    return r1n, r2n, cos_dnu
+
+def _finish(z: np.ndarray, A: np.ndarray, r1n: np.ndarray, r2n: np.ndarray,
+            R1: np.ndarray, R2: np.ndarray, sqrt_mu_dt: np.ndarray, mu: float,
+            degenerate: np.ndarray, status: np.ndarray, rtol: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Final f/g evaluation at the solved z. Updates `status` in place (MAXITER -> OK when the
+    relative residual is below rtol, INFEASIBLE when y <= 0) and returns (v1, v2), NaN on failure.
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        C, S = stumpCS_array(z)
+        y = r1n + r2n + A * (z*S - 1) / np.sqrt(C)
+        bad = ~degenerate & ~(y > 0)
+        F = np.sqrt(y / C)**3 * S + A * np.sqrt(y) - sqrt_mu_dt
+        status[(status == LAMBERT_MAXITER) & (np.abs(F) <= rtol * sqrt_mu_dt)] = LAMBERT_OK
+        status[bad] = LAMBERT_INFEASIBLE
+        ok = (status == LAMBERT_OK) | (status == LAMBERT_MAXITER)
+        rec = instrument.active()
+        if rec is not None:
+            rec.observe_log("lambert.batch.residual", F[ok] / sqrt_mu_dt[ok])
+
+        f = 1 - y / r1n
+        g = A * np.sqrt(y / mu)
+        gdot = 1 - y / r2n
+        v1 = (R2 - f[:, None]*R1) / g[:, None]
+        v2 = (gdot[:, None]*R2 - R1) / g[:, None]
+    v1[~ok] = np.nan
+    v2[~ok] = np.nan
+    return v1, v2
+
+class LambertBatchResult(NamedTuple):
+    v1: np.ndarray          # (..., 3) departure velocity (NaN where status is DEGENERATE/INFEASIBLE)
+    v2: np.ndarray          # (..., 3) arrival velocity
+    z: np.ndarray           # (...)    final universal variable
+    iterations: np.ndarray  # (...)    loop passes used (nudges count, as in the scalar loop)
+    converged: np.ndarray   # (...)    bool, status == LAMBERT_OK
+    status: np.ndarray      # (...)    int8 LAMBERT_* code
+
+@instrument.timed("lambert.batch")
+def lambert_universal_batch(r1: np.ndarray, r2: np.ndarray, dt: np.ndarray, mu: float,
+                            long_way: bool | np.ndarray = False,
+                            tol: float = 1e-8, maxiter: int = 120,
+                            rtol: float = 1e-10, chunk_size: int = 16384,
+                            z0: np.ndarray | None = None, method: str = "halley") -> LambertBatchResult:
+    """
+    Solve many single-rev Lambert problems at once with the same iteration as lambert_universal
+    (same method), so results match the scalar solver to round-off.
+    method="halley" converges in ~4 passes from z = 0 and 1-2 from a good z0 (a neighbouring
+    grid cell, see lambert_universal_grid); elements with no root in [Z_MIN, Z_MAX) are reported
+    INFEASIBLE. method="newton" is the original update rule (Newton step, bracket update,
+    bisection fallback, z += 0.1 nudge on infeasible C or y).
+    Elements whose z stops changing are retired early; this does not change their result.
+
+    Args:
+        r1, r2   : position vectors (..., 3) (m); leading dims broadcast together with dt
+        dt       : time of flight (...) (s)
+        mu       : primary GM (m^3/s^2)
+        long_way : bool or bool array (...) selecting the Δν > π branch
+        tol      : absolute residual tolerance on F (scalar solver uses 1e-8)
+        maxiter  : iteration budget (scalar solver uses 120)
+        rtol     : relative residual: halley stops once |F| <= rtol * sqrt(mu) * dt; with newton,
+                   elements that use the whole budget are still reported converged below it
+                   (F is round-off limited far above the absolute tol)
+        chunk_size : elements iterated together (keeps the working set cache-resident)
+        z0       : optional starting z (...), broadcast with the other leading dims; default 0
+        method   : "halley" or "newton" (see lambert_universal)
+    Returns:
+        LambertBatchResult with arrays shaped like the broadcast leading dims.
+    """
+    if method not in ("halley", "newton"):
+        raise ValueError(f"lambert_universal_batch: unknown method {method!r}")
+    r1 = np.asarray(r1, dtype=float)
+    r2 = np.asarray(r2, dtype=float)
+    dt = np.asarray(dt, dtype=float)
+    lw = np.asarray(long_way, dtype=bool)
+    shape = np.broadcast_shapes(r1.shape[:-1], r2.shape[:-1], dt.shape, lw.shape)
+    n = int(np.prod(shape, dtype=np.int64))
+
+    R1 = np.broadcast_to(r1, shape + (3,)).reshape(n, 3)
+    R2 = np.broadcast_to(r2, shape + (3,)).reshape(n, 3)
+    DT = np.broadcast_to(dt, shape).reshape(n)
+    LW = np.broadcast_to(lw, shape).reshape(n)
+    Z0 = np.zeros(n) if z0 is None else np.broadcast_to(np.asarray(z0, dtype=float), shape).reshape(n)
+
+    # Shared geometry
+    r1n, r2n, cos_dnu = _geometry(R1, R2)
+    dnu = np.arccos(cos_dnu)
+    dnu = np.where(LW, 2*np.pi - dnu, dnu)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        A = np.sin(dnu) * np.sqrt(r1n * r2n / (1 - np.cos(dnu)))
+    degenerate = np.isclose(A, 0.0) | ~np.isfinite(A)
+    sqrt_mu_dt = np.sqrt(mu) * DT
+
+    z = np.zeros(n)
+    iterations = np.zeros(n, dtype=np.int32)
+    status = np.full(n, LAMBERT_MAXITER, dtype=np.int8)
+    status[degenerate] = LAMBERT_DEGENERATE
+
+    # Iterate in cache-sized chunks; each chunk keeps a compacted working set
+    todo = np.flatnonzero(~degenerate)
+    for k in range(0, todo.size, chunk_size):
+        idx = todo[k:k + chunk_size]
+        if method == "halley":
+            zc, itc, okc = _halley_z(A[idx], r1n[idx], r2n[idx], sqrt_mu_dt[idx], Z0[idx], tol, rtol, maxiter)
+            status[idx[~okc & (zc <= Z_MIN)]] = LAMBERT_INFEASIBLE
+        else:
+            zc, itc, okc = _iterate_z(A[idx], r1n[idx], r2n[idx], sqrt_mu_dt[idx], tol, maxiter, Z0[idx])
+        z[idx] = zc
+        iterations[idx] = itc
+        status[idx[okc]] = LAMBERT_OK
+
+    v1, v2 = _finish(z, A, r1n, r2n, R1, R2, sqrt_mu_dt, mu, degenerate, status, rtol)
+    rec = instrument.active()
+    if rec is not None:
+        rec.count("lambert.batch.elements", n)
+        for code, label in ((LAMBERT_MAXITER, "maxiter"), (LAMBERT_DEGENERATE, "degenerate"),
+                            (LAMBERT_INFEASIBLE, "infeasible")):
+            rec.count(f"lambert.batch.{label}", int(np.count_nonzero(status == code)))
+        rec.observe_int("lambert.batch.iterations", iterations[~degenerate])
+
+    return LambertBatchResult(
+        v1=v1.reshape(shape + (3,)),
+        v2=v2.reshape(shape + (3,)),
+        z=z.reshape(shape),
+        iterations=iterations.reshape(shape),
+        converged=(status == LAMBERT_OK).reshape(shape),
+        status=status.reshape(shape),
+    )
+
+def _interp_matrix(n: int, knots: np.ndarray) -> np.ndarray:
+    # (n, len(knots)) linear-interpolation weights from values at integer positions `knots` to 0..n-1
+    return np.stack([np.interp(np.arange(n), knots, e) for e in np.eye(knots.size)], axis=1)
+
+def lambert_universal_grid(r1: np.ndarray, r2: np.ndarray, dt: np.ndarray, mu: float,
+                           long_way: bool = False, stride: int = 8, **kwargs) -> LambertBatchResult:
+    """
+    lambert_universal_batch over a 2-D (rows × cols) grid such as a porkchop block, warm-started
+    from neighbouring cells: every stride-th row and column (plus the last) is solved from z = 0,
+    the converged z of that coarse grid is bilinearly interpolated to every cell, and the full grid
+    is then solved from those seeds (coarse cells reconverge in one pass). Non-converged coarse
+    cells seed with 0. Results equal a cold lambert_universal_batch to the solver tolerance.
+    Args:
+        r1, r2, dt : broadcast to leading dims (rows, cols) as in lambert_universal_batch
+        stride     : coarse-grid spacing in cells (1 disables the warm start)
+        kwargs     : passed through to lambert_universal_batch (tol, maxiter, method, ...)
+    Returns:
+        LambertBatchResult with (rows, cols) arrays.
+    """
+    r1 = np.asarray(r1, dtype=float)
+    r2 = np.asarray(r2, dtype=float)
+    dt = np.asarray(dt, dtype=float)
+    shape = np.broadcast_shapes(r1.shape[:-1], r2.shape[:-1], dt.shape)
+    if len(shape) != 2:
+        raise ValueError("lambert_universal_grid: leading dims must broadcast to (rows, cols)")
+    if stride <= 1 or min(shape) < 3:
+        return lambert_universal_batch(r1, r2, dt, mu, long_way=long_way, **kwargs)
+    R1 = np.broadcast_to(r1, shape + (3,))
+    R2 = np.broadcast_to(r2, shape + (3,))
+    DT = np.broadcast_to(dt, shape)
+    ri = np.unique(np.r_[0:shape[0]:stride, shape[0] - 1])
+    ci = np.unique(np.r_[0:shape[1]:stride, shape[1] - 1])
+    sub = np.ix_(ri, ci)
+    coarse = lambert_universal_batch(R1[sub], R2[sub], DT[sub], mu, long_way=long_way, **kwargs)
+    zc = np.where(coarse.converged, coarse.z, 0.0)
+    z0 = _interp_matrix(shape[0], ri) @ zc @ _interp_matrix(shape[1], ci).T
+    return lambert_universal_batch(R1, R2, DT, mu, long_way=long_way, z0=z0, **kwargs)
+
+# ================================
+# Multi-rev Lambert (branch enumeration)
+# ================================
+def _tof_psi(psi: np.ndarray, A: np.ndarray, r1n: np.ndarray, r2n: np.ndarray) -> np.ndarray:
+    """sqrt(mu)·t as a function of psi = sqrt(z) (z > 0), the same expression the z-iteration zeroes."""
+    # psi > 0 throughout, so the Stumpff functions reduce to their trigonometric branch:
+    # C = (1 - cos psi)/psi², S = (psi - sin psi)/psi³, zS - 1 = -sin(psi)/psi
+    sn = np.sin(psi)
+    C = (1 - np.cos(psi)) / (psi * psi)
+    S = (psi - sn) / psi**3
+    y = r1n + r2n - A * (sn / psi) / np.sqrt(C)
+    return np.sqrt(y / C)**3 * S + A * np.sqrt(y)
+
+class LambertMultiRevResult(NamedTuple):
+    v1: np.ndarray        # (..., K, 3) departure velocity per branch (NaN where the branch does not exist)
+    v2: np.ndarray        # (..., K, 3) arrival velocity per branch
+    z: np.ndarray         # (..., K)    universal variable per branch
+    tof_min: np.ndarray   # (..., K)    minimum time of flight of the branch's revolution count (s; 0 for N = 0)
+    converged: np.ndarray # (..., K)    bool, status == LAMBERT_OK
+    status: np.ndarray    # (..., K)    int8 LAMBERT_* code (INFEASIBLE: dt below tof_min or N above the bound)
+    revs: np.ndarray      # (K,)        complete revolutions N of each branch
+    long_way: np.ndarray  # (K,)        Δν > π geometry
+    high_z: np.ndarray    # (K,)        right (higher-energy z) solution of an N >= 1 pair
+
+@instrument.timed("lambert.multirev")
+def lambert_multirev(r1: np.ndarray, r2: np.ndarray, dt: np.ndarray, mu: float,
+                     max_revs: int = 2, both_ways: bool = True,
+                     tol: float = 1e-8, maxiter: int = 120, rtol: float = 1e-10,
+                     golden_iter: int = 40, bisect_iter: int = 52) -> LambertMultiRevResult:
+    """
+    Solve every feasible Lambert branch up to max_revs complete revolutions.
+    Branches are laid out on a fixed trailing axis of K = (1 + 2*max_revs) * (2 if both_ways else 1):
+    for each direction (short way first), the zero-rev solution followed by the (low-z, high-z)
+    pair of every N = 1..max_revs. The geometry (|r1|, |r2|, cos Δν, A) is computed once; the
+    long-way geometry reuses it with A -> -A.
+    Zero-rev branches use the lambert_universal_batch (Halley) iteration. For N >= 1 the time of
+    flight is unimodal in psi = sqrt(z) on (2πN, 2π(N+1)): its minimum is found once by golden
+    section and shared by both solutions, which are then bracketed and bisected to round-off. Work is
+    bounded up front: an N-rev transfer takes longer than N periods of the minimum-energy ellipse,
+    so N is only searched where dt exceeds that bound, and the golden-section / bisection passes
+    have fixed counts.
+    Args:
+        r1, r2      : position vectors (..., 3) (m); leading dims broadcast together with dt
+        dt          : time of flight (...) (s)
+        mu          : primary GM (m^3/s^2)
+        max_revs    : largest revolution count searched
+        both_ways   : also enumerate the Δν > π geometry
+        tol, maxiter, rtol : zero-rev iteration settings (as in lambert_universal_batch); rtol is
+                      also the relative residual accepted for N >= 1 branches
+        golden_iter : golden-section passes for the minimum-TOF psi (bracket shrinks by 0.618 each)
+        bisect_iter : bisection passes for N >= 1 branches (52 reaches round-off in psi)
+    Returns:
+        LambertMultiRevResult
+    """
+    r1 = np.asarray(r1, dtype=float)
+    r2 = np.asarray(r2, dtype=float)
+    dt = np.asarray(dt, dtype=float)
+    shape = np.broadcast_shapes(r1.shape[:-1], r2.shape[:-1], dt.shape)
+    n = int(np.prod(shape, dtype=np.int64))
+    R1 = np.broadcast_to(r1, shape + (3,)).reshape(n, 3)
+    R2 = np.broadcast_to(r2, shape + (3,)).reshape(n, 3)
+    DT = np.broadcast_to(dt, shape).reshape(n)
+
+    # Shared geometry (short way); the long way has the same |A| with the opposite sign
+    r1n, r2n, cos_dnu = _geometry(R1, R2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        A0 = np.sqrt(1 - cos_dnu**2) * np.sqrt(r1n * r2n / (1 - cos_dnu))
+    degenerate = np.isclose(A0, 0.0) | ~np.isfinite(A0)
+    sqrt_mu_dt = np.sqrt(mu) * DT
+    # minimum-energy ellipse period bounds the revolutions that fit in dt
+    chord = np.sqrt(np.maximum(r1n**2 + r2n**2 - 2 * r1n * r2n * cos_dnu, 0.0))
+    a_m = 0.25 * (r1n + r2n + chord)
+    n_fit = np.floor(DT / (2 * np.pi * np.sqrt(a_m**3 / mu))).astype(np.int64)
+
+    signs = (1.0, -1.0) if both_ways else (1.0,)
+    per_dir = 1 + 2 * max_revs
+    K = per_dir * len(signs)
+    revs = np.tile(np.concatenate([[0], np.repeat(np.arange(1, max_revs + 1), 2)]), len(signs))
+    high_z = np.tile(np.concatenate([[False], np.tile([False, True], max_revs)]), len(signs))
+    long_way = np.repeat([sg < 0 for sg in signs], per_dir)
+
+    z = np.zeros((n, K))
+    tof_min = np.zeros((n, K))
+    status = np.full((n, K), LAMBERT_INFEASIBLE, dtype=np.int8)
+    v1 = np.full((n, K, 3), np.nan)
+    v2 = np.full((n, K, 3), np.nan)
+    gr = 0.5 * (np.sqrt(5.0) - 1.0)
+
+    for d, sg in enumerate(signs):
+        A = sg * A0
+        k0 = d * per_dir
+
+        # N = 0: the single-rev iteration on the shared geometry
+        st = np.full(n, LAMBERT_MAXITER, dtype=np.int8)
+        st[degenerate] = LAMBERT_DEGENERATE
+        idx = np.flatnonzero(~degenerate)
+        if idx.size:
+            zc, _, okc = _halley_z(A[idx], r1n[idx], r2n[idx], sqrt_mu_dt[idx], np.zeros(idx.size),
+                                   tol, rtol, maxiter)
+            z[idx, k0] = zc
+            st[idx[~okc & (zc <= Z_MIN)]] = LAMBERT_INFEASIBLE
+            st[idx[okc]] = LAMBERT_OK
+        v1[:, k0], v2[:, k0] = _finish(z[:, k0], A, r1n, r2n, R1, R2, sqrt_mu_dt, mu, degenerate, st, rtol)
+        status[:, k0] = st
+
+        for N in range(1, max_revs + 1):
+            kl, kh = k0 + 2 * N - 1, k0 + 2 * N
+            status[degenerate, kl] = status[degenerate, kh] = LAMBERT_DEGENERATE
+            idx = np.flatnonzero(~degenerate & (n_fit >= N))
+            if idx.size == 0:
+                continue
+            Ai, r1i, r2i, target = A[idx], r1n[idx], r2n[idx], sqrt_mu_dt[idx]
+
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                # golden-section search for the minimum-TOF psi of this revolution count
+                lo = np.full(idx.size, 2 * np.pi * N)
+                hi = lo + 2 * np.pi
+                c = hi - gr * (hi - lo)
+                e = lo + gr * (hi - lo)
+                fc, fe = _tof_psi(c, Ai, r1i, r2i), _tof_psi(e, Ai, r1i, r2i)
+                for _ in range(golden_iter):
+                    left = fc < fe
+                    hi = np.where(left, e, hi)
+                    lo = np.where(left, lo, c)
+                    e_new = np.where(left, c, lo + gr * (hi - lo))
+                    c_new = np.where(left, hi - gr * (hi - lo), e)
+                    c, e = c_new, e_new
+                    moved = np.where(left, c, e)
+                    f_moved = _tof_psi(moved, Ai, r1i, r2i)
+                    fc, fe = np.where(left, f_moved, fe), np.where(left, fc, f_moved)
+                psi_min = 0.5 * (lo + hi)
+                t_min = _tof_psi(psi_min, Ai, r1i, r2i)
+                tof_min[idx, kl] = tof_min[idx, kh] = t_min / np.sqrt(mu)
+
+                reach = target >= t_min
+                jdx = np.flatnonzero(reach)
+                if jdx.size == 0:
+                    continue
+                # both solutions in one bisection batch: low-z on (2πN, psi_min) where TOF decreases,
+                # high-z on (psi_min, 2π(N+1)) where it increases
+                m = jdx.size
+                b_lo = np.concatenate([np.full(m, 2 * np.pi * N), psi_min[jdx]])
+                b_hi = np.concatenate([psi_min[jdx], np.full(m, 2 * np.pi * (N + 1))])
+                slope = np.concatenate([np.full(m, -1.0), np.ones(m)])
+                Ab, r1b, r2b = np.tile(Ai[jdx], 2), np.tile(r1i[jdx], 2), np.tile(r2i[jdx], 2)
+                tb = np.tile(target[jdx], 2)
+                for _ in range(bisect_iter):
+                    mid = 0.5 * (b_lo + b_hi)
+                    above = slope * (_tof_psi(mid, Ab, r1b, r2b) - tb) > 0
+                    b_hi = np.where(above, mid, b_hi)
+                    b_lo = np.where(above, b_lo, mid)
+                psi = 0.5 * (b_lo + b_hi)
+
+            rows = np.concatenate([idx[jdx], idx[jdx]])
+            cols = np.concatenate([np.full(m, kl), np.full(m, kh)])
+            zb = psi * psi
+            st = np.full(2 * m, LAMBERT_MAXITER, dtype=np.int8)
+            vb1, vb2 = _finish(zb, Ab, r1b, r2b, R1[rows], R2[rows], tb, mu,
+                               np.zeros(2 * m, dtype=bool), st, rtol)
+            z[rows, cols] = zb
+            status[rows, cols] = st
+            v1[rows, cols], v2[rows, cols] = vb1, vb2
+
+    out = shape + (K,)
+    return LambertMultiRevResult(
+        v1=v1.reshape(out + (3,)),
+        v2=v2.reshape(out + (3,)),
+        z=z.reshape(out),
+        tof_min=tof_min.reshape(out),
+        converged=(status == LAMBERT_OK).reshape(out),
+        status=status.reshape(out),
+        revs=revs,
+        long_way=long_way,
+        high_z=high_z,
+    )
+
+__all__ = [
+    "stumpC", "stumpS", "stumpCS_array",
+    "lambert_universal", "lambert_universal_batch", "lambert_universal_grid", "LambertBatchResult",
+    "lambert_multirev", "LambertMultiRevResult",
+    "LAMBERT_OK", "LAMBERT_MAXITER", "LAMBERT_DEGENERATE", "LAMBERT_INFEASIBLE", "Z_MIN", "Z_MAX",
+]
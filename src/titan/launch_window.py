@@ -0,0 +1,164 @@
+"""
+Local launch-window optimizer over (departure epoch, time of flight).
+Minimizes the porkchop departure Δv from LEO with a finite-difference Newton iteration: each
+iteration evaluates a 9-point stencil and a set of trial step lengths as single Lambert batches.
+Seeds come from a coarse porkchop grid or from the Hohmann estimate.
+Usage:
+    from titan.launch_window import optimize_launch_window
+"""
+from __future__ import annotations
+import time
+import numpy as np
+from typing import NamedTuple, Tuple
+from .constants import mu_sun, a_earth, a_saturn
+from .porkchop import DAY, circ_pos_vel, solve_cells, solve_points
+from .transfers import hohmann_dv
+
+class LaunchWindowOptimum(NamedTuple):
+    t_dep: float      # departure epoch (s)
+    tof: float        # time of flight (s)
+    dv_leo: float     # departure Δv from LEO (m/s)
+    vinf_dep: float   # departure v∞ (m/s)
+    vinf_arr: float   # arrival v∞ (m/s)
+    nfev: int         # (t_dep, tof) points evaluated, seed included
+    nit: int          # Newton iterations
+    wall_time: float  # seconds
+    converged: bool   # stencil shrank below xtol (or Δv change below ftol)
+
+def hohmann_seed(dep_range: Tuple[float, float], a_dep: float = a_earth, a_arr: float = a_saturn,
+                 mu: float = mu_sun) -> Tuple[float, float]:
+    """
+    (t_dep, tof) of the first Hohmann-phased departure at or after dep_range[0], for the
+    circular orbits of porkchop.circ_pos_vel (both bodies at phase 0 when t = 0).
+    """
+    _, _, tof = hohmann_dv(a_dep, a_arr, mu)
+    n_dep, n_arr = np.sqrt(mu / a_dep**3), np.sqrt(mu / a_arr**3)
+    # arrival body must lead by π - n_arr*tof at departure: (n_arr - n_dep) t = lead (mod 2π)
+    lead = np.pi - n_arr * tof
+    rate = n_arr - n_dep
+    period = 2.0 * np.pi / abs(rate)
+    t = lead / rate
+    t = t + np.ceil((dep_range[0] - t) / period) * period
+    return float(t), float(tof)
+
+def grid_seed(dep_range: Tuple[float, float], tof_range: Tuple[float, float],
+              shape: Tuple[int, int] = (12, 48), **kwargs) -> Tuple[float, float, int]:
+    """(t_dep, tof, nfev) of the best node of a coarse (n_tof, n_dep) porkchop grid."""
+    t = np.linspace(dep_range[0], dep_range[1], shape[1])
+    tof = np.linspace(tof_range[0], tof_range[1], shape[0])
+    dv = solve_cells(t, tof, **kwargs)[0]
+    if not np.isfinite(dv).any():
+        raise RuntimeError("grid_seed: no feasible cell on the seed grid")
+    i, j = np.unravel_index(np.nanargmin(dv), dv.shape)
+    return float(t[j]), float(tof[i]), dv.size
+
+def optimize_launch_window(dep_range: Tuple[float, float], tof_range: Tuple[float, float],
+                           seed: str | Tuple[float, float] = "grid",
+                           a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                           use_long_way: bool = True, leo_alt_km: float = 300.0,
+                           h0: float = 10.0 * DAY, xtol: float = 60.0, ftol: float = 1e-3,
+                           maxiter: int = 100, dnu_guard: float = 1e-4) -> LaunchWindowOptimum:
+    """
+    Refine the minimum departure Δv inside dep_range × tof_range.
+    Args:
+        dep_range, tof_range : search box (s); iterates are clipped to it
+        seed         : "grid" (coarse porkchop), "hohmann" (phased Hohmann estimate), or (t_dep, tof)
+        use_long_way : consider both Lambert branches (default True: the short-way-only surface
+                       has a cliff at Δν = π, right where the Hohmann-like optimum sits)
+        h0           : initial finite-difference / pattern step (s)
+        xtol         : stop once the stencil step falls below this (s)
+        ftol         : ... or a Newton step improves Δv by less than this (m/s)
+        maxiter      : iteration cap
+        dnu_guard    : points whose transfer angle is within this of π (rad) count as infeasible;
+                       the f/g velocities are ill-conditioned there (A → 0) and show
+                       sub-Hohmann Δv artifacts of a few m/s that the optimizer would chase
+        a_dep, a_arr, mu, leo_alt_km : as in porkchop.sweep_porkchop
+    Returns:
+        LaunchWindowOptimum
+    """
+    start = time.perf_counter()
+    kwargs = dict(a_dep=a_dep, a_arr=a_arr, mu=mu, use_long_way=use_long_way, leo_alt_km=leo_alt_km)
+    lo = np.array([dep_range[0], tof_range[0]], dtype=float)
+    hi = np.array([dep_range[1], tof_range[1]], dtype=float)
+    nfev = 0
+
+    if isinstance(seed, str) and seed == "grid":
+        t0, tof0, nfev = grid_seed(dep_range, tof_range, **kwargs)
+    elif isinstance(seed, str) and seed == "hohmann":
+        t0, tof0 = hohmann_seed(dep_range, a_dep, a_arr, mu)
+    elif isinstance(seed, str):
+        raise ValueError(f"optimize_launch_window: unknown seed {seed!r}")
+    else:
+        t0, tof0 = seed
+    x = np.clip([t0, tof0], lo, hi)
+
+    def evaluate(pts: np.ndarray) -> np.ndarray:
+        nonlocal nfev
+        nfev += len(pts)
+        with np.errstate(invalid="ignore"):
+            f = solve_points(pts[:, 0], pts[:, 1], **kwargs)[0]
+        r1, _ = circ_pos_vel(a_dep, pts[:, 0], mu)
+        r2, _ = circ_pos_vel(a_arr, pts[:, 0] + pts[:, 1], mu)
+        gap = np.arctan2(np.linalg.norm(np.cross(r1, r2), axis=-1), -np.einsum("ij,ij->i", r1, r2))
+        return np.where(np.isfinite(f) & (gap > dnu_guard), f, np.inf)
+
+    f = float(evaluate(x[None, :])[0])
+    h = float(h0)
+    # 9-point stencil offsets in units of h: centre, ±e1, ±e2, and the four diagonals
+    offs = np.array([[0, 0], [1, 0], [-1, 0], [0, 1], [0, -1], [1, 1], [1, -1], [-1, 1], [-1, -1]], dtype=float)
+    alphas = np.array([1.0, 0.5, 0.25, 0.125, 0.0625])
+    converged = False
+    nit = 0
+
+    Q = np.eye(2)  # stencil axes; re-aligned with the Hessian eigenvectors every iteration
+    for nit in range(1, maxiter + 1):
+        pts = np.clip(x + h * offs @ Q.T, lo, hi)
+        fs = evaluate(pts[1:])
+        fs = np.concatenate([[f], fs])
+
+        if np.all(np.isfinite(fs)):
+            # central differences in the stencil frame
+            g = np.array([fs[1] - fs[2], fs[3] - fs[4]]) / (2 * h)
+            H = np.empty((2, 2))
+            H[0, 0] = (fs[1] - 2 * f + fs[2]) / h**2
+            H[1, 1] = (fs[3] - 2 * f + fs[4]) / h**2
+            H[0, 1] = H[1, 0] = (fs[5] - fs[6] - fs[7] + fs[8]) / (4 * h**2)
+            w, V = np.linalg.eigh(H)
+            if np.all(w > 0):
+                p = -np.linalg.solve(H, g)
+            else:
+                p = -g * (h / max(np.linalg.norm(g), 1e-300))
+            trials = np.clip(x + alphas[:, None] * (Q @ p), lo, hi)
+            ft = evaluate(trials)
+            k = int(np.argmin(ft))
+            cand_x, cand_f = trials[k], ft[k]
+            # valleys (e.g. the Δν = π crease) run along the low-curvature eigenvector
+            Q = Q @ V
+        else:
+            cand_x, cand_f = x, np.inf
+
+        # fall back to the best stencil point (pattern search) when Newton does not improve
+        ks = int(np.argmin(fs))
+        if fs[ks] < min(cand_f, f):
+            cand_x, cand_f = pts[ks], fs[ks]
+
+        if cand_f < f:
+            step = np.linalg.norm(cand_x - x)
+            gain = f - cand_f
+            x, f = cand_x, float(cand_f)
+            h = min(h, max(step, xtol))  # shrink the stencil toward the local scale
+            if gain < ftol and step < xtol:
+                converged = True
+                break
+        else:
+            h *= 0.25
+            if h < xtol:
+                converged = True
+                break
+
+    dv, vd, va = solve_points(x[0], x[1], **kwargs)
+    nfev += 1
+    return LaunchWindowOptimum(float(x[0]), float(x[1]), float(dv), float(vd), float(va),
+                               nfev, nit, time.perf_counter() - start, converged)
+
+__all__ = ["LaunchWindowOptimum", "optimize_launch_window", "hohmann_seed", "grid_seed"]
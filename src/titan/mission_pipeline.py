@@ -0,0 +1,211 @@
+"""
+End-to-end Earth → Saturn → Titan pipeline. Each porkchop tile is streamed through the
+downstream stages as whole arrays, so no per-cell hand-off is needed:
+  1. heliocentric transfer  : departure Δv from LEO and arrival v∞ (porkchop.iter_porkchop)
+  2. Titan flyby on approach: the approach hyperbola (periapsis rp_soi) crosses Titan's orbit with a
+                              Saturn-relative speed and flight-path angle set by v∞; both feed
+                              titan_flyby.post_flyby_vinf_saturn
+  3. Saturn orbit insertion : periapsis burn at rp_soi with the post-flyby orbital energy onto the
+                              capture ellipse (rp_soi, ra_capture)
+The joint cost is dv_leo + dv_soi. Departure columns are grouped into launch opportunities (one
+Earth–Saturn synodic period each, centred on the Hohmann-phased departure), and the best cell of
+every opportunity is kept. The flyby is patched at Titan's orbit and assumed not to move the
+Saturn periapsis (quick-look accuracy).
+Usage:
+    from titan.mission_pipeline import run_pipeline, iter_pipeline, ArrivalPlan
+    result = run_pipeline(t_dep, tof, ArrivalPlan(h_flyby=1500e3))
+    result.opportunities[0].total_dv, result.surface(0)
+"""
+from __future__ import annotations
+import numpy as np
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+from .constants import mu_sun, mu_saturn, a_earth, a_saturn, a_titan
+from .launch_window import hohmann_seed
+from .porkchop import PorkchopTile, iter_porkchop
+from .porkchop_export import block_rows
+from .titan_flyby import post_flyby_vinf_saturn
+
+R_SATURN = 60_268_000.0  # Saturn equatorial radius [m]
+
+class ArrivalPlan(NamedTuple):
+    rp_soi: float = 1.3 * R_SATURN        # approach / SOI periapsis radius (m), inside Titan's orbit
+    ra_capture: float = 180.0 * R_SATURN  # capture-orbit apoapsis radius (m)
+    h_flyby: float = 1000e3               # Titan flyby periapsis altitude (m)
+    prograde: bool = True                 # flyby turn direction (as in post_flyby_vinf_saturn);
+                                          # prograde lowers the Saturn-relative speed on approach
+
+# Per-cell pipeline outputs (m/s, rad), in stage order
+FIELDS = ("dv_leo", "vinf_arr", "v_titan", "psi", "vinf_titan", "turn_angle", "vinf_saturn_out",
+          "dv_soi", "total_dv")
+
+# ================================
+# Stages
+# ================================
+def approach_state_at(vinf_arr: np.ndarray, r: float, rp: float,
+                      mu: float = mu_saturn) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (speed, flight-path angle) at radius r >= rp on the inbound approach hyperbola with excess speed
+    vinf_arr and periapsis rp. The angle is negative (inbound); its magnitude is also the angle
+    between the spacecraft velocity and a circular body's velocity at r.
+    """
+    v = np.sqrt(np.square(vinf_arr) + 2.0 * mu / r)
+    h = rp * np.sqrt(np.square(vinf_arr) + 2.0 * mu / rp)
+    gamma = np.arccos(np.minimum(1.0, h / (r * v)))
+    return v, -gamma
+
+def titan_stage(v_titan: np.ndarray, psi: np.ndarray, h_flyby: float,
+                prograde: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Titan flyby for Saturn-relative speeds v_titan at alignment angles psi.
+    Returns:
+        (vinf_titan, turn_angle, vinf_saturn_out): Titan-relative v∞, turn angle δ and the
+        Saturn-relative speed after the flyby (m/s, rad, m/s).
+    """
+    v_out, vinf_t, delta = post_flyby_vinf_saturn(v_titan, psi, h_flyby, prograde=prograde)
+    return vinf_t, delta, v_out
+
+def saturn_insertion(v: np.ndarray, rp: float, ra: float, r: float = np.inf,
+                     mu: float = mu_saturn) -> np.ndarray:
+    """
+    Impulsive SOI Δv at periapsis rp for a trajectory with speed v at radius r (r = inf: v is the
+    approach v∞) onto the capture ellipse (rp, ra). Zero where the trajectory is already at or
+    below the capture energy.
+    """
+    v_p = np.sqrt(np.square(v) + 2.0 * mu / rp - (0.0 if np.isinf(r) else 2.0 * mu / r))
+    return np.maximum(v_p - np.sqrt(2.0 * mu * ra / (rp * (rp + ra))), 0.0)
+
+# ================================
+# Streaming driver
+# ================================
+class PipelineTile(NamedTuple):
+    tof_slice: slice
+    dep_slice: slice
+    fields: Dict[str, np.ndarray]  # FIELDS -> (rows, cols) arrays
+    branch: np.ndarray             # (rows, cols) int8 porkchop.BRANCH_* of the heliocentric leg
+
+def _downstream(tile: PorkchopTile, plan: ArrivalPlan) -> PipelineTile:
+    # Stages 2-3 on one heliocentric tile; every stage is a handful of array operations
+    v_titan, psi = approach_state_at(tile.vinf_arr, a_titan, plan.rp_soi)
+    vinf_t, delta, v_out = titan_stage(v_titan, psi, plan.h_flyby, plan.prograde)
+    dv_soi = saturn_insertion(v_out, plan.rp_soi, plan.ra_capture, r=a_titan)
+    dv_soi = np.where(np.isfinite(v_out), dv_soi, np.nan)
+    fields = dict(dv_leo=tile.dv_leo, vinf_arr=tile.vinf_arr, v_titan=v_titan, psi=psi, vinf_titan=vinf_t,
+                  turn_angle=delta, vinf_saturn_out=v_out, dv_soi=dv_soi, total_dv=tile.dv_leo + dv_soi)
+    return PipelineTile(tile.tof_slice, tile.dep_slice, fields, tile.branch)
+
+def iter_pipeline(t_dep: np.ndarray, tof: np.ndarray, plan: ArrivalPlan = ArrivalPlan(),
+                  a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                  use_long_way: bool = True, leo_alt_km: float = 300.0,
+                  tile: Tuple[int, int] = (256, 256), workers: int | None = 1) -> Iterator[PipelineTile]:
+    """
+    Yield a PipelineTile for each porkchop tile as soon as all stages have run on it (tile order as
+    in iter_porkchop). Memory is one tile per stage in flight. Sweep args as in porkchop.sweep_porkchop.
+    """
+    if not plan.rp_soi <= a_titan:
+        raise ValueError("iter_pipeline: the approach must cross Titan's orbit (rp_soi <= a_titan)")
+    for t in iter_porkchop(t_dep, tof, a_dep, a_arr, mu, use_long_way, leo_alt_km, tile, workers):
+        yield _downstream(t, plan)
+
+def pipeline_rows(t_dep: np.ndarray, tof: np.ndarray, tile: PipelineTile,
+                  opportunity: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+    """
+    Column chunk of one PipelineTile for porkchop_export writers (t_dep, tof, FIELDS, branch and,
+    if given, the opportunity index of each departure column).
+    """
+    blocks = dict(tile.fields, branch=tile.branch)
+    if opportunity is not None:
+        blocks["opportunity"] = np.broadcast_to(opportunity[tile.dep_slice], tile.branch.shape)
+    return block_rows(t_dep, tof, tile.tof_slice, tile.dep_slice, blocks)
+
+# Column schema of pipeline_rows for porkchop_export.ColumnWriter
+COLUMNS = dict({"t_dep": ("<f8", "s"), "tof": ("<f8", "s")},
+               **{name: ("<f8", "rad" if name in ("psi", "turn_angle") else "m/s") for name in FIELDS},
+               branch=("i1", "porkchop.BRANCH_*"), opportunity=("<i4", "index"))
+
+# ================================
+# Launch opportunities
+# ================================
+def opportunity_index(t_dep: np.ndarray, a_dep: float = a_earth, a_arr: float = a_saturn,
+                      mu: float = mu_sun) -> Tuple[np.ndarray, float, float]:
+    """
+    Launch opportunity of each departure epoch: opportunities are synodic periods centred on the
+    Hohmann-phased departures of the circular orbits (porkchop phasing), numbered from 0 at the
+    first departure.
+    Returns:
+        (index (n_dep,) int, centre of opportunity 0 (s), synodic period (s))
+    """
+    t_dep = np.asarray(t_dep, dtype=float)
+    period = 2.0 * np.pi / abs(np.sqrt(mu / a_dep**3) - np.sqrt(mu / a_arr**3))
+    t_c, _ = hohmann_seed((t_dep.min() - 0.5 * period, t_dep.max()), a_dep, a_arr, mu)
+    return np.floor((t_dep - t_c) / period + 0.5).astype(int), t_c, period
+
+class Opportunity(NamedTuple):
+    index: int         # opportunity number
+    columns: slice     # departure columns of the grid in this opportunity
+    total_dv: float    # best joint cost dv_leo + dv_soi (m/s), NaN if no feasible cell
+    t_dep: float       # departure epoch of the best cell (s)
+    tof: float         # time of flight of the best cell (s)
+    cell: Dict[str, float]  # every FIELDS value at the best cell
+
+class PipelineResult(NamedTuple):
+    t_dep: np.ndarray
+    tof: np.ndarray
+    plan: ArrivalPlan
+    grids: Dict[str, np.ndarray]      # FIELDS -> (n_tof, n_dep) arrays
+    opportunity: np.ndarray           # (n_dep,) opportunity number per departure column
+    opportunities: List[Opportunity]
+
+    def surface(self, k: int, field: str = "total_dv") -> np.ndarray:
+        """(n_tof, n_cols) view of one field over opportunity k's departure columns."""
+        return self.grids[field][:, self.opportunities[k].columns]
+
+def run_pipeline(t_dep: np.ndarray, tof: np.ndarray, plan: ArrivalPlan = ArrivalPlan(),
+                 a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                 use_long_way: bool = True, leo_alt_km: float = 300.0,
+                 tile: Tuple[int, int] = (256, 256), workers: int | None = 1,
+                 writer=None) -> PipelineResult:
+    """
+    Run iter_pipeline over the whole grid, assemble the per-field cost surfaces and pick the best
+    cell of every launch opportunity.
+    Args:
+        t_dep, tof : grid axes (s), sorted ascending; sweep args as in porkchop.sweep_porkchop
+        plan       : ArrivalPlan for the SOI and Titan flyby stages
+        writer     : optional porkchop_export ColumnWriter(..., COLUMNS) or CsvWriter; every tile is
+                     also streamed to it as pipeline_rows. It is closed at the end, or aborted
+                     if the run fails
+    Returns:
+        PipelineResult
+    """
+    t_dep = np.asarray(t_dep, dtype=float)
+    tof = np.asarray(tof, dtype=float)
+    opp, _, _ = opportunity_index(t_dep, a_dep, a_arr, mu)
+    opp -= opp[0]
+    shape = (tof.size, t_dep.size)
+    grids = {name: np.full(shape, np.nan) for name in FIELDS}
+    with writer if writer is not None else nullcontext():
+        for pt in iter_pipeline(t_dep, tof, plan, a_dep, a_arr, mu, use_long_way, leo_alt_km, tile, workers):
+            for name in FIELDS:
+                grids[name][pt.tof_slice, pt.dep_slice] = pt.fields[name]
+            if writer is not None:
+                writer.append(pipeline_rows(t_dep, tof, pt, opp))
+
+    # t_dep is sorted, so each opportunity is a contiguous run of columns
+    opportunities = []
+    starts = np.flatnonzero(np.diff(opp, prepend=opp[0] - 1))
+    for k, (j0, j1) in enumerate(zip(starts.tolist(), np.append(starts[1:], opp.size).tolist())):
+        cost = grids["total_dv"][:, j0:j1]
+        if np.isfinite(cost).any():
+            i, j = np.unravel_index(np.nanargmin(cost), cost.shape)
+            cell = {name: float(grids[name][i, j0 + j]) for name in FIELDS}
+            opportunities.append(Opportunity(k, slice(j0, j1), cell["total_dv"], float(t_dep[j0 + j]),
+                                             float(tof[i]), cell))
+        else:
+            opportunities.append(Opportunity(k, slice(j0, j1), np.nan, np.nan, np.nan, {}))
+    return PipelineResult(t_dep, tof, plan, grids, opp, opportunities)
+
+__all__ = [
+    "R_SATURN", "ArrivalPlan", "FIELDS", "COLUMNS", "approach_state_at", "titan_stage", "saturn_insertion",
+    "PipelineTile", "iter_pipeline", "pipeline_rows", "opportunity_index",
+    "Opportunity", "PipelineResult", "run_pipeline",
+]
@@ -1,12 +1,13 @@
 """
 Simple patched-conics helpers for Saturn/Titan arrival quick-look.
 Usage:
-    from patched_conics import arrival_vinf_heliocentric, titan_relative_vinf_bounds
+    from titan.patched_conics import arrival_vinf_heliocentric, titan_relative_vinf_bounds
 """
 from __future__ import annotations
 import numpy as np
 from typing import Tuple
-from constants import mu_sun, mu_saturn, a_titan, circ_speed
+from .constants import mu_sun, mu_saturn, a_titan, circ_speed, circ_speed_array
+from .transfers import vis_viva_array
 
 def arrival_vinf_heliocentric(r_arrive: float, a_transfer: float, mu: float = mu_sun) -> float:
     """
@@ -22,6 +23,16 @@ def arrival_vinf_heliocentric(r_arrive: float, a_transfer: float, mu: float = mu
     v_planet = np.sqrt(mu / r_arrive)                         # planet circular speed
     return float(abs(v_sc - v_planet))
 
+def arrival_vinf_heliocentric_array(r_arrive: float | np.ndarray, a_transfer: float | np.ndarray,
+                                    mu: float | np.ndarray = mu_sun) -> np.ndarray:
+    """
+    Array version of arrival_vinf_heliocentric: broadcasts r_arrive, a_transfer and mu.
+    NaN where the transfer ellipse does not reach r_arrive.
+    """
+    v = vis_viva_array(mu, r_arrive, a_transfer)
+    v -= circ_speed_array(mu, r_arrive)
+    return np.abs(v, out=v)
+
 def titan_relative_vinf_bounds(vinf_saturn: float) -> Tuple[float, float]:
     """
     Crude bounds on Titan-relative v∞ given Saturn-relative v∞ (vector-add/sub Titan orbital speed).
@@ -36,4 +47,4 @@ def titan_relative_vinf_bounds(vinf_saturn: float) -> Tuple[float, float]:
     vmax = vinf_saturn + v_titan
     return float(vmin), float(vmax)
 
-__all__ = ["arrival_vinf_heliocentric", "titan_relative_vinf_bounds"]
+__all__ = ["arrival_vinf_heliocentric", "arrival_vinf_heliocentric_array", "titan_relative_vinf_bounds"]
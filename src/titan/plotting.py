@@ -0,0 +1,211 @@
+"""
+Plot helpers: Earth→Saturn Hohmann quick-look and porkchop rendering for grids of any size.
+matplotlib is imported when a plot is drawn, not when this module is imported.
+Porkchop arrays (in memory or PorkchopStore memmaps) are read in row strips: they are block-reduced
+to display resolution, contour levels come from a streaming quantile sketch, and contours are
+drawn once on numeric (Matplotlib date-number) axes, so render time and memory follow the display
+size rather than the grid size.
+Usage:
+    from titan.plotting import plot_hohmann_orbits
+    from titan.plotting import plot_porkchop, streaming_levels, column_minima
+"""
+from __future__ import annotations
+import numpy as np
+from datetime import datetime
+from typing import Iterator, Tuple
+from .stats import StreamingStats
+
+DAY  = 86400.0
+YEAR = 365.25 * DAY
+_STRIP_CELLS = 1 << 22  # cells read per strip (32 MB of float64)
+
+def plot_hohmann_orbits(r1: float, r2: float, a_t: float, fname: str | None = None) -> None:
+    """
+    Plot two circular orbits of radii r1 and r2 and the Hohmann transfer ellipse between them.
+
+    Args:
+        r1, r2 : initial and final circular-orbit radii (m)
+        a_t    : transfer ellipse semi-major axis (m)
+        fname  : optional path to save the figure (PNG)
+    """
+    import matplotlib.pyplot as plt
+
+    # Circles for the two orbits
+    th = np.linspace(0.0, 2.0 * np.pi, 600)
+    x1, y1 = r1 * np.cos(th), r1 * np.sin(th)
+    x2, y2 = r2 * np.cos(th), r2 * np.sin(th)
+
+    # Transfer ellipse in polar form: r(θ) = a(1-e^2)/(1 + e cos θ), periapsis at +x
+    e = abs(r2 - r1) / (r1 + r2)
+    th_t = np.linspace(0.0, np.pi, 400)  # half-ellipse from periapsis to apoapsis
+    r_theta = a_t * (1.0 - e**2) / (1.0 + e * np.cos(th_t))
+    xt, yt = r_theta * np.cos(th_t), r_theta * np.sin(th_t)
+
+    plt.figure(figsize=(6, 6))
+    plt.plot(x1, y1, label="Earth orbit (1 AU)")
+    plt.plot(x2, y2, label="Saturn orbit (9.537 AU)")
+    plt.plot(xt, yt, "--", label="Hohmann transfer")
+    # Mark periapsis and apoapsis points
+    plt.scatter([r1, -r2], [0.0, 0.0], s=20, zorder=3)
+
+    plt.axis("equal")
+    plt.xlabel("x (m)")
+    plt.ylabel("y (m)")
+    plt.title("Earth→Saturn Hohmann (heliocentric)")
+    plt.legend()
+
+    if fname:
+        plt.savefig(fname, dpi=300, bbox_inches="tight")
+    # Do not call plt.show(); let caller decide
+
+# ================================
+# Porkchop rendering
+# ================================
+def _strips(values: np.ndarray, rows: int) -> Iterator[np.ndarray]:
+    # float64 copies of `rows`-row strips of a 2-D array (a memmap is paged in one strip at a time)
+    for i0 in range(0, values.shape[0], rows):
+        yield np.asarray(values[i0:i0 + rows], dtype=float)
+
+def display_factor(shape: Tuple[int, int], max_cells: Tuple[int, int]) -> Tuple[int, int]:
+    """Smallest (fi, fj) block size that brings `shape` within `max_cells` (rows, cols)."""
+    return -(-shape[0] // max_cells[0]), -(-shape[1] // max_cells[1])
+
+def block_reduce(values: np.ndarray, factor: Tuple[int, int], how: str = "min") -> np.ndarray:
+    """
+    NaN-aware reduction of a 2-D array over (fi, fj) blocks (edge blocks are partial).
+    Args:
+        values : (n_tof, n_dep) array or memmap
+        factor : block size (fi, fj); (1, 1) returns a float copy
+        how    : "min" (keeps the Δv valley visible), "max", "mean", or "stride" (block corner)
+    Returns:
+        (ceil(n_tof / fi), ceil(n_dep / fj)) float64 array, NaN where a block has no finite value.
+    """
+    fi, fj = factor
+    if how == "stride":
+        return np.asarray(values[::fi, ::fj], dtype=float)
+    if how not in ("min", "max", "mean"):
+        raise ValueError(f"block_reduce: unknown reduction {how!r}")
+    n_i, n_j = values.shape
+    out = np.empty((-(-n_i // fi), -(-n_j // fj)))
+    rows = fi * max(1, _STRIP_CELLS // (fi * max(n_j, 1)))  # whole blocks per strip
+    for k, strip in enumerate(_strips(values, rows)):
+        nb = -(-strip.shape[0] // fi)
+        pad = ((0, nb * fi - strip.shape[0]), (0, out.shape[1] * fj - n_j))
+        if pad[0][1] or pad[1][1]:
+            strip = np.pad(strip, pad, constant_values=np.nan)
+        blocks = strip.reshape(nb, fi, out.shape[1], fj)
+        dst = out[k * (rows // fi):k * (rows // fi) + nb]
+        if how == "min":
+            np.fmin.reduce(blocks, axis=(1, 3), out=dst)
+        elif how == "max":
+            np.fmax.reduce(blocks, axis=(1, 3), out=dst)
+        else:
+            finite = np.isfinite(blocks)
+            count = finite.sum(axis=(1, 3))
+            with np.errstate(invalid="ignore"):
+                np.divide(np.where(finite, blocks, 0.0).sum(axis=(1, 3)), count, out=dst)
+    return out
+
+def block_axis(axis: np.ndarray, f: int) -> np.ndarray:
+    """Centers of `f`-sample blocks of a 1-D axis, matching block_reduce."""
+    axis = np.asarray(axis, dtype=float)
+    starts = np.arange(0, axis.size, f)
+    return np.add.reduceat(axis, starts) / np.diff(np.append(starts, axis.size))
+
+def streaming_levels(values: np.ndarray, n: int = 24, pct: Tuple[float, float] = (5, 95),
+                     bins: int = 4096) -> np.ndarray:
+    """
+    `n` evenly spaced contour levels between two percentiles of the finite values, estimated with a
+    stats.StreamingStats histogram sketch over row strips (two passes: range, then sketch).
+    Nothing larger than one strip is copied.
+    """
+    rows = max(1, _STRIP_CELLS // max(values.shape[1], 1))
+    lo, hi = np.inf, -np.inf
+    for strip in _strips(values, rows):
+        lo = np.fmin(lo, np.fmin.reduce(strip, axis=None))
+        hi = np.fmax(hi, np.fmax.reduce(strip, axis=None))
+    if not (np.isfinite(lo) and np.isfinite(hi)):
+        return np.linspace(0.0, 1.0, n)
+    if lo == hi:
+        return np.linspace(lo, hi + 1e-6, n)
+    sketch = StreamingStats(lo, hi, bins)
+    for strip in _strips(values, rows):
+        sketch.update(strip)
+    vmin, vmax = sketch.quantile(np.asarray(pct, dtype=float) / 100.0)
+    if vmin == vmax:
+        vmin, vmax = lo, hi
+    return np.linspace(vmin, vmax, n)
+
+def column_minima(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-column minimum over rows, streamed in row strips.
+    Returns:
+        (best, row): (n_dep,) minima (NaN for all-NaN columns) and their row indices (-1 there).
+    """
+    n_j = values.shape[1]
+    rows = max(1, _STRIP_CELLS // max(n_j, 1))
+    best = np.full(n_j, np.inf)
+    row = np.full(n_j, -1)
+    for k, strip in enumerate(_strips(values, rows)):
+        vals = np.where(np.isfinite(strip), strip, np.inf)
+        i = np.argmin(vals, axis=0)
+        v = vals[i, np.arange(n_j)]
+        better = v < best
+        best[better] = v[better]
+        row[better] = k * rows + i[better]
+    return np.where(np.isfinite(best), best, np.nan), row
+
+def plot_porkchop(ax, t_dep: np.ndarray, tof: np.ndarray, values: np.ndarray,
+                  levels: np.ndarray | int | None = None, epoch: datetime | None = None,
+                  max_cells: Tuple[int, int] = (600, 1000), how: str = "min", scale: float = 1.0,
+                  cmap: str = "viridis", lines: bool = True, hatch: str | None = "///", **contourf_kw):
+    """
+    Filled contours of a porkchop field on a departure × TOF axes pair.
+    Args:
+        ax        : matplotlib Axes
+        t_dep     : (n_dep,) departure epochs (s past `epoch`)
+        tof       : (n_tof,) times of flight (s); plotted in years
+        values    : (n_tof, n_dep) field, in memory or a memmap (e.g. PorkchopStore["dv_leo"])
+        levels    : contour levels in display units, a level count for streaming_levels, or None (24)
+        epoch     : calendar date of t_dep = 0; the x axis is then a date axis, else days
+        max_cells : display resolution (rows, cols); larger grids are block-reduced with `how`
+        scale     : display units per stored unit (e.g. 1e-3 for m/s → km/s)
+        lines     : overlay thin contour lines at the same levels
+        hatch     : hatch pattern shown through cells with no solution (None for none)
+    Returns:
+        The filled ContourSet (for a colorbar).
+    """
+    import matplotlib.dates as mdates
+
+    fi, fj = display_factor(values.shape, max_cells)
+    z = block_reduce(values, (fi, fj), how)
+    if scale != 1.0:
+        z *= scale
+    x = block_axis(t_dep, fj) / DAY
+    y = block_axis(tof, fi) / YEAR
+    if epoch is not None:
+        x += mdates.date2num(epoch)
+    if levels is None or np.isscalar(levels):
+        levels = streaming_levels(z, 24 if levels is None else int(levels))
+
+    zm = np.ma.masked_invalid(z)
+    cs = ax.contourf(x, y, zm, levels=levels, cmap=cmap, extend="both", **contourf_kw)
+    if lines:
+        ax.contour(x, y, zm, levels=levels, colors="k", linewidths=0.35, alpha=0.45)
+    if hatch:
+        # masked cells are left unfilled, so a hatched axes background marks them at no extra cost
+        ax.patch.set_hatch(hatch)
+        ax.patch.set_edgecolor("0.7")
+    if epoch is not None:
+        loc = mdates.AutoDateLocator(minticks=5, maxticks=10)
+        ax.xaxis.set_major_locator(loc)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(loc))
+    else:
+        ax.set_xlabel("Departure (days past reference epoch)")
+    ax.set_ylabel("Time of flight (years)")
+    return cs
+
+__all__ = [
+    "plot_hohmann_orbits", "display_factor", "block_reduce", "block_axis", "streaming_levels",
+    "column_minima", "plot_porkchop",
+]
@@ -0,0 +1,388 @@
+"""
+Porkchop grid-sweep engine (departure epoch × time of flight). Bodies are on circular, coplanar
+orbits by default; any ephemeris from ephemeris.py can be passed instead. The grid is split into
+tiles that are solved with the batch Lambert solver, optionally on a process pool.
+Usage:
+    from titan.porkchop import sweep_porkchop, circ_pos_vel, dv_from_leo
+    from titan.porkchop import iter_porkchop, PorkchopProgress   # streaming / progressive results
+"""
+from __future__ import annotations
+import os
+import time
+import numpy as np
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Tuple
+from .constants import mu_sun, mu_earth, a_earth, a_saturn, R_EARTH
+from .cache import ResultCache
+from .ephemeris import CircularOrbit
+from .lambert import lambert_universal_batch, lambert_universal_grid
+from . import instrument
+
+DAY  = 86400.0
+YEAR = 365.25 * DAY
+
+# Lambert branch kept per cell (int8 `branch` arrays)
+BRANCH_NONE  = -1  # no solution (failed cell)
+BRANCH_SHORT = 0   # short way (transfer angle < 180°)
+BRANCH_LONG  = 1   # long way
+
+# ================================
+# Circular, coplanar ephemerides
+# ================================
+def circ_pos_vel(a: float, t: float | np.ndarray, mu: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Position/velocity on a circular orbit of radius a (phase 0 at t=0), in the ecliptic plane.
+    t may be an array of epochs; r, v then have shape t.shape + (3,).
+    """
+    return CircularOrbit(a, mu).states(t)
+
+# LEO departure Δv from v∞
+def dv_from_leo(vinf: float | np.ndarray, h_leo_km: float = 300.0) -> float | np.ndarray:
+    r   = R_EARTH + h_leo_km*1e3
+    v_circ = np.sqrt(mu_earth / r)
+    v_esc  = np.sqrt(2.0 * mu_earth / r)
+    return np.sqrt(vinf**2 + v_esc**2) - v_circ  # m/s
+
+# ================================
+# Grid sweep
+# ================================
+class PorkchopGrid(NamedTuple):
+    t_dep: np.ndarray     # (n_dep,) departure epochs, s past the phase reference epoch
+    tof: np.ndarray       # (n_tof,) times of flight (s)
+    dv_leo: np.ndarray    # (n_tof, n_dep) departure Δv from LEO (m/s), NaN where Lambert failed
+    vinf_dep: np.ndarray  # (n_tof, n_dep) departure v∞ (m/s)
+    vinf_arr: np.ndarray  # (n_tof, n_dep) arrival v∞ (m/s)
+    branch: np.ndarray | None = None  # (n_tof, n_dep) int8 BRANCH_* of the kept solution, if tracked
+
+def sweep_ephemerides(a_dep: float, a_arr: float, mu: float, ephem_dep=None, ephem_arr=None) -> tuple:
+    """(departure, arrival) ephemerides of a sweep: explicit ones win, else CircularOrbit(a_dep / a_arr, mu)."""
+    return (ephem_dep if ephem_dep is not None else CircularOrbit(a_dep, mu),
+            ephem_arr if ephem_arr is not None else CircularOrbit(a_arr, mu))
+
+def _cached_states(ephem, t: np.ndarray, cache: ResultCache | None) -> tuple[np.ndarray, np.ndarray]:
+    # ephem.states through the cache, keyed on the ephemeris key + epoch
+    if cache is None:
+        return ephem.states(t)
+    flat = t.reshape(-1)
+    keys = cache.make_keys(cache.namespace(*ephem.key), flat[:, None])
+    rv, hit = cache.get_many(keys, 6)
+    if not hit.all():
+        r, v = ephem.states(flat[~hit])
+        rv[~hit] = np.concatenate([r, v], axis=-1)
+        cache.put_many([k for k, h in zip(keys, hit) if not h], rv[~hit])
+    rv = rv.reshape(t.shape + (6,))
+    return rv[..., :3], rv[..., 3:]
+
+def _cached_lambert(r1: np.ndarray, r2: np.ndarray, t_dep: np.ndarray, tof: np.ndarray,
+                    mu: float, long_way: bool, body_key: tuple,
+                    cache: ResultCache | None) -> tuple[np.ndarray, np.ndarray]:
+    # Lambert (v1, v2) over the (n_tof, n_dep) block; only cache misses reach the solver
+    if cache is None:
+        sol = lambert_universal_grid(r1, r2, tof[:, None], mu, long_way=long_way)
+        return sol.v1, sol.v2
+    shape = (tof.size, t_dep.size)
+    cols = np.stack(np.broadcast_arrays(t_dep[None, :], tof[:, None]), axis=-1).reshape(-1, 2)
+    keys = cache.make_keys(cache.namespace("lambert", body_key, mu, bool(long_way)), cols)
+    vv, hit = cache.get_many(keys, 6)
+    miss = ~hit
+    if miss.any():
+        R1 = np.broadcast_to(r1, shape + (3,)).reshape(-1, 3)
+        sol = lambert_universal_batch(R1[miss], r2.reshape(-1, 3)[miss], cols[miss, 1], mu, long_way=long_way)
+        vv[miss] = np.concatenate([sol.v1, sol.v2], axis=-1)
+        cache.put_many([k for k, m in zip(keys, miss) if m], vv[miss])
+    vv = vv.reshape(shape + (6,))
+    return vv[..., :3], vv[..., 3:]
+
+def solve_cells(t_dep: np.ndarray, tof: np.ndarray,
+                a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                use_long_way: bool = False, leo_alt_km: float = 300.0,
+                cache: ResultCache | None = None,
+                ephem_dep=None, ephem_arr=None, return_branch: bool = False) -> tuple:
+    """
+    Solve the (tof × t_dep) block of a porkchop grid.
+    Args:
+        t_dep        : (n_dep,) departure epochs (s)
+        tof          : (n_tof,) times of flight (s)
+        a_dep, a_arr : departure / arrival circular-orbit radii (m)
+        mu           : primary GM (m^3/s^2)
+        use_long_way : also solve the long-way branch and keep the cheaper departure per cell
+        leo_alt_km   : parking-orbit altitude for the departure Δv
+        cache        : optional ResultCache; ephemeris states and Lambert solutions found there
+                       are reused and only the missing cells are solved
+        ephem_dep, ephem_arr : optional ephemerides (ephemeris.KeplerOrbit, HermiteTable, ...)
+                       replacing the circular orbits a_dep / a_arr; t_dep is then in their epoch
+        return_branch : also return the int8 BRANCH_* array of the kept Lambert branch
+    Returns:
+        (dv_leo, vinf_dep, vinf_arr), each (n_tof, n_dep) in m/s; NaN where a cell failed.
+        With return_branch, (dv_leo, vinf_dep, vinf_arr, branch).
+    """
+    t_dep = np.asarray(t_dep, dtype=float)
+    tof = np.asarray(tof, dtype=float)
+    dep, arr = sweep_ephemerides(a_dep, a_arr, mu, ephem_dep, ephem_arr)
+    with instrument.timer("porkchop.states"):
+        r1, vE = _cached_states(dep, t_dep, cache)                         # (n_dep, 3)
+        r2, vS = _cached_states(arr, t_dep[None, :] + tof[:, None], cache)  # (n_tof, n_dep, 3)
+
+    body_key = (a_dep, a_arr) if ephem_dep is None and ephem_arr is None else (dep.key, arr.key)
+    with instrument.timer("porkchop.lambert"):
+        v1, v2 = _cached_lambert(r1, r2, t_dep, tof, mu, False, body_key, cache)
+        long = _cached_lambert(r1, r2, t_dep, tof, mu, True, body_key, cache) if use_long_way else None
+    with instrument.timer("porkchop.outputs"):
+        out = _cell_outputs(v1, v2, long, vE, vS, leo_alt_km)
+    return out if return_branch else out[:3]
+
+def _cell_outputs(v1: np.ndarray, v2: np.ndarray, long: tuple | None,
+                  vE: np.ndarray, vS: np.ndarray, leo_alt_km: float) -> tuple:
+    # Branch selection (cheaper departure wins; a cell needs both branches) and v∞ / Δv outputs.
+    # Returns (dv_leo, vinf_dep, vinf_arr, branch).
+    branch = np.full(v1.shape[:-1], BRANCH_SHORT, dtype=np.int8)
+    if long is not None:
+        v1l, v2l = long
+        dv_s = dv_from_leo(np.linalg.norm(v1 - vE, axis=-1), leo_alt_km)
+        dv_l = dv_from_leo(np.linalg.norm(v1l - vE, axis=-1), leo_alt_km)
+        use_l = (dv_l < dv_s)[..., None]
+        v1 = np.where(use_l, v1l, v1)
+        v2 = np.where(use_l, v2l, v2)
+        v1[~np.isfinite(dv_l)] = np.nan
+        branch[use_l[..., 0]] = BRANCH_LONG
+
+    vinf_dep = np.linalg.norm(v1 - vE, axis=-1)
+    vinf_arr = np.linalg.norm(v2 - vS, axis=-1)
+    vinf_arr = np.where(np.isfinite(vinf_dep), vinf_arr, np.nan)
+    branch[~np.isfinite(vinf_dep)] = BRANCH_NONE
+    rec = instrument.active()
+    if rec is not None:
+        rec.count("porkchop.cells", vinf_dep.size)
+        rec.count("porkchop.failed_cells", int(vinf_dep.size - np.count_nonzero(np.isfinite(vinf_dep))))
+    return dv_from_leo(vinf_dep, leo_alt_km), vinf_dep, vinf_arr, branch
+
+def solve_points(t_dep: np.ndarray, tof: np.ndarray,
+                 a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                 use_long_way: bool = False, leo_alt_km: float = 300.0,
+                 ephem_dep=None, ephem_arr=None, return_branch: bool = False) -> tuple:
+    """
+    Like solve_cells, but for scattered (t_dep[k], tof[k]) pairs instead of a grid.
+    Returns:
+        (dv_leo, vinf_dep, vinf_arr), each shaped like the broadcast inputs, in m/s
+        (plus the int8 branch array with return_branch).
+    """
+    t_dep, tof = np.broadcast_arrays(np.asarray(t_dep, dtype=float), np.asarray(tof, dtype=float))
+    dep, arr = sweep_ephemerides(a_dep, a_arr, mu, ephem_dep, ephem_arr)
+    r1, vE = dep.states(t_dep)
+    r2, vS = arr.states(t_dep + tof)
+    sol = lambert_universal_batch(r1, r2, tof, mu, long_way=False)
+    long = None
+    if use_long_way:
+        sol_l = lambert_universal_batch(r1, r2, tof, mu, long_way=True)
+        long = (sol_l.v1, sol_l.v2)
+    out = _cell_outputs(sol.v1, sol.v2, long, vE, vS, leo_alt_km)
+    return out if return_branch else out[:3]
+
+def iter_tiles(n_tof: int, n_dep: int, tile: Tuple[int, int] = (256, 256)) -> Iterator[Tuple[slice, slice]]:
+    """Yield (tof_slice, dep_slice) pairs covering an (n_tof, n_dep) grid in row-major tile order."""
+    ti, tj = tile
+    for i0 in range(0, n_tof, ti):
+        for j0 in range(0, n_dep, tj):
+            yield slice(i0, min(i0 + ti, n_tof)), slice(j0, min(j0 + tj, n_dep))
+
+def _solve_tile(args: tuple) -> tuple:
+    # Process-pool entry point: (key, t_dep, tof, kwargs, record) -> (key, dv_leo, vinf_dep, vinf_arr, branch, report)
+    key, t_dep, tof, kwargs, record = args
+    with instrument.recording(enabled=record) as rec:
+        out = solve_cells(t_dep, tof, return_branch=True, **kwargs)
+    return (key,) + out + (rec.report() if rec is not None else None,)
+
+def iter_solved_tiles(t_dep: np.ndarray, tof: np.ndarray, tiles: Iterable[Tuple[slice, slice]],
+                      kwargs: dict, workers: int | None = 1) -> Iterator[tuple]:
+    """
+    Solve the given (tof_slice, dep_slice) tiles of a grid with solve_cells(**kwargs) and yield
+    (tof_slice, dep_slice, dv_leo, vinf_dep, vinf_arr, branch) as tiles finish (any order when
+    pooled). At most one tile per worker is in flight, so finished-but-unconsumed results never
+    pile up. workers: 1 in-process, None os.cpu_count().
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # pool workers record into their own Recorder when the caller is recording; reports are merged here
+    record = workers > 1 and instrument.active() is not None
+    jobs = (((si, sj), t_dep[sj], tof[si], kwargs, record) for si, sj in tiles)
+
+    if workers <= 1:
+        for (si, sj), dv, vd, va, br, _ in map(_solve_tile, jobs):
+            yield si, sj, dv, vd, va, br
+        return
+
+    # imported here: concurrent.futures.process (multiprocessing) is ~15 ms of import time
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {pool.submit(_solve_tile, job) for job in islice(jobs, workers)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                job = next(jobs, None)
+                if job is not None:
+                    pending.add(pool.submit(_solve_tile, job))  # refill before handing the tile out
+                (si, sj), dv, vd, va, br, report = f.result()
+                instrument.merge(report)
+                yield si, sj, dv, vd, va, br
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+class PorkchopTile(NamedTuple):
+    tof_slice: slice      # rows of the full grid covered by this tile
+    dep_slice: slice      # columns of the full grid covered by this tile
+    dv_leo: np.ndarray    # (rows, cols) departure Δv from LEO (m/s)
+    vinf_dep: np.ndarray  # (rows, cols) departure v∞ (m/s)
+    vinf_arr: np.ndarray  # (rows, cols) arrival v∞ (m/s)
+    branch: np.ndarray    # (rows, cols) int8 BRANCH_* of the kept Lambert solution
+
+def iter_porkchop(t_dep: np.ndarray, tof: np.ndarray,
+                  a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                  use_long_way: bool = False, leo_alt_km: float = 300.0,
+                  tile: Tuple[int, int] = (256, 256), workers: int | None = 1,
+                  cache: ResultCache | None = None,
+                  ephem_dep=None, ephem_arr=None) -> Iterator[PorkchopTile]:
+    """
+    Streaming porkchop sweep: yield each PorkchopTile as soon as it is solved (row-major order
+    in-process, completion order on a pool). Nothing is accumulated here; memory is one tile per
+    worker plus whatever the consumer keeps. Args as in sweep_porkchop.
+    """
+    if cache is not None and workers != 1:
+        raise ValueError("iter_porkchop: a ResultCache lives in this process; use workers=1 with cache")
+    t_dep = np.asarray(t_dep, dtype=float)
+    tof = np.asarray(tof, dtype=float)
+    kwargs = dict(a_dep=a_dep, a_arr=a_arr, mu=mu, use_long_way=use_long_way, leo_alt_km=leo_alt_km)
+    if cache is not None:
+        kwargs["cache"] = cache
+    if ephem_dep is not None or ephem_arr is not None:
+        kwargs.update(ephem_dep=ephem_dep, ephem_arr=ephem_arr)
+    tiles = iter_tiles(tof.size, t_dep.size, tile)
+    for si, sj, dv, vd, va, br in iter_solved_tiles(t_dep, tof, tiles, kwargs, workers):
+        yield PorkchopTile(si, sj, dv, vd, va, br)
+
+def sweep_porkchop(t_dep: np.ndarray, tof: np.ndarray,
+                   a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                   use_long_way: bool = False, leo_alt_km: float = 300.0,
+                   tile: Tuple[int, int] = (256, 256), workers: int | None = 1,
+                   cache: ResultCache | None = None,
+                   ephem_dep=None, ephem_arr=None) -> PorkchopGrid:
+    """
+    Sweep a full porkchop grid tile by tile.
+    Args:
+        t_dep, tof   : departure-epoch and time-of-flight axes (s)
+        a_dep, a_arr : departure / arrival circular-orbit radii (m), e.g. a_earth, a_saturn
+        mu           : primary GM (m^3/s^2)
+        use_long_way : evaluate both Lambert branches and keep the cheaper one per cell
+        leo_alt_km   : parking-orbit altitude for the departure Δv
+        tile         : (n_tof, n_dep) cells per tile
+        workers      : process count; 1 solves in-process, None uses os.cpu_count()
+        cache        : optional ResultCache reused across sweeps (in-process only, workers=1)
+        ephem_dep, ephem_arr : optional ephemerides replacing the circular orbits (see solve_cells)
+    Returns:
+        PorkchopGrid with (len(tof), len(t_dep)) arrays in m/s and the kept branch per cell.
+    """
+    progress = PorkchopProgress(t_dep, tof)
+    for t in iter_porkchop(t_dep, tof, a_dep, a_arr, mu, use_long_way, leo_alt_km, tile, workers, cache,
+                           ephem_dep, ephem_arr):
+        progress.update(t)
+    return progress.grid
+
+class PorkchopProgress:
+    """
+    Consumer for iter_porkchop that keeps the partially filled grid and running results current:
+    per-departure Δv minima (the valley line), the global Δv and arrival-v∞ minima, and the
+    solved fraction. Optionally writes a snapshot PNG at most every snapshot_interval seconds.
+
+    Args:
+        t_dep, tof        : grid axes (s)
+        snapshot_path     : PNG written by update() / snapshot(); None disables snapshots
+        snapshot_interval : minimum seconds between automatic snapshots
+    """
+
+    def __init__(self, t_dep: np.ndarray, tof: np.ndarray, snapshot_path: str | Path | None = None,
+                 snapshot_interval: float = 60.0):
+        t_dep = np.asarray(t_dep, dtype=float)
+        tof = np.asarray(tof, dtype=float)
+        shape = (tof.size, t_dep.size)
+        self.grid = PorkchopGrid(t_dep, tof, np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan),
+                                 np.full(shape, BRANCH_NONE, dtype=np.int8))
+        self.cells_done = 0
+        # column-wise running minima (value, row) for the fields that are reported
+        self._col = {name: (np.full(t_dep.size, np.inf), np.full(t_dep.size, -1))
+                     for name in ("dv_leo", "vinf_arr")}
+        self.snapshot_path = None if snapshot_path is None else Path(snapshot_path)
+        self.snapshot_interval = float(snapshot_interval)
+        self._last_snapshot = time.monotonic()
+
+    @property
+    def fraction_done(self) -> float:
+        return self.cells_done / self.grid.dv_leo.size
+
+    def update(self, tile: PorkchopTile) -> None:
+        """Fold one finished tile into the arrays and the running minima."""
+        si, sj = tile.tof_slice, tile.dep_slice
+        self.grid.dv_leo[si, sj] = tile.dv_leo
+        self.grid.vinf_dep[si, sj] = tile.vinf_dep
+        self.grid.vinf_arr[si, sj] = tile.vinf_arr
+        self.grid.branch[si, sj] = tile.branch
+        self.cells_done += tile.dv_leo.size
+
+        for name, (best, row) in self._col.items():
+            vals = np.where(np.isfinite(getattr(tile, name)), getattr(tile, name), np.inf)
+            k = np.argmin(vals, axis=0)
+            v = vals[k, np.arange(vals.shape[1])]
+            better = v < best[sj]
+            best[sj] = np.where(better, v, best[sj])
+            row[sj] = np.where(better, si.start + k, row[sj])
+
+        if self.snapshot_path is not None and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def valley(self, field: str = "dv_leo") -> np.ndarray:
+        """(n_dep,) TOF of the lowest value found so far in each departure column (NaN if none yet)."""
+        best, row = self._col[field]
+        return np.where(np.isfinite(best), self.grid.tof[np.maximum(row, 0)], np.nan)
+
+    def minimum(self, field: str = "dv_leo") -> Tuple[float, int, int] | None:
+        """(value, i_tof, j_dep) of the lowest value found so far, or None before the first finite cell."""
+        best, row = self._col[field]
+        j = int(np.argmin(best))
+        if not np.isfinite(best[j]):
+            return None
+        return float(best[j]), int(row[j]), j
+
+    def snapshot(self, path: str | Path | None = None) -> Path:
+        """Render the partial Δv grid, valley and minimum to a PNG (matplotlib imported on demand)."""
+        from matplotlib.figure import Figure
+        from .plotting import block_reduce, display_factor
+        path = Path(path or self.snapshot_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        g = self.grid
+        fig = Figure(figsize=(8, 5))
+        ax = fig.add_subplot()
+        extent = [g.t_dep[0] / DAY, g.t_dep[-1] / DAY, g.tof[0] / YEAR, g.tof[-1] / YEAR]
+        # the figure is 800×500 px: larger grids are min-reduced to about that before imshow
+        z = block_reduce(g.dv_leo, display_factor(g.dv_leo.shape, (500, 800)))
+        im = ax.imshow(z / 1000.0, origin="lower", aspect="auto", extent=extent, cmap="viridis")
+        fig.colorbar(im, ax=ax, label="Δv_dep (km/s)")
+        ax.plot(g.t_dep / DAY, self.valley() / YEAR, "w--", lw=1.5)
+        best = self.minimum()
+        if best is not None:
+            dv, i, j = best
+            ax.plot(g.t_dep[j] / DAY, g.tof[i] / YEAR, "o", mfc="w", mec="k")
+            ax.set_title(f"{100 * self.fraction_done:.1f}% solved, min Δv_dep = {dv / 1000:.3f} km/s")
+        else:
+            ax.set_title(f"{100 * self.fraction_done:.1f}% solved")
+        ax.set_xlabel("Departure (days past reference epoch)")
+        ax.set_ylabel("Time of flight (years)")
+        fig.savefig(path, dpi=100)
+        self._last_snapshot = time.monotonic()
+        return path
+
+__all__ = [
+    "DAY", "YEAR", "BRANCH_NONE", "BRANCH_SHORT", "BRANCH_LONG", "circ_pos_vel", "dv_from_leo",
+    "PorkchopGrid", "sweep_ephemerides", "solve_cells", "solve_points", "iter_tiles", "iter_solved_tiles",
+    "sweep_porkchop",
+    "PorkchopTile", "iter_porkchop", "PorkchopProgress",
+]
@@ -0,0 +1,155 @@
+"""
+Adaptive (quadtree) porkchop sweeps: start from a coarse grid and recursively split only the
+cells near the Δv valley (and, optionally, cells with steep Δv gradients) down to a target
+resolution. Everything lives on the fine lattice of the target resolution, so the result can be
+filled back into an ordinary PorkchopGrid for contouring.
+Usage:
+    from titan.porkchop_adaptive import adaptive_porkchop
+"""
+from __future__ import annotations
+import numpy as np
+from typing import NamedTuple, Tuple
+from .constants import mu_sun, a_earth, a_saturn
+from .porkchop import PorkchopGrid, solve_points
+
+class AdaptivePorkchop(NamedTuple):
+    t_dep: np.ndarray     # (n_dep_fine,) fine departure axis (s)
+    tof: np.ndarray       # (n_tof_fine,) fine TOF axis (s)
+    node_i: np.ndarray    # (n_nodes,) TOF index of every evaluated lattice node
+    node_j: np.ndarray    # (n_nodes,) departure index of every evaluated lattice node
+    dv_leo: np.ndarray    # (n_nodes,) departure Δv from LEO (m/s)
+    vinf_dep: np.ndarray  # (n_nodes,) departure v∞ (m/s)
+    vinf_arr: np.ndarray  # (n_nodes,) arrival v∞ (m/s)
+    leaves: np.ndarray    # (n_leaves, 3) quadtree leaves as (i0, j0, size) in lattice units
+
+    @property
+    def n_solves(self) -> int:
+        """Lattice nodes evaluated (each is one Lambert solve per branch)."""
+        return int(self.node_i.size)
+
+    def minimum(self) -> Tuple[float, float, float]:
+        """(dv_leo_min, t_dep, tof) at the lowest evaluated node."""
+        k = int(np.nanargmin(self.dv_leo))
+        return float(self.dv_leo[k]), float(self.t_dep[self.node_j[k]]), float(self.tof[self.node_i[k]])
+
+    def to_grid(self) -> PorkchopGrid:
+        """
+        Dense (n_tof_fine, n_dep_fine) grid: every leaf is filled by bilinear interpolation of its
+        corners, then evaluated nodes are written back exactly.
+        """
+        shape = (self.tof.size, self.t_dep.size)
+        fields = (self.dv_leo, self.vinf_dep, self.vinf_arr)
+        dense = [np.full(shape, np.nan) for _ in fields]
+        lookup = _NodeIndex(self.node_i, self.node_j, shape[1])
+
+        for size in np.unique(self.leaves[:, 2]):
+            lv = self.leaves[self.leaves[:, 2] == size]
+            i0, j0 = lv[:, 0], lv[:, 1]
+            corners = [lookup.find(i0 + di, j0 + dj) for di, dj in ((0, 0), (0, size), (size, 0), (size, size))]
+            u = np.arange(size + 1) / size
+            wi, wj = u[:, None], u[None, :]
+            ii = (i0[:, None, None] + np.arange(size + 1)[None, :, None]).repeat(size + 1, axis=2)
+            jj = (j0[:, None, None] + np.arange(size + 1)[None, None, :]).repeat(size + 1, axis=1)
+            for out, f in zip(dense, fields):
+                c00, c01, c10, c11 = (f[c][:, None, None] for c in corners)
+                out[ii, jj] = ((1 - wi) * (1 - wj) * c00 + (1 - wi) * wj * c01
+                               + wi * (1 - wj) * c10 + wi * wj * c11)
+
+        for out, f in zip(dense, fields):
+            out[self.node_i, self.node_j] = f
+        return PorkchopGrid(self.t_dep, self.tof, *dense)
+
+class _NodeIndex:
+    # Sorted linear lattice indices -> position in the node arrays
+    def __init__(self, node_i: np.ndarray, node_j: np.ndarray, n_dep: int):
+        self.n_dep = n_dep
+        lin = node_i.astype(np.int64) * n_dep + node_j
+        self.order = np.argsort(lin)
+        self.lin = lin[self.order]
+
+    def find(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        q = np.asarray(i, dtype=np.int64) * self.n_dep + j
+        pos = np.searchsorted(self.lin, q)
+        pos = np.minimum(pos, self.lin.size - 1)
+        if not np.array_equal(self.lin[pos], q):
+            raise KeyError("lattice node not evaluated")
+        return self.order[pos]
+
+def adaptive_porkchop(dep_range: Tuple[float, float], tof_range: Tuple[float, float],
+                      coarse: Tuple[int, int] = (15, 41), levels: int = 4,
+                      dv_window: float = 500.0, grad_tol: float | None = None,
+                      dv_ceiling: float = np.inf,
+                      a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                      use_long_way: bool = False, leo_alt_km: float = 300.0) -> AdaptivePorkchop:
+    """
+    Quadtree porkchop sweep refined around the Δv valley.
+    A leaf is split while it is larger than one lattice step and either
+      - its lowest corner is within dv_window of the best Δv found so far, or
+      - grad_tol is set, its lowest corner is below dv_ceiling, and its corner spread
+        (max - min, NaN counting as infinite) exceeds grad_tol.
+    Args:
+        dep_range  : (t_start, t_end) departure epochs (s)
+        tof_range  : (tof_min, tof_max) (s)
+        coarse     : (n_tof, n_dep) nodes of the initial uniform grid
+        levels     : halvings down to the target resolution; the fine lattice is
+                     ((coarse[0]-1)*2**levels + 1, (coarse[1]-1)*2**levels + 1)
+        dv_window  : Δv band above the running minimum that is always refined (m/s)
+        grad_tol   : optional corner-spread threshold for contour-gradient refinement (m/s)
+        dv_ceiling : gradient refinement is skipped for leaves entirely above this Δv (m/s)
+        a_dep, a_arr, mu, use_long_way, leo_alt_km : as in porkchop.sweep_porkchop
+    Returns:
+        AdaptivePorkchop (sparse nodes + leaves); use .to_grid() for contouring.
+    """
+    step = 2 ** levels
+    n_tof, n_dep = (coarse[0] - 1) * step + 1, (coarse[1] - 1) * step + 1
+    t_axis = np.linspace(dep_range[0], dep_range[1], n_dep)
+    tof_axis = np.linspace(tof_range[0], tof_range[1], n_tof)
+    kwargs = dict(a_dep=a_dep, a_arr=a_arr, mu=mu, use_long_way=use_long_way, leo_alt_km=leo_alt_km)
+
+    ii, jj = np.meshgrid(np.arange(0, n_tof, step), np.arange(0, n_dep, step), indexing="ij")
+    node_i, node_j = ii.ravel(), jj.ravel()
+    dv, vd, va = solve_points(t_axis[node_j], tof_axis[node_i], **kwargs)
+
+    ci, cj = np.meshgrid(np.arange(0, n_tof - 1, step), np.arange(0, n_dep - 1, step), indexing="ij")
+    leaves = np.stack([ci.ravel(), cj.ravel(), np.full(ci.size, step)], axis=1)
+
+    while True:
+        lookup = _NodeIndex(node_i, node_j, n_dep)
+        active = leaves[leaves[:, 2] > 1]
+        done = leaves[leaves[:, 2] <= 1]
+        if active.size == 0:
+            break
+        i0, j0, s = active[:, 0], active[:, 1], active[:, 2]
+        cv = np.stack([dv[lookup.find(i0 + di * s, j0 + dj * s)] for di, dj in ((0, 0), (0, 1), (1, 0), (1, 1))])
+        with np.errstate(invalid="ignore"):
+            lo = np.nanmin(np.where(np.isfinite(cv), cv, np.inf), axis=0)
+            hi = np.max(np.where(np.isfinite(cv), cv, np.inf), axis=0)
+        best = np.nanmin(dv) if np.isfinite(dv).any() else np.inf
+        refine = lo <= best + dv_window
+        if grad_tol is not None:
+            refine |= (lo < dv_ceiling) & (hi - lo > grad_tol)
+        if not refine.any():
+            leaves = np.concatenate([done, active])
+            break
+
+        split = active[refine]
+        h = split[:, 2] // 2
+        a, b = split[:, 0], split[:, 1]
+        kids = np.concatenate([np.stack([a + di * h, b + dj * h, h], axis=1)
+                               for di in (0, 1) for dj in (0, 1)])
+        leaves = np.concatenate([done, active[~refine], kids])
+
+        # New lattice nodes: edge midpoints and centres of the split leaves
+        new_i = np.concatenate([a + h, a, a + h, a + 2 * h, a + h])
+        new_j = np.concatenate([b, b + h, b + h, b + h, b + 2 * h])
+        lin = np.unique(new_i.astype(np.int64) * n_dep + new_j)
+        lin = lin[~np.isin(lin, lookup.lin)]
+        if lin.size:
+            ni, nj = lin // n_dep, lin % n_dep
+            d2, v2d, v2a = solve_points(t_axis[nj], tof_axis[ni], **kwargs)
+            node_i, node_j = np.concatenate([node_i, ni]), np.concatenate([node_j, nj])
+            dv, vd, va = np.concatenate([dv, d2]), np.concatenate([vd, v2d]), np.concatenate([va, v2a])
+
+    return AdaptivePorkchop(t_axis, tof_axis, node_i, node_j, dv, vd, va, leaves)
+
+__all__ = ["AdaptivePorkchop", "adaptive_porkchop"]
@@ -0,0 +1,351 @@
+"""
+Streaming export of per-cell porkchop results: departure epoch, TOF, Δv, v∞ and the kept Lambert branch.
+Two writers share one append(chunk) interface, so a sweep can be streamed tile by tile into either:
+  - ColumnWriter: a column table, i.e. a directory with one raw little-endian binary file per
+    column plus meta.json (dtypes, units, row count, sweep settings). Columns are appended in
+    chunks and read back selectively (chosen columns, row ranges) through memmaps; to_npz packs a
+    finished table into a single .npz for hand-off.
+  - CsvWriter: CSV text. Each chunk is formatted as fixed-point ASCII with array operations
+    (no per-row Python loop or per-value Python objects).
+Rows are cells in the order the tiles were written (completion order on a process pool), with the
+t_dep / tof columns identifying each cell.
+Usage:
+    from titan.porkchop_export import export_sweep, ColumnTable
+    export_sweep("out/porkchop", t_dep, tof, use_long_way=True)          # column table
+    export_sweep("out/porkchop.csv", t_dep, tof, fmt="csv")
+    ColumnTable("out/porkchop").read(["t_dep", "dv_leo"], start=0, stop=10_000)
+"""
+from __future__ import annotations
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Mapping, Sequence, TextIO
+from .constants import mu_sun, a_earth, a_saturn
+from .porkchop import PorkchopGrid, PorkchopTile, iter_porkchop
+
+TABLE_VERSION = 1
+
+# Default column set of a porkchop export: name -> (dtype, unit)
+COLUMNS: Dict[str, tuple] = {
+    "t_dep":    ("<f8", "s"),
+    "tof":      ("<f8", "s"),
+    "dv_leo":   ("<f8", "m/s"),
+    "vinf_dep": ("<f8", "m/s"),
+    "vinf_arr": ("<f8", "m/s"),
+    "branch":   ("i1", "porkchop.BRANCH_*"),
+}
+
+# ================================
+# Chunking porkchop results into rows
+# ================================
+def block_rows(t_dep: np.ndarray, tof: np.ndarray, si: slice, sj: slice, fields: Dict[str, np.ndarray],
+               drop_failed: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Flatten (rows, cols) field blocks at grid[si, sj] into a column chunk with t_dep / tof columns.
+    drop_failed omits cells whose dv_leo is not finite (fields must then include dv_leo).
+    """
+    dep, tt = np.meshgrid(t_dep[sj], tof[si])
+    chunk = {"t_dep": dep.ravel(), "tof": tt.ravel()}
+    chunk.update((name, np.asarray(block).ravel()) for name, block in fields.items())
+    if drop_failed:
+        keep = np.isfinite(chunk["dv_leo"])
+        chunk = {name: col[keep] for name, col in chunk.items()}
+    return chunk
+
+def tile_rows(t_dep: np.ndarray, tof: np.ndarray, tile: PorkchopTile,
+              drop_failed: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Flatten one PorkchopTile into a column chunk (row-major within the tile).
+    Args:
+        t_dep, tof  : full grid axes (s) the tile's slices index into
+        tile        : finished tile from iter_porkchop
+        drop_failed : omit cells without a Lambert solution (branch == BRANCH_NONE)
+    Returns:
+        dict of equal-length 1-D arrays, keyed like COLUMNS.
+    """
+    fields = {name: getattr(tile, name) for name in ("dv_leo", "vinf_dep", "vinf_arr", "branch")}
+    return block_rows(t_dep, tof, tile.tof_slice, tile.dep_slice, fields, drop_failed)
+
+def grid_rows(grid: PorkchopGrid, rows_per_chunk: int = 64,
+              drop_failed: bool = False) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Column chunks of an in-memory (or memmapped) grid, `rows_per_chunk` TOF rows at a time.
+    The branch column is omitted when the grid does not track it.
+    """
+    names = ("dv_leo", "vinf_dep", "vinf_arr") + (("branch",) if grid.branch is not None else ())
+    n_tof = grid.tof.size
+    for i0 in range(0, n_tof, rows_per_chunk):
+        si = slice(i0, min(i0 + rows_per_chunk, n_tof))
+        fields = {name: getattr(grid, name)[si] for name in names}
+        yield block_rows(grid.t_dep, grid.tof, si, slice(None), fields, drop_failed)
+
+# ================================
+# Column table (binary)
+# ================================
+class ColumnWriter:
+    """
+    Append-only column table. Each column is a raw file `<name>.bin` that chunks are appended to;
+    meta.json (schema, row count, attrs) is written atomically by close(), so a table without it
+    is incomplete. Use as a context manager: the table is closed when the block completes and
+    aborted (column files removed, no meta.json) when it raises.
+
+    Args:
+        path    : table directory (created; existing column files are truncated)
+        columns : name -> (dtype, unit) for every column, e.g. COLUMNS
+        attrs   : JSON-serializable metadata stored with the table (sweep settings, axes, ...)
+    """
+
+    def __init__(self, path: str | Path, columns: Mapping[str, tuple] = COLUMNS, attrs: dict | None = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / "meta.json").unlink(missing_ok=True)
+        self.columns = {name: (np.dtype(dtype).newbyteorder("<"), unit) for name, (dtype, unit) in columns.items()}
+        self.attrs = dict(attrs or {})
+        self.rows = 0
+        self._files = {name: open(self.path / f"{name}.bin", "wb") for name in self.columns}
+
+    def append(self, chunk: Mapping[str, np.ndarray]) -> None:
+        """Append one chunk: a 1-D array for every column, all the same length."""
+        n = {np.shape(chunk[name])[0] for name in self.columns}
+        if len(n) != 1:
+            raise ValueError(f"ColumnWriter.append: columns of unequal length {sorted(n)}")
+        for name, (dtype, _) in self.columns.items():
+            np.ascontiguousarray(chunk[name], dtype=dtype).tofile(self._files[name])
+        self.rows += n.pop()
+
+    def close(self) -> None:
+        if self._files is None:
+            return
+        for fh in self._files.values():
+            fh.close()
+        self._files = None
+        meta = {
+            "version": TABLE_VERSION,
+            "rows": self.rows,
+            "columns": {name: {"dtype": dtype.str, "unit": unit} for name, (dtype, unit) in self.columns.items()},
+            "attrs": self.attrs,
+        }
+        tmp = self.path / "meta.json.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh, indent=2)
+        os.replace(tmp, self.path / "meta.json")
+
+    def abort(self) -> None:
+        """Discard a table that will not be completed: close and delete the column files."""
+        if self._files is None:
+            return
+        for name, fh in self._files.items():
+            fh.close()
+            (self.path / f"{name}.bin").unlink(missing_ok=True)
+        self._files = None
+
+    def __enter__(self) -> "ColumnWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if exc[0] is None:
+            self.close()
+        else:
+            self.abort()
+
+class ColumnTable:
+    """
+    Read side of a column table. Columns are memmapped, so selecting columns or a row range only
+    pages in those bytes.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path / "meta.json") as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("version") != TABLE_VERSION:
+            raise ValueError(f"{self.path}: unsupported table version {self.meta.get('version')}")
+        self.rows = int(self.meta["rows"])
+        self.attrs = self.meta["attrs"]
+        self.units = {name: c["unit"] for name, c in self.meta["columns"].items()}
+
+    @property
+    def names(self) -> list:
+        return list(self.meta["columns"])
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memmap of one whole column (an empty array for an empty table)."""
+        if name not in self.meta["columns"]:
+            raise KeyError(f"{self.path}: no column {name!r} (have {', '.join(self.names)})")
+        dtype = np.dtype(self.meta["columns"][name]["dtype"])
+        if self.rows == 0:
+            return np.empty(0, dtype)
+        return np.memmap(self.path / f"{name}.bin", dtype=dtype, mode="r", shape=(self.rows,))
+
+    def read(self, columns: Sequence[str] | None = None, start: int = 0,
+             stop: int | None = None) -> Dict[str, np.ndarray]:
+        """Copy rows [start, stop) of the selected columns (all by default) into memory."""
+        return {name: np.array(self.column(name)[start:stop]) for name in (columns or self.names)}
+
+    def iter_chunks(self, columns: Sequence[str] | None = None,
+                    chunk_rows: int = 1 << 20) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield the selected columns `chunk_rows` rows at a time."""
+        for start in range(0, self.rows, chunk_rows):
+            yield self.read(columns, start, start + chunk_rows)
+
+    def to_npz(self, path: str | Path, columns: Sequence[str] | None = None, compressed: bool = False) -> Path:
+        """
+        Pack the table into one .npz (one array per column, plus `meta` as a JSON string).
+        Columns stream from their memmaps into the archive; np.load(path)[name] reads one back.
+        """
+        path = Path(path)
+        arrays = {name: self.column(name) for name in (columns or self.names)}
+        (np.savez_compressed if compressed else np.savez)(path, meta=np.array(json.dumps(self.meta)), **arrays)
+        return path
+
+# ================================
+# CSV (text)
+# ================================
+def _ascii_fixed(x: np.ndarray, decimals: int) -> np.ndarray:
+    # (n, width) uint8 ASCII of x with `decimals` fixed decimals; NUL bytes are padding.
+    # Digits come from repeated divmod on the scaled int64 magnitudes, one column per digit.
+    # Integer arrays are written without decimals; non-finite floats become "nan".
+    x = np.asarray(x)
+    if x.dtype.kind in "iub":
+        decimals = 0
+    n = x.shape[0]
+    x = x.astype(float) if x.dtype.kind == "b" else x
+    bad = ~np.isfinite(x) if x.dtype.kind == "f" else np.zeros(n, bool)
+    scale = 10 ** decimals
+    if x.dtype.kind == "f":
+        mag = np.abs(np.where(bad, 0.0, x)) * scale
+        if n and mag.max() >= 2.0 ** 62:
+            raise ValueError(f"CsvWriter: {mag.max() / scale:.3g} too large for {decimals} fixed decimals")
+        q = np.round(mag).astype(np.int64)
+    else:
+        q = np.abs(x.astype(np.int64))
+    int_part = q // scale
+    int_width = len(str(int(int_part.max(initial=0))))
+    frac_width = decimals + 1 if decimals else 0
+    if bad.any():
+        int_width = max(int_width, 2 - frac_width)  # room for "nan"
+
+    out = np.zeros((n, 1 + int_width + frac_width), np.uint8)
+    out[:, 0] = np.where((x < 0) & (q > 0), ord("-"), 0)  # no "-0.000"
+    col = out.shape[1] - 1
+    for k in range(decimals + int_width):
+        if k == decimals and decimals:
+            out[:, col] = ord(".")
+            col -= 1
+        q, digit = np.divmod(q, 10)
+        out[:, col] = digit + ord("0")
+        if k > decimals:  # blank leading zeros of the integer part
+            out[int_part < 10 ** (k - decimals), col] = 0
+        col -= 1
+    if bad.any():
+        out[bad] = 0
+        out[bad, :3] = np.frombuffer(b"nan", np.uint8)
+    return out
+
+class CsvWriter:
+    """
+    Streaming CSV writer with a header row. Floats are written with a fixed number of decimals
+    (per column or shared) and integers as integers; NaN is written as "nan".
+
+    Args:
+        path     : output file, or an open text stream
+        columns  : column names, in output order
+        decimals : decimals for float columns; an int, or name -> int (missing names use 3)
+    """
+
+    def __init__(self, path: str | Path | TextIO, columns: Sequence[str] = tuple(COLUMNS),
+                 decimals: int | Mapping[str, int] = 3):
+        self.columns = list(columns)
+        self.decimals = ({name: int(decimals) for name in self.columns} if isinstance(decimals, int)
+                         else {name: int(decimals.get(name, 3)) for name in self.columns})
+        self._own = not hasattr(path, "write")
+        self._path = Path(path) if self._own else None
+        self._fh = open(path, "w", newline="") if self._own else path
+        self._fh.write(",".join(self.columns) + "\n")
+        self.rows = 0
+
+    def append(self, chunk: Mapping[str, np.ndarray]) -> None:
+        """Format and write one chunk (1-D arrays of equal length, one per column)."""
+        n = np.shape(chunk[self.columns[0]])[0]
+        if n == 0:
+            return
+        sep = np.full((n, 1), ord(","), np.uint8)
+        parts = []
+        for name in self.columns:
+            parts += [_ascii_fixed(chunk[name], self.decimals[name]), sep]
+        parts[-1] = np.full((n, 1), ord("\n"), np.uint8)
+        buf = np.concatenate(parts, axis=1).ravel()
+        self._fh.write(buf[buf != 0].tobytes().decode("ascii"))
+        self.rows += n
+
+    def close(self) -> None:
+        if self._own and not self._fh.closed:
+            self._fh.close()
+
+    def abort(self) -> None:
+        """Discard an unfinished export: a file opened here is closed and deleted; a caller's stream is left as is."""
+        if self._own and not self._fh.closed:
+            self._fh.close()
+            self._path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "CsvWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if exc[0] is None:
+            self.close()
+        else:
+            self.abort()
+
+# ================================
+# Sweep → file
+# ================================
+def write_chunks(chunks: Iterable[Mapping[str, np.ndarray]], writer) -> int:
+    """
+    Append every chunk to `writer` (ColumnWriter or CsvWriter) and close it; if a chunk fails, the
+    writer is aborted instead. Returns rows written.
+    """
+    with writer:
+        for chunk in chunks:
+            writer.append(chunk)
+    return writer.rows
+
+def export_sweep(path: str | Path, t_dep: np.ndarray, tof: np.ndarray,
+                 a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                 use_long_way: bool = False, leo_alt_km: float = 300.0,
+                 tile: tuple = (256, 256), workers: int | None = 1,
+                 fmt: str = "table", drop_failed: bool = False, decimals: int = 3) -> int:
+    """
+    Run a porkchop sweep and stream every finished tile straight to disk; nothing beyond the tiles
+    in flight is held in memory.
+    Args:
+        path        : table directory (fmt="table") or CSV file (fmt="csv")
+        t_dep, tof  : grid axes (s); remaining sweep args as in porkchop.sweep_porkchop
+        fmt         : "table" (binary column table) or "csv"
+        drop_failed : skip cells without a Lambert solution
+        decimals    : CSV decimals
+    Returns:
+        Number of rows written.
+    """
+    t_dep = np.asarray(t_dep, dtype=float)
+    tof = np.asarray(tof, dtype=float)
+    if fmt == "table":
+        attrs = dict(grid_shape=[tof.size, t_dep.size], a_dep=float(a_dep), a_arr=float(a_arr), mu=float(mu),
+                     use_long_way=bool(use_long_way), leo_alt_km=float(leo_alt_km), drop_failed=bool(drop_failed))
+        writer = ColumnWriter(path, COLUMNS, attrs)
+    elif fmt == "csv":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        writer = CsvWriter(path, tuple(COLUMNS), decimals)
+    else:
+        raise ValueError(f"export_sweep: fmt must be 'table' or 'csv', got {fmt!r}")
+    tiles = iter_porkchop(t_dep, tof, a_dep, a_arr, mu, use_long_way, leo_alt_km, tile, workers)
+    return write_chunks((tile_rows(t_dep, tof, t, drop_failed) for t in tiles), writer)
+
+__all__ = [
+    "COLUMNS", "TABLE_VERSION", "block_rows", "tile_rows", "grid_rows",
+    "ColumnWriter", "ColumnTable", "CsvWriter", "write_chunks", "export_sweep",
+]
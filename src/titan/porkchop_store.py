@@ -0,0 +1,146 @@
+"""
+On-disk, memory-mapped porkchop result store with tile-level resume.
+A store is a directory holding one .npy memmap per output field, a per-tile completion map,
+and meta.json (axes, repo constants, solver settings).
+Usage:
+    from titan.porkchop_store import sweep_to_store, PorkchopStore
+"""
+from __future__ import annotations
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Tuple
+from . import constants
+from .constants import mu_sun, a_earth, a_saturn
+from .porkchop import iter_solved_tiles, iter_tiles
+
+STORE_VERSION = 1
+FIELDS = ("dv_leo", "vinf_dep", "vinf_arr")
+
+def _constants_snapshot() -> dict:
+    """Numeric values exported by constants.py, recorded so stale stores can be spotted."""
+    return {name: float(getattr(constants, name)) for name in constants.__all__
+            if not callable(getattr(constants, name))}
+
+class PorkchopStore:
+    """
+    Directory-backed porkchop grid. Fields are (n_tof, n_dep) float64 memmaps (m/s, NaN until solved)
+    and `done` is an (n_tile_tof, n_tile_dep) bool memmap marking finished tiles.
+    """
+
+    def __init__(self, path: str | Path, mode: str = "r"):
+        self.path = Path(path)
+        with open(self.path / "meta.json") as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"{self.path}: unsupported store version {self.meta.get('version')}")
+        self.mode = mode
+        self.t_dep = np.load(self.path / "t_dep.npy")
+        self.tof = np.load(self.path / "tof.npy")
+        self.tile = tuple(self.meta["tile"])
+        self.fields = {name: np.load(self.path / f"{name}.npy", mmap_mode=mode) for name in FIELDS}
+        self.done = np.load(self.path / "done.npy", mmap_mode=mode)
+
+    @classmethod
+    def create(cls, path: str | Path, t_dep: np.ndarray, tof: np.ndarray, settings: dict,
+               tile: Tuple[int, int] = (256, 256)) -> "PorkchopStore":
+        """Lay out a new, empty store (fields NaN, no tiles done) and open it for writing."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        t_dep = np.asarray(t_dep, dtype=float)
+        tof = np.asarray(tof, dtype=float)
+        shape = (tof.size, t_dep.size)
+        tile_grid = (-(-shape[0] // tile[0]), -(-shape[1] // tile[1]))
+
+        np.save(path / "t_dep.npy", t_dep)
+        np.save(path / "tof.npy", tof)
+        for name in FIELDS:
+            arr = np.lib.format.open_memmap(path / f"{name}.npy", mode="w+", dtype=np.float64, shape=shape)
+            arr[...] = np.nan
+            arr.flush()
+            del arr
+        done = np.lib.format.open_memmap(path / "done.npy", mode="w+", dtype=np.bool_, shape=tile_grid)
+        done.flush()
+        del done
+
+        meta = {
+            "version": STORE_VERSION,
+            "shape": list(shape),
+            "tile": list(tile),
+            "units": "m/s",
+            "constants": _constants_snapshot(),
+            "solver": "lambert_universal_batch",
+            "settings": settings,
+        }
+        # meta.json is written last and atomically: its presence marks a complete layout
+        tmp = path / "meta.json.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh, indent=2)
+        os.replace(tmp, path / "meta.json")
+        return cls(path, mode="r+")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.tof.size, self.t_dep.size)
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.done.all())
+
+    def __getitem__(self, name: str) -> np.memmap:
+        return self.fields[name]
+
+    def tile_index(self, si: slice, sj: slice) -> Tuple[int, int]:
+        return si.start // self.tile[0], sj.start // self.tile[1]
+
+    def pending_tiles(self):
+        """Tiles not yet marked done, in row-major order."""
+        for si, sj in iter_tiles(*self.shape, self.tile):
+            if not self.done[self.tile_index(si, sj)]:
+                yield si, sj
+
+    def write_tile(self, si: slice, sj: slice, values: dict) -> None:
+        """Write one finished tile and only then mark it done, so a crash never marks partial data."""
+        for name in FIELDS:
+            self.fields[name][si, sj] = values[name]
+            self.fields[name].flush()
+        self.done[self.tile_index(si, sj)] = True
+        self.done.flush()
+
+    def read(self, name: str, tof_slice: slice = slice(None), dep_slice: slice = slice(None)) -> np.ndarray:
+        """Copy a (possibly strided) window of one field into memory; only that window is paged in."""
+        return np.array(self.fields[name][tof_slice, dep_slice])
+
+def sweep_to_store(path: str | Path, t_dep: np.ndarray, tof: np.ndarray,
+                   a_dep: float = a_earth, a_arr: float = a_saturn, mu: float = mu_sun,
+                   use_long_way: bool = False, leo_alt_km: float = 300.0,
+                   tile: Tuple[int, int] = (256, 256), workers: int | None = 1) -> PorkchopStore:
+    """
+    Run (or resume) a porkchop sweep directly into an on-disk store.
+    If `path` already holds a store with the same axes, constants and settings, only tiles that
+    are not marked done are solved; a mismatch raises ValueError rather than mixing results.
+    Args mirror porkchop.sweep_porkchop.
+    Returns:
+        PorkchopStore opened read/write.
+    """
+    t_dep = np.asarray(t_dep, dtype=float)
+    tof = np.asarray(tof, dtype=float)
+    settings = dict(a_dep=float(a_dep), a_arr=float(a_arr), mu=float(mu),
+                    use_long_way=bool(use_long_way), leo_alt_km=float(leo_alt_km))
+
+    path = Path(path)
+    if (path / "meta.json").exists():
+        store = PorkchopStore(path, mode="r+")
+        if (store.meta["settings"] != settings or store.tile != tuple(tile)
+                or store.meta["constants"] != _constants_snapshot()
+                or not np.array_equal(store.t_dep, t_dep) or not np.array_equal(store.tof, tof)):
+            raise ValueError(f"{path}: existing store was created with different axes, constants or settings")
+    else:
+        store = PorkchopStore.create(path, t_dep, tof, settings, tile)
+
+    for si, sj, dv, vd, va, _ in iter_solved_tiles(t_dep, tof, store.pending_tiles(), settings, workers):
+        store.write_tile(si, sj, {"dv_leo": dv, "vinf_dep": vd, "vinf_arr": va})
+    return store
+
+__all__ = ["PorkchopStore", "sweep_to_store", "FIELDS", "STORE_VERSION"]
@@ -0,0 +1,340 @@
+"""
+Numerical propagation of many trajectories at once, for checking the analytic two-body and
+patched-conic results against integrated ones. All trajectories are one (N, 6) state array
+(position m, velocity m/s). Each row has its own start epoch and duration, which can be negative.
+  - propagate_fixed    : classic RK4 with the same number of steps in every row
+  - propagate_adaptive : Dormand–Prince 5(4) with per-row step size control; rows that have
+                         finished drop out of the working set
+Forces are the central body plus optional third bodies (Perturber: GM and an ephemeris of the
+body relative to the central body; the indirect term is included), e.g. Saturn on a heliocentric
+arc or Titan on a Saturn-centric one.
+On top of these, lambert_arc_errors / porkchop_arc_errors fly every Lambert arc of a porkchop grid
+and report miss distance and velocity errors. flyby_arc_errors flies gravity-assist hyperbolas and
+compares the integrated turn with the conic one.
+Usage:
+    from titan.propagate import ForceModel, perturber, propagate, porkchop_arc_errors
+    y = propagate(y0, dt, ForceModel(mu_sun, (perturber("saturn"),)), t0=t_dep).y   # (N, 6)
+    err = porkchop_arc_errors(t_dep, tof)            # (n_tof, n_dep) miss distance, v error, ...
+"""
+from __future__ import annotations
+import numpy as np
+from typing import NamedTuple, Tuple
+from .constants import (mu_sun, mu_venus, mu_earth, mu_mars, mu_jupiter, mu_saturn, mu_titan,
+                        a_earth, a_saturn, a_titan)
+from .ephemeris import ELEMENTS, CircularOrbit, kepler_orbit
+from .lambert import lambert_universal_grid
+from .porkchop import iter_tiles, sweep_ephemerides
+from .titan_flyby import turn_angle
+from . import instrument
+
+# ================================
+# Force model
+# ================================
+class Perturber(NamedTuple):
+    mu: float    # GM of the third body (m^3/s^2)
+    ephem: object  # states(t) of the third body relative to the central body
+
+class ForceModel(NamedTuple):
+    mu: float                                 # central-body GM (m^3/s^2)
+    perturbers: Tuple[Perturber, ...] = ()
+
+_GM = {"venus": mu_venus, "earth": mu_earth, "mars": mu_mars, "jupiter": mu_jupiter, "saturn": mu_saturn}
+
+class _Primary:
+    # The primary as seen from a body on `ephem` (for forces in that body's frame, e.g. Saturn from Titan)
+    def __init__(self, ephem):
+        self.ephem = ephem
+
+    @property
+    def key(self) -> tuple:
+        return ("primary_of",) + tuple(self.ephem.key)
+
+    def states(self, t):
+        r, v = self.ephem.states(t)
+        return -r, -v
+
+def perturber(name: str, about: str = "sun", circular: bool = True) -> Perturber:
+    """
+    Third body `name` for a force model centred on `about`: any planet of ephemeris.ELEMENTS about
+    the Sun, Titan about Saturn, or Saturn about Titan. circular=True uses the porkchop's circular
+    phasing (CircularOrbit, phase 0 at t = 0). Otherwise it uses the mean-element KeplerOrbit
+    (epochs in s past J2000).
+    """
+    if about == "sun" and name in _GM:
+        a = {"earth": a_earth, "saturn": a_saturn}.get(name, ELEMENTS[name][0].a)
+        return Perturber(_GM[name], CircularOrbit(a, mu_sun) if circular else kepler_orbit(name))
+    titan = CircularOrbit(a_titan, mu_saturn) if circular else kepler_orbit("titan")
+    if (name, about) == ("titan", "saturn"):
+        return Perturber(mu_titan, titan)
+    if (name, about) == ("saturn", "titan"):
+        return Perturber(mu_saturn, _Primary(titan))
+    raise ValueError(f"perturber: no ephemeris for {name!r} about {about!r}")
+
+def accel(t: np.ndarray, r: np.ndarray, model: ForceModel) -> np.ndarray:
+    """Acceleration (N, 3) at positions r (N, 3) and epochs t (N,)."""
+    rn = np.linalg.norm(r, axis=-1, keepdims=True)
+    a = r * (-model.mu / rn**3)
+    for p in model.perturbers:
+        rk, _ = p.ephem.states(t)
+        d = rk - r
+        a += p.mu * (d / np.linalg.norm(d, axis=-1, keepdims=True)**3
+                     - rk / np.linalg.norm(rk, axis=-1, keepdims=True)**3)
+    return a
+
+def _rhs(t: np.ndarray, y: np.ndarray, model: ForceModel) -> np.ndarray:
+    return np.concatenate([y[:, 3:], accel(t, y[:, :3], model)], axis=1)
+
+# ================================
+# Integrators
+# ================================
+class PropagationResult(NamedTuple):
+    y: np.ndarray          # (N, 6) final states (NaN rows where a step limit was hit)
+    steps: np.ndarray      # (N,) accepted steps
+    rejected: np.ndarray   # (N,) rejected steps (0 for fixed-step)
+    converged: np.ndarray  # (N,) bool, the row reached its end epoch
+
+def _rows(y0: np.ndarray, dt, t0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    y0 = np.asarray(y0, dtype=float).reshape(-1, 6)
+    n = y0.shape[0]
+    return y0, np.broadcast_to(np.ravel(dt).astype(float), (n,)), np.broadcast_to(np.ravel(t0).astype(float), (n,))
+
+@instrument.timed("propagate.fixed")
+def propagate_fixed(y0: np.ndarray, dt: float | np.ndarray, model: ForceModel,
+                    t0: float | np.ndarray = 0.0, n_steps: int = 1000) -> PropagationResult:
+    """
+    RK4 with n_steps equal steps per row (step dt / n_steps), all rows advanced together.
+    Args:
+        y0 : (N, 6) initial states
+        dt : (N,) or scalar durations (s); negative integrates backwards
+        t0 : (N,) or scalar start epochs (s), used by the perturber ephemerides
+    """
+    y, dt, t0 = _rows(y0, dt, t0)
+    y = y.copy()
+    h = (dt / n_steps)[:, None]
+    th = h[:, 0]
+    for s in range(n_steps):
+        t = t0 + s * th
+        k1 = _rhs(t, y, model)
+        k2 = _rhs(t + 0.5 * th, y + 0.5 * h * k1, model)
+        k3 = _rhs(t + 0.5 * th, y + 0.5 * h * k2, model)
+        k4 = _rhs(t + th, y + h * k3, model)
+        y += h / 6.0 * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+    n = y.shape[0]
+    return PropagationResult(y, np.full(n, n_steps), np.zeros(n, dtype=int), np.isfinite(y).all(axis=1))
+
+# Dormand–Prince 5(4) tableau
+_C = np.array([0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0])
+_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+]
+_E = np.array([71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])  # b5 - b4
+
+@instrument.timed("propagate.adaptive")
+def propagate_adaptive(y0: np.ndarray, dt: float | np.ndarray, model: ForceModel,
+                       t0: float | np.ndarray = 0.0, rtol: float = 1e-12,
+                       atol: Tuple[float, float] = (1e-3, 1e-9), h0: float | np.ndarray | None = None,
+                       max_steps: int = 100_000) -> PropagationResult:
+    """
+    Dormand–Prince 5(4) with per-row step control (RMS error norm, safety 0.9, growth in [0.2, 5]).
+    Every iteration advances all unfinished rows by one trial step each. The last stage of an
+    accepted step is reused as the first stage of the next (FSAL).
+    Args:
+        y0, dt, t0 : as in propagate_fixed
+        rtol       : relative tolerance
+        atol       : absolute tolerance for (position m, velocity m/s)
+        h0         : initial step magnitude (s); default 1% of |r|/|v|
+        max_steps  : accepted + rejected steps per row before it is given up (y NaN, not converged)
+    """
+    y, dt, t0 = _rows(y0, dt, t0)
+    y = y.copy()
+    n = y.shape[0]
+    sign = np.where(dt < 0, -1.0, 1.0)
+    if h0 is None:
+        h0 = 0.01 * np.linalg.norm(y[:, :3], axis=1) / np.maximum(np.linalg.norm(y[:, 3:], axis=1), 1e-12)
+    h = np.minimum(np.broadcast_to(np.ravel(h0).astype(float), (n,)), np.abs(dt)) * sign
+    t = np.zeros(n)
+    steps = np.zeros(n, dtype=np.int64)
+    rejected = np.zeros(n, dtype=np.int64)
+    atol_v = np.repeat(np.asarray(atol, dtype=float), 3)
+    k1 = _rhs(t0, y, model)
+    live = np.flatnonzero(dt != 0)
+
+    while live.size:
+        hl = h[live]
+        rem = dt[live] - t[live]
+        last = np.abs(hl) >= np.abs(rem)
+        hl = np.where(last, rem, hl)
+        yl, tl, hc = y[live], t0[live] + t[live], hl[:, None]
+        k = [k1[live]]
+        for s in range(1, 7):
+            ys = yl + hc * sum(a * k[j] for j, a in enumerate(_A[s]) if a)
+            k.append(_rhs(tl + _C[s] * hl, ys, model))
+        y_new = ys  # stage 7 is evaluated at the 5th-order solution
+        e = hc * sum(c * k[j] for j, c in enumerate(_E) if c)
+        scale = atol_v + rtol * np.maximum(np.abs(yl), np.abs(y_new))
+        with np.errstate(invalid="ignore"):
+            err = np.sqrt(np.mean((e / scale)**2, axis=1))
+        ok = err <= 1.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fac = np.clip(0.9 * err**-0.2, np.where(ok, 0.2, 0.1), np.where(ok, 5.0, 1.0))
+        fac = np.where(np.isfinite(fac), fac, 0.1)
+
+        acc = live[ok]
+        y[acc] = y_new[ok]
+        k1[acc] = k[6][ok]
+        t[acc] = np.where(last[ok], dt[acc], t[acc] + hl[ok])
+        steps[acc] += 1
+        rejected[live[~ok]] += 1
+        # a final step that was clamped keeps the previous step size for the record
+        h[live] = np.where(last & ok, h[live], hl * fac)
+
+        done = ok & last
+        over = (steps[live] + rejected[live]) >= max_steps
+        y[live[over & ~done]] = np.nan
+        live = live[~(done | over)]
+    converged = (t == dt) & np.isfinite(y).all(axis=1)
+    rec = instrument.active()
+    if rec is not None:
+        rec.count("propagate.steps", int(steps.sum()))
+        rec.count("propagate.rejected", int(rejected.sum()))
+    return PropagationResult(y, steps, rejected, converged)
+
+def propagate(y0: np.ndarray, dt: float | np.ndarray, model: ForceModel, t0: float | np.ndarray = 0.0,
+              method: str = "dopri5", **kwargs) -> PropagationResult:
+    """propagate_adaptive (method="dopri5") or propagate_fixed (method="rk4"); kwargs go to the integrator."""
+    if method == "dopri5":
+        return propagate_adaptive(y0, dt, model, t0, **kwargs)
+    if method == "rk4":
+        return propagate_fixed(y0, dt, model, t0, **kwargs)
+    raise ValueError(f"propagate: unknown method {method!r}")
+
+# ================================
+# Patched-conic checks
+# ================================
+class ArcErrors(NamedTuple):
+    miss_distance: np.ndarray   # |r_integrated - r2| at the arc's end (m)
+    v_error: np.ndarray         # |v_integrated - v2| (m/s)
+    vinf_arr_error: np.ndarray  # integrated minus Lambert arrival v∞ (m/s); NaN without body velocities
+    steps: np.ndarray           # integrator steps per arc
+
+def lambert_arc_errors(r1: np.ndarray, v1: np.ndarray, r2: np.ndarray, v2: np.ndarray, tof: np.ndarray,
+                       model: ForceModel, t0: float | np.ndarray = 0.0, v_body: np.ndarray | None = None,
+                       method: str = "dopri5", **kwargs) -> ArcErrors:
+    """
+    Fly (r1, v1) for tof under `model` and compare the end state with the Lambert solution (r2, v2).
+    Rows with a non-finite Lambert solution are skipped (NaN errors).
+    Args:
+        r1, v1, r2, v2 : (N, 3) arc end states; tof, t0 : (N,) or scalar
+        v_body         : optional (N, 3) arrival-body velocity for the arrival v∞ error
+    """
+    r1, v1, r2, v2 = (np.asarray(x, dtype=float).reshape(-1, 3) for x in (r1, v1, r2, v2))
+    n = r1.shape[0]
+    tof = np.broadcast_to(np.ravel(tof).astype(float), (n,))
+    t0 = np.broadcast_to(np.ravel(t0).astype(float), (n,))
+    ok = np.isfinite(v1).all(axis=1) & np.isfinite(v2).all(axis=1)
+    out = ArcErrors(np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan), np.zeros(n, dtype=np.int64))
+    if not ok.any():
+        return out
+    res = propagate(np.concatenate([r1[ok], v1[ok]], axis=1), tof[ok], model, t0[ok], method, **kwargs)
+    out.miss_distance[ok] = np.linalg.norm(res.y[:, :3] - r2[ok], axis=1)
+    out.v_error[ok] = np.linalg.norm(res.y[:, 3:] - v2[ok], axis=1)
+    out.steps[ok] = res.steps
+    if v_body is not None:
+        vb = np.asarray(v_body, dtype=float).reshape(-1, 3)[ok]
+        out.vinf_arr_error[ok] = np.linalg.norm(res.y[:, 3:] - vb, axis=1) - np.linalg.norm(v2[ok] - vb, axis=1)
+    return out
+
+def porkchop_arc_errors(t_dep: np.ndarray, tof: np.ndarray, a_dep: float = a_earth, a_arr: float = a_saturn,
+                        mu: float = mu_sun, long_way: bool = False, perturbers: Tuple[Perturber, ...] = (),
+                        ephem_dep=None, ephem_arr=None, tile: Tuple[int, int] = (128, 128),
+                        method: str = "dopri5", **kwargs) -> ArcErrors:
+    """
+    Integrate the Lambert arc of every porkchop cell (one branch) and report its errors as
+    (n_tof, n_dep) arrays. Tiles of the grid are propagated as one batch each. Without perturbers,
+    the errors measure the Lambert solver and integrator consistency. With perturbers (e.g.
+    perturber("jupiter")), they measure what the two-body transfer model leaves out. A perturber
+    at the arrival body is singular at the arc's end, so leave the arrival body out.
+    Args mirror porkchop.solve_cells; kwargs go to the integrator.
+    """
+    t_dep = np.asarray(t_dep, dtype=float)
+    tof = np.asarray(tof, dtype=float)
+    dep, arr = sweep_ephemerides(a_dep, a_arr, mu, ephem_dep, ephem_arr)
+    model = ForceModel(mu, tuple(perturbers))
+    shape = (tof.size, t_dep.size)
+    out = ArcErrors(np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan),
+                    np.zeros(shape, dtype=np.int64))
+    for si, sj in iter_tiles(*shape, tile):
+        td, tf = t_dep[sj], tof[si]
+        r1, _ = dep.states(td)
+        r2, vS = arr.states(td[None, :] + tf[:, None])
+        sol = lambert_universal_grid(r1, r2, tf[:, None], mu, long_way=long_way)
+        R1 = np.broadcast_to(r1, r2.shape)
+        err = lambert_arc_errors(R1, sol.v1, r2, sol.v2, np.broadcast_to(tf[:, None], r2.shape[:2]), model,
+                                 np.broadcast_to(td[None, :], r2.shape[:2]), vS, method, **kwargs)
+        for dst, src in zip(out, err):
+            dst[si, sj] = src.reshape(r2.shape[:2])
+    return out
+
+class FlybyArcErrors(NamedTuple):
+    turn_conic: np.ndarray    # asymptotic turn angle titan_flyby.turn_angle (rad)
+    turn_twobody: np.ndarray  # velocity turn between the ±T edge points of the two-body hyperbola (rad)
+    turn_numeric: np.ndarray  # the same for the integrated arc (rad)
+    vinf_out: np.ndarray      # integrated outbound v∞ from the energy at the outbound edge (m/s)
+    miss_distance: np.ndarray # integrated minus two-body position at the outbound edge (m)
+
+def flyby_arc_errors(vinf: np.ndarray, rp: np.ndarray, model: ForceModel, r_edge: float,
+                     t0: float | np.ndarray = 0.0, method: str = "dopri5", **kwargs) -> FlybyArcErrors:
+    """
+    Fly gravity-assist hyperbolas (model.mu is the flyby body) from periapsis out to radius r_edge,
+    forwards and backwards, and compare them with the two-body conic and its asymptotic turn.
+    Periapsis is at +x, with the motion along +y in the x-y plane of the model frame, at epochs t0
+    (perturber geometry).
+    Args:
+        vinf, rp : (N,) or scalar hyperbolic excess speed (m/s) and periapsis radius (m)
+        r_edge   : radius where the arc is cut, e.g. the flyby body's sphere of influence (m)
+    """
+    vinf, rp, t0 = (np.ravel(x).astype(float) for x in np.broadcast_arrays(vinf, rp, t0))
+    mu = model.mu
+    n = vinf.size
+    vp = np.sqrt(vinf**2 + 2.0 * mu / rp)
+    zero = np.zeros(n)
+    y0 = np.stack([rp, zero, zero, zero, vp, zero], axis=1)
+    # time from periapsis to r_edge on the hyperbola: cosh F = (1 + r v∞²/μ) / e
+    a = -mu / vinf**2
+    e = 1.0 + rp * vinf**2 / mu
+    F = np.arccosh((1.0 + r_edge * vinf**2 / mu) / e)
+    T = np.sqrt(-a**3 / mu) * (e * np.sinh(F) - F)
+
+    # two-body edge states: true anomaly ν at r_edge, p = rp (1 + e); outbound at +ν, inbound at -ν
+    p = rp * (1.0 + e)
+    nu = np.arccos(np.clip((p / r_edge - 1.0) / e, -1.0, 1.0))
+    vt = np.sqrt(mu / p)
+    r_kep = np.stack([r_edge * np.cos(nu), r_edge * np.sin(nu), zero], axis=1)
+    v_kep = np.stack([-vt * np.sin(nu), vt * (e + np.cos(nu)), zero], axis=1)
+    v_kep_in = v_kep * np.array([-1.0, 1.0, 1.0])
+
+    res = propagate(np.concatenate([y0, y0]), np.concatenate([T, -T]), model, np.concatenate([t0, t0]),
+                    method, **kwargs)
+    y_out, y_in = res.y[:n], res.y[n:]
+
+    def turn(vo: np.ndarray, vi: np.ndarray) -> np.ndarray:
+        c = np.einsum("ij,ij->i", vo, vi) / (np.linalg.norm(vo, axis=1) * np.linalg.norm(vi, axis=1))
+        return np.arccos(np.clip(c, -1.0, 1.0))
+
+    r_out = np.linalg.norm(y_out[:, :3], axis=1)
+    with np.errstate(invalid="ignore"):
+        vinf_out = np.sqrt(np.einsum("ij,ij->i", y_out[:, 3:], y_out[:, 3:]) - 2.0 * mu / r_out)
+    return FlybyArcErrors(turn_angle(vinf, rp, mu), turn(v_kep, v_kep_in), turn(y_out[:, 3:], y_in[:, 3:]),
+                          vinf_out, np.linalg.norm(y_out[:, :3] - r_kep, axis=1))
+
+__all__ = [
+    "Perturber", "ForceModel", "perturber", "accel", "PropagationResult", "propagate_fixed",
+    "propagate_adaptive", "propagate", "ArcErrors", "lambert_arc_errors", "porkchop_arc_errors",
+    "FlybyArcErrors", "flyby_arc_errors",
+]
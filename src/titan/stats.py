@@ -0,0 +1,79 @@
+"""
+Streaming statistics shared by the Monte Carlo dispersions and the porkchop renderer: running
+moments and a fixed-edge histogram quantile sketch that are updated chunk by chunk and merged across
+workers, so no sample array is ever kept.
+Usage:
+    from titan.stats import StreamingStats
+    st = StreamingStats(lo, hi); st.update(chunk); st.quantile([0.05, 0.95])
+"""
+from __future__ import annotations
+import numpy as np
+
+class StreamingStats:
+    """
+    Mergeable running statistics for one scalar output: count, mean and variance (Chan et al.
+    pairwise update), extrema, non-finite count, and a fixed-edge histogram used as a quantile
+    sketch (quantile error below one bin width inside [lo, hi]; values outside are clamped to
+    the end bins and still counted). Sketches can only be merged when their edges match.
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int = 4096):
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.hist = np.zeros(bins, dtype=np.int64)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.n_nonfinite = 0
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float).reshape(-1)
+        ok = np.isfinite(x)
+        self.n_nonfinite += int(x.size - ok.sum())
+        x = x[ok]
+        if x.size == 0:
+            return
+        nb, mb = x.size, float(x.mean())
+        m2b = float(((x - mb) ** 2).sum())
+        self._combine(nb, mb, m2b, float(x.min()), float(x.max()))
+        lo, hi, k = self.edges[0], self.edges[-1], self.hist.size
+        idx = np.clip(((x - lo) * (k / (hi - lo))).astype(np.int64), 0, k - 1)
+        self.hist += np.bincount(idx, minlength=k)
+
+    def _combine(self, nb: int, mb: float, m2b: float, mn: float, mx: float) -> None:
+        n = self.n + nb
+        d = mb - self.mean
+        self.mean += d * nb / n
+        self.m2 += m2b + d * d * self.n * nb / n
+        self.n = n
+        self.min, self.max = min(self.min, mn), max(self.max, mx)
+
+    def merge(self, other: "StreamingStats") -> None:
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("StreamingStats.merge: sketches have different bin edges")
+        self.n_nonfinite += other.n_nonfinite
+        if other.n:
+            self._combine(other.n, other.mean, other.m2, other.min, other.max)
+            self.hist += other.hist
+
+    @property
+    def var(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.var))
+
+    def quantile(self, q: float | np.ndarray) -> float | np.ndarray:
+        """Quantiles from the sketch, linearly interpolated inside a bin and clipped to [min, max]."""
+        cdf = np.concatenate([[0], np.cumsum(self.hist)]) / max(self.n, 1)
+        out = np.clip(np.interp(q, cdf, self.edges), self.min, self.max)
+        return float(out) if np.ndim(out) == 0 else out
+
+    def summary(self) -> dict:
+        p = self.quantile([0.01, 0.5, 0.99]) if self.n else [np.nan] * 3
+        return dict(n=self.n, mean=self.mean, std=self.std, min=self.min, max=self.max,
+                    p01=p[0], p50=p[1], p99=p[2], nonfinite=self.n_nonfinite)
+
+__all__ = ["StreamingStats"]
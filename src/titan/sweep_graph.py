@@ -0,0 +1,331 @@
+"""
+Incrementally recomputed sweep: the Earth → Saturn → Titan stages of mission_pipeline as a
+dependency graph over an on-disk grid. Every stage declares the fields it reads and writes and the
+constants.py values and sweep knobs it depends on. A stage's fingerprint hashes those values; every
+tile also gets a fingerprint built from the stage fingerprint, the tile fingerprints of the stages
+that produce its inputs and, for stages that use the grid axes, the tile's axis values. update()
+recomputes only the (stage, tile) pairs whose stored fingerprint differs. After a change to
+leo_alt_km, only the departure Δv and the joint cost are re-run, as two in-place passes over the
+stored arrays. After a change to mu_titan, only the flyby and its downstream stages are re-run.
+A graph directory holds one .npy memmap per field, one fingerprint array per stage and meta.json.
+Usage:
+    from titan.sweep_graph import SweepGraph
+    graph = SweepGraph("out/graph", t_dep, tof)      # create, or reopen with the same axes
+    graph.update(workers=4)                          # first run: every stage
+    graph.update(leo_alt_km=400.0)                   # only "departure" and "total"
+    graph["total_dv"], graph.stale(h_flyby=1500e3)
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+from . import constants, instrument
+from .mission_pipeline import ArrivalPlan, approach_state_at, saturn_insertion
+from .porkchop import BRANCH_NONE, dv_from_leo, iter_solved_tiles
+from .titan_flyby import post_flyby_vinf_saturn
+
+GRAPH_VERSION = 1
+_CHUNK = 1 << 16    # cells per pointwise call: the temporaries of a stage stay in cache
+
+# ================================
+# Stages
+# ================================
+class Stage(NamedTuple):
+    name: str
+    inputs: Tuple[str, ...]     # fields read (outputs of earlier stages)
+    outputs: Tuple[str, ...]    # fields written
+    constants: Tuple[str, ...]  # constants.py names the stage depends on
+    knobs: Tuple[str, ...]      # sweep knobs the stage depends on
+    fn: Callable
+    # pointwise: fn(inputs, p, out) fills the `out` blocks from same-shaped `inputs` blocks. Otherwise
+    # fn(t_dep, tof, tiles, inputs, p, workers) yields (tof_slice, dep_slice, outputs) per tile, and
+    # the tile's axis values are part of its fingerprint.
+    pointwise: bool = True
+    version: int = 1            # bump when fn changes what it computes
+
+# Field dtypes other than float64, and the fill value of unsolved cells
+DTYPES = {"branch": np.int8}
+FILL = {"branch": BRANCH_NONE}
+
+def _transfer(t_dep, tof, tiles, inputs, p, workers) -> Iterator[tuple]:
+    # Heliocentric Lambert leg. The branch choice compares departure Δv, which is monotonic in v∞,
+    # so it does not depend on leo_alt_km (the Δv computed here is discarded).
+    kwargs = dict(a_dep=p["a_earth"], a_arr=p["a_saturn"], mu=p["mu_sun"],
+                  use_long_way=bool(p["use_long_way"]), leo_alt_km=300.0)
+    for si, sj, _, vd, va, br in iter_solved_tiles(t_dep, tof, tiles, kwargs, workers):
+        yield si, sj, dict(vinf_dep=vd, vinf_arr=va, branch=br)
+
+def _departure(inputs, p, out) -> None:
+    # porkchop.dv_from_leo reads constants.mu_earth and constants.R_EARTH, both in the stage's constants
+    out["dv_leo"][...] = dv_from_leo(inputs["vinf_dep"], p["leo_alt_km"])
+
+def _approach(inputs, p, out) -> None:
+    if not p["rp_soi"] <= p["a_titan"]:
+        raise ValueError("SweepGraph: the approach must cross Titan's orbit (rp_soi <= a_titan)")
+    v, psi = approach_state_at(inputs["vinf_arr"], p["a_titan"], p["rp_soi"], p["mu_saturn"])
+    out["v_titan"][...] = v
+    out["psi"][...] = psi
+
+def _flyby(inputs, p, out) -> None:
+    # post_flyby_vinf_saturn takes Titan's orbital speed from constants (mu_saturn, a_titan)
+    v_out, vinf_t, delta = post_flyby_vinf_saturn(inputs["v_titan"], inputs["psi"], p["h_flyby"],
+                                                  mu_t=p["mu_titan"], prograde=bool(p["prograde"]))
+    out["vinf_titan"][...] = vinf_t
+    out["turn_angle"][...] = delta
+    out["vinf_saturn_out"][...] = v_out
+
+def _insertion(inputs, p, out) -> None:
+    v = inputs["vinf_saturn_out"]
+    dv = saturn_insertion(v, p["rp_soi"], p["ra_capture"], r=p["a_titan"], mu=p["mu_saturn"])
+    out["dv_soi"][...] = np.where(np.isfinite(v), dv, np.nan)
+
+def _total(inputs, p, out) -> None:
+    np.add(inputs["dv_leo"], inputs["dv_soi"], out=out["total_dv"])
+
+# mission_pipeline as a graph (same fields, same stage order)
+PIPELINE_STAGES = (
+    Stage("transfer", (), ("vinf_dep", "vinf_arr", "branch"), ("mu_sun", "a_earth", "a_saturn"),
+          ("use_long_way",), _transfer, pointwise=False),
+    Stage("departure", ("vinf_dep",), ("dv_leo",), ("mu_earth", "R_EARTH"), ("leo_alt_km",), _departure),
+    Stage("approach", ("vinf_arr",), ("v_titan", "psi"), ("mu_saturn", "a_titan"), ("rp_soi",), _approach),
+    Stage("flyby", ("v_titan", "psi"), ("vinf_titan", "turn_angle", "vinf_saturn_out"),
+          ("mu_saturn", "mu_titan", "a_titan"), ("h_flyby", "prograde"), _flyby),
+    Stage("insertion", ("vinf_saturn_out",), ("dv_soi",), ("mu_saturn", "a_titan"),
+          ("rp_soi", "ra_capture"), _insertion),
+    Stage("total", ("dv_leo", "dv_soi"), ("total_dv",), (), (), _total),
+)
+DEFAULT_KNOBS = dict(use_long_way=True, leo_alt_km=300.0, **ArrivalPlan()._asdict())
+
+# ================================
+# Fingerprints
+# ================================
+def _digest(data: bytes) -> np.uint64:
+    # 0 is reserved for "never computed"
+    return np.uint64(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little") or 1)
+
+def stage_fingerprint(stage: Stage, knobs: Dict[str, object]) -> np.uint64:
+    """Fingerprint of a stage's code version and the current values of its constants and knobs."""
+    values = [(name, float(getattr(constants, name))) for name in stage.constants]
+    values += [(name, knobs[name]) for name in stage.knobs]
+    return _digest(repr((stage.name, stage.version, values)).encode())
+
+def _params(stage: Stage, knobs: Dict[str, object]) -> Dict[str, object]:
+    p = {name: float(getattr(constants, name)) for name in stage.constants}
+    p.update((name, knobs[name]) for name in stage.knobs)
+    return p
+
+def _check_stages(stages: Tuple[Stage, ...]) -> Dict[str, str]:
+    # Every input must come from an earlier stage, and no field is written twice.
+    # Returns field -> producing stage.
+    producer = {}
+    for s in stages:
+        missing = [f for f in s.inputs if f not in producer]
+        if missing:
+            raise ValueError(f"SweepGraph: stage {s.name!r} reads {missing} before any stage writes them")
+        for f in s.outputs:
+            if f in producer:
+                raise ValueError(f"SweepGraph: field {f!r} is written by {producer[f]!r} and {s.name!r}")
+            producer[f] = s.name
+        shadowed = [k for k in s.knobs if hasattr(constants, k)]
+        if shadowed:
+            raise ValueError(f"SweepGraph: knobs {shadowed} of {s.name!r} shadow constants.py names")
+    return producer
+
+# ================================
+# Graph
+# ================================
+class SweepGraph:
+    """
+    Directory-backed grid of stage outputs with per-tile fingerprints. Fields are (n_tof, n_dep)
+    memmaps (NaN, or -1 for branch, until computed). `knobs` holds the knob values of the last update.
+
+    Args:
+        path   : graph directory (created if it has no meta.json)
+        t_dep  : (n_dep,) departure epochs (s); None reopens the stored axes
+        tof    : (n_tof,) times of flight (s)
+        stages : stage list in dependency order
+        tile   : invalidation / solve tile (rows, cols)
+    A stored graph with a different grid shape or tile raises ValueError. The same shape with
+    changed axis values is accepted: tiles whose axes changed are recomputed by the next update.
+    """
+
+    def __init__(self, path: str | Path, t_dep: np.ndarray | None = None, tof: np.ndarray | None = None,
+                 stages: Tuple[Stage, ...] = PIPELINE_STAGES, tile: Tuple[int, int] = (256, 256)):
+        self.path = Path(path)
+        self.stages = tuple(stages)
+        self._producer = _check_stages(self.stages)
+        if (self.path / "meta.json").exists():
+            with open(self.path / "meta.json") as fh:
+                self.meta = json.load(fh)
+            if self.meta.get("version") != GRAPH_VERSION:
+                raise ValueError(f"{self.path}: unsupported graph version {self.meta.get('version')}")
+            self.t_dep = np.load(self.path / "t_dep.npy")
+            self.tof = np.load(self.path / "tof.npy")
+            if t_dep is not None:
+                t_dep = np.asarray(t_dep, dtype=float)
+                tof = np.asarray(tof, dtype=float)
+                if (t_dep.shape, tof.shape) != (self.t_dep.shape, self.tof.shape) or list(tile) != self.meta["tile"]:
+                    raise ValueError(f"{self.path}: stored graph has a different grid shape or tile")
+                self.t_dep, self.tof = t_dep, tof
+        else:
+            if t_dep is None or tof is None:
+                raise ValueError(f"{self.path}: no graph here; pass t_dep and tof to create one")
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.t_dep = np.asarray(t_dep, dtype=float)
+            self.tof = np.asarray(tof, dtype=float)
+            self.meta = {"version": GRAPH_VERSION, "shape": [self.tof.size, self.t_dep.size],
+                         "tile": list(tile), "knobs": dict(DEFAULT_KNOBS), "stages": {}}
+            self._write_meta()
+        self.tile = tuple(self.meta["tile"])
+        self.tile_grid = (-(-self.tof.size // self.tile[0]), -(-self.t_dep.size // self.tile[1]))
+        # fields and fingerprint arrays of stages added since the graph was created start empty
+        self.fields = {f: self._open(f"{f}.npy", DTYPES.get(f, np.float64), self.shape, FILL.get(f, np.nan))
+                       for s in self.stages for f in s.outputs}
+        self.fingerprints = {s.name: self._open(f"fp_{s.name}.npy", np.uint64, self.tile_grid, 0)
+                             for s in self.stages}
+
+    def _open(self, name: str, dtype, shape: Tuple[int, int], fill) -> np.memmap:
+        fname = self.path / name
+        if not fname.exists():
+            arr = np.lib.format.open_memmap(self.path / (name + ".tmp"), mode="w+", dtype=dtype, shape=shape)
+            arr[...] = fill
+            arr.flush()
+            del arr
+            os.replace(self.path / (name + ".tmp"), fname)
+        return np.load(fname, mmap_mode="r+")
+
+    def _write_meta(self) -> None:
+        np.save(self.path / "t_dep.npy", self.t_dep)
+        np.save(self.path / "tof.npy", self.tof)
+        tmp = self.path / "meta.json.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self.meta, fh, indent=2)
+        os.replace(tmp, self.path / "meta.json")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.tof.size, self.t_dep.size)
+
+    @property
+    def knobs(self) -> Dict[str, object]:
+        return dict(self.meta["knobs"])
+
+    def __getitem__(self, name: str) -> np.memmap:
+        return self.fields[name]
+
+    # ---- invalidation ----
+    def _merged_knobs(self, changes: Dict[str, object]) -> Dict[str, object]:
+        unknown = sorted(set(changes) - {k for s in self.stages for k in s.knobs})
+        if unknown:
+            raise ValueError(f"SweepGraph: unknown knobs {unknown}")
+        knobs = dict(DEFAULT_KNOBS, **self.meta["knobs"])
+        # coerce to the default's type so 400 and 400.0 fingerprint alike
+        knobs.update((k, type(DEFAULT_KNOBS[k])(v) if k in DEFAULT_KNOBS else v) for k, v in changes.items())
+        return knobs
+
+    def _axis_fingerprints(self) -> np.ndarray:
+        out = np.empty(self.tile_grid, dtype=np.uint64)
+        ti, tj = self.tile
+        for i in range(self.tile_grid[0]):
+            rows = self.tof[i * ti:(i + 1) * ti].tobytes()
+            for j in range(self.tile_grid[1]):
+                out[i, j] = _digest(rows + self.t_dep[j * tj:(j + 1) * tj].tobytes())
+        return out
+
+    def _expected(self, knobs: Dict[str, object]) -> Dict[str, np.ndarray]:
+        # Tile fingerprints every stage should have under `knobs`, in stage order
+        expected = {}
+        axes = None
+        for s in self.stages:
+            parts = [np.full(self.tile_grid, stage_fingerprint(s, knobs))]
+            parts += [expected[d] for d in sorted({self._producer[f] for f in s.inputs})]
+            if not s.pointwise:
+                axes = self._axis_fingerprints() if axes is None else axes
+                parts.append(axes)
+            rows = np.ascontiguousarray(np.stack(parts, axis=-1)).reshape(-1, len(parts))
+            expected[s.name] = np.array([_digest(r.tobytes()) for r in rows],
+                                        dtype=np.uint64).reshape(self.tile_grid)
+        return expected
+
+    def stale(self, **knobs) -> Dict[str, int]:
+        """Tiles per stage that update(**knobs) would recompute (nothing is run)."""
+        expected = self._expected(self._merged_knobs(knobs))
+        return {s.name: int(np.count_nonzero(self.fingerprints[s.name] != expected[s.name])) for s in self.stages}
+
+    # ---- recomputation ----
+    def _tile_slices(self, i: int, j: int) -> Tuple[slice, slice]:
+        ti, tj = self.tile
+        return slice(i * ti, min((i + 1) * ti, self.shape[0])), slice(j * tj, min((j + 1) * tj, self.shape[1]))
+
+    def _run_pointwise(self, s: Stage, stale: np.ndarray, p: Dict[str, object]) -> None:
+        # Whole stale tile rows are contiguous bands, processed as flat chunks. Other stale
+        # tiles are processed one at a time as 2-D views.
+        for i in np.flatnonzero(stale.any(axis=1)):
+            if stale[i].all():
+                si = self._tile_slices(i, 0)[0]
+                ins = {f: self.fields[f][si].reshape(-1) for f in s.inputs}
+                outs = {f: self.fields[f][si].reshape(-1) for f in s.outputs}
+                for c in range(0, (si.stop - si.start) * self.shape[1], _CHUNK):
+                    b = slice(c, c + _CHUNK)
+                    s.fn({f: a[b] for f, a in ins.items()}, p, {f: a[b] for f, a in outs.items()})
+            else:
+                for j in np.flatnonzero(stale[i]):
+                    si, sj = self._tile_slices(i, j)
+                    s.fn({f: self.fields[f][si, sj] for f in s.inputs}, p,
+                         {f: self.fields[f][si, sj] for f in s.outputs})
+
+    def update(self, workers: int | None = 1, **knobs) -> Dict[str, int]:
+        """
+        Bring every stage up to date with the current constants and the knobs (stored knobs
+        overridden by `knobs`), recomputing only the stale tiles of each stage.
+        Before a tile is written, its stored fingerprint is cleared. The new fingerprint is stored
+        only after the outputs are flushed, so an interrupted update is redone rather than trusted.
+        Args:
+            workers : process-pool size for the Lambert stage (None: all CPUs)
+            knobs   : knob changes, e.g. leo_alt_km=400.0; they are stored with the graph
+        Returns:
+            Tiles recomputed per stage.
+        """
+        knobs = self._merged_knobs(knobs)
+        expected = self._expected(knobs)
+        done = {}
+        for s in self.stages:
+            fp, want = self.fingerprints[s.name], expected[s.name]
+            stale = fp != want
+            done[s.name] = int(np.count_nonzero(stale))
+            if not done[s.name]:
+                continue
+            fp[stale] = 0
+            fp.flush()
+            p = _params(s, knobs)
+            with instrument.timer(f"graph.{s.name}"):
+                if s.pointwise:
+                    self._run_pointwise(s, stale, p)
+                    for f in s.outputs:
+                        self.fields[f].flush()
+                    fp[stale] = want[stale]
+                else:
+                    tiles = [self._tile_slices(i, j) for i, j in zip(*np.nonzero(stale))]
+                    for si, sj, values in s.fn(self.t_dep, self.tof, tiles, self.fields, p, workers):
+                        for f in s.outputs:
+                            self.fields[f][si, sj] = values[f]
+                            self.fields[f].flush()
+                        key = (si.start // self.tile[0], sj.start // self.tile[1])
+                        fp[key] = want[key]
+                        fp.flush()
+            fp.flush()
+            rec = instrument.active()
+            if rec is not None:
+                rec.count(f"graph.{s.name}.tiles", done[s.name])
+        self.meta["knobs"] = knobs
+        self.meta["stages"] = {s.name: f"{int(stage_fingerprint(s, knobs)):016x}" for s in self.stages}
+        self._write_meta()
+        return done
+
+__all__ = [
+    "GRAPH_VERSION", "Stage", "DTYPES", "FILL", "PIPELINE_STAGES", "DEFAULT_KNOBS",
+    "stage_fingerprint", "SweepGraph",
+]
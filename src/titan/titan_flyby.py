@@ -0,0 +1,90 @@
+"""
+Titan flyby patched-conics helpers (turn angle, periapsis radius, post-flyby Saturn-relative v∞).
+All functions broadcast over array inputs; scalar inputs give the same scalar results as before.
+Usage:
+    from titan.titan_flyby import turn_angle, rp_from_turn, post_flyby_vinf_saturn
+"""
+from __future__ import annotations
+import numpy as np
+from typing import Tuple
+from .constants import mu_saturn, mu_titan, a_titan, circ_speed
+from . import instrument
+
+R_TITAN = 2_575_000.0  # Titan mean radius [m]
+
+def turn_angle(vinf_t: float | np.ndarray, rp: float | np.ndarray,
+               mu_t: float = mu_titan) -> float | np.ndarray:
+    """
+    Flyby turn angle δ (radians) given Titan-relative v∞ and periapsis radius rp.
+    δ = 2 * atan( μ / (rp * v∞^2) )
+    """
+    return 2.0 * np.arctan(mu_t / (rp * vinf_t**2))
+
+def rp_from_turn(vinf_t: float | np.ndarray, delta: float | np.ndarray,
+                 mu_t: float = mu_titan) -> float | np.ndarray:
+    """
+    Invert the turn-angle relation to get required periapsis radius rp.
+    """
+    return mu_t / (vinf_t**2 * np.tan(delta / 2.0))
+
+def titan_orbital_speed() -> float:
+    """Titan's circular speed around Saturn (m/s)."""
+    return circ_speed(mu_saturn, a_titan)
+
+@instrument.timed("flyby.post_flyby_vinf_saturn")
+def post_flyby_vinf_saturn(
+    vinf_saturn: float | np.ndarray,
+    psi: float | np.ndarray,
+    h_peri: float | np.ndarray,
+    mu_t: float = mu_titan,
+    prograde: bool | np.ndarray = True,
+) -> Tuple[float | np.ndarray, float | np.ndarray, float | np.ndarray]:
+    """
+    Patched-conics quick-look: incoming Saturn-relative v∞ with magnitude V,
+    Titan orbital speed VT, and alignment angle psi (angle between V and VT).
+    We rotate the Titan-relative incoming v∞ by ±δ at periapsis, then add back VT.
+    vinf_saturn, psi, h_peri (and prograde) broadcast against each other; with all-scalar
+    inputs the results are Python floats.
+
+    Args:
+        vinf_saturn : |V| Saturn-relative incoming v∞ (m/s)
+        psi         : angle between V and VT in the Saturn frame [rad]
+        h_peri      : flyby periapsis altitude above Titan surface [m]
+        prograde    : if True rotate by +δ, else by -δ
+
+    Returns:
+        (V_out_mag, vinf_t_in, delta)
+    """
+    VT = titan_orbital_speed()
+    scalar = all(np.ndim(x) == 0 for x in (vinf_saturn, psi, h_peri, prograde))
+
+    # Put V along +x; VT at angle psi
+    Vx = np.asarray(vinf_saturn, dtype=float)
+    VTx, VTy = VT * np.cos(psi), VT * np.sin(psi)
+
+    # Titan-relative incoming v∞
+    vx, vy = Vx - VTx, -VTy
+    vinf_t_in = np.sqrt(vx*vx + vy*vy)
+
+    # Periapsis radius
+    rp = R_TITAN + np.asarray(h_peri, dtype=float)
+    delta = turn_angle(vinf_t_in, rp, mu_t)
+
+    # Rotate incoming Titan-relative v∞ by ±δ
+    s = np.where(prograde, 1.0, -1.0)
+    c, sgn = np.cos(s * delta), np.sin(s * delta)
+    ox = c*vx - sgn*vy
+    oy = sgn*vx + c*vy
+
+    # Back to Saturn frame
+    ox, oy = ox + VTx, oy + VTy
+    Vout = np.sqrt(ox*ox + oy*oy)
+    rec = instrument.active()
+    if rec is not None:
+        rec.count("flyby.evaluations", int(np.size(Vout)))
+        rec.count("flyby.nonfinite", int(np.size(Vout) - np.count_nonzero(np.isfinite(Vout))))
+    if scalar:
+        return float(Vout), float(vinf_t_in), float(delta)
+    return Vout, vinf_t_in, delta
+
+__all__ = ["R_TITAN", "turn_angle", "rp_from_turn", "titan_orbital_speed", "post_flyby_vinf_saturn"]
@@ -0,0 +1,202 @@
+"""
+Multi-flyby Titan tour search (planar, unpowered, resonant returns).
+Between flybys the spacecraft flies an m:n resonant Saturn orbit (m Titan revolutions, n spacecraft
+revolutions), so every encounter happens at the same point with the same Titan-relative v∞
+magnitude; each flyby only pumps the v∞ direction. The search is a beam search over resonance
+sequences with branch-and-bound on total flight time and a memo table keyed on discretized
+(v∞, orbit period) states. Finished tours are streamed from a generator.
+Usage:
+    from titan.titan_tour import search_tours
+    for tour in search_tours(vinf_t=1_500.0, p_start=48 * DAY, p_target=16 * DAY):
+        ...
+"""
+from __future__ import annotations
+import numpy as np
+from typing import Iterator, List, NamedTuple, Tuple
+from .constants import mu_saturn, a_titan
+from .titan_flyby import R_TITAN, post_flyby_vinf_saturn, rp_from_turn, titan_orbital_speed, turn_angle
+
+DAY = 86400.0
+T_TITAN = 2.0 * np.pi * np.sqrt(a_titan**3 / mu_saturn)  # Titan orbital period [s]
+
+class TitanTour(NamedTuple):
+    resonances: List[Tuple[int, int]]  # (m Titan revs, n spacecraft revs) of each leg after a flyby
+    altitudes: List[float]             # flyby periapsis altitudes (m)
+    prograde: List[bool]               # turn direction passed to post_flyby_vinf_saturn
+    periods: List[float]               # spacecraft orbit period after each flyby (s)
+    tof: float                         # total time from the first flyby to the last (s)
+
+    @property
+    def n_flybys(self) -> int:
+        return len(self.altitudes)
+
+def resonance_table(m_max: int = 8, n_max: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct m:n resonances (period ratio m/n) as (mn (K, 2) int array, ratio (K,))."""
+    seen = {}
+    for m in range(1, m_max + 1):
+        for n in range(1, n_max + 1):
+            seen.setdefault(m / n, (m, n))  # lowest m first: 2:1 before 4:2
+    ratio = np.array(sorted(seen))
+    mn = np.array([seen[r] for r in ratio], dtype=int)
+    return mn, ratio
+
+def pump_angle(vinf_t: float, period: float | np.ndarray) -> float | np.ndarray:
+    """
+    Angle α between Titan-relative v∞ and Titan's velocity that gives an orbit of this period
+    through Titan's radius; NaN when unreachable with this v∞.
+    """
+    VT = titan_orbital_speed()
+    a = np.cbrt(mu_saturn * (np.asarray(period, dtype=float) / (2.0 * np.pi))**2)
+    V2 = mu_saturn * (2.0 / a_titan - 1.0 / a)
+    cos_a = (V2 - VT**2 - vinf_t**2) / (2.0 * VT * vinf_t)
+    with np.errstate(invalid="ignore"):
+        return np.where(np.abs(cos_a) <= 1.0, np.arccos(np.clip(cos_a, -1.0, 1.0)), np.nan)
+
+def _orbit_period(V: np.ndarray) -> np.ndarray:
+    # Saturn-orbit period for speed V at Titan's radius (inf when unbound)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = 1.0 / (2.0 / a_titan - V**2 / mu_saturn)
+        return np.where(a > 0, 2.0 * np.pi * np.sqrt(np.abs(a)**3 / mu_saturn), np.inf)
+
+def search_tours(vinf_t: float, p_start: float, p_target: float,
+                 h_min: float = 1_000e3, h_max: float = 10_000e3,
+                 max_flybys: int = 12, beam_width: int = 256,
+                 m_max: int = 8, n_max: int = 8, target_tol: float = 0.02,
+                 v_bin: float = 10.0, p_bin: float = 0.05 * DAY,
+                 bound_slack: float = 0.25, stats: dict | None = None) -> Iterator[TitanTour]:
+    """
+    Stream resonant Titan tours that take the orbit period from p_start to within target_tol of p_target.
+    Each level expands every beam node against every resonance at once:
+      - the required pump change Δα must be turnable at an altitude in [h_min, h_max]
+        (altitude from rp_from_turn),
+      - the flyby is replayed through post_flyby_vinf_saturn (both turn directions) and kept only
+        if it lands on the resonant orbit,
+      - nodes are dropped when the memo table already reached the same discretized (v∞, period)
+        state sooner, or when time-so-far plus an optimistic remainder exceeds the best finished
+        tour by more than bound_slack,
+      - the beam_width nodes with the lowest optimistic total time survive.
+    Memory is O(beam_width × max_flybys) plus the memo table.
+    Args:
+        vinf_t     : Titan-relative v∞ magnitude (m/s), preserved by unpowered flybys
+        p_start    : spacecraft period before the first flyby (s)
+        p_target   : period to reach (s)
+        h_min/max  : allowed flyby altitude band (m)
+        max_flybys : search depth
+        beam_width : nodes kept per level
+        m_max/n_max: largest Titan / spacecraft revolution counts per resonant leg
+        target_tol : relative period tolerance that counts as arrival
+        v_bin/p_bin: memo discretization of v∞ (m/s) and period (s)
+        bound_slack: keep nodes whose optimistic total time is within (1 + slack) × best tour
+        stats      : optional dict updated with "expanded", "feasible", "memo_pruned",
+                     "bound_pruned", "tours"
+    Yields:
+        TitanTour, in order of discovery (shallower tours first).
+    """
+    if stats is None:
+        stats = {}
+    for key in ("expanded", "feasible", "memo_pruned", "bound_pruned", "tours"):
+        stats.setdefault(key, 0)
+
+    VT = titan_orbital_speed()
+    mn, ratio = resonance_table(m_max, n_max)
+    periods = ratio * T_TITAN
+    alpha_k = pump_angle(vinf_t, periods)            # (K,) pump angle on each resonant orbit
+    leg_tof = mn[:, 0] * T_TITAN                     # m Titan revolutions per leg
+    delta_max = turn_angle(vinf_t, R_TITAN + h_min)  # largest turn per flyby
+    alpha_target = pump_angle(vinf_t, p_target)
+    alpha0 = pump_angle(vinf_t, p_start)
+    if not np.isfinite(alpha0) or not np.isfinite(alpha_target):
+        raise ValueError("search_tours: start or target period is not reachable with this v∞")
+
+    def optimistic_rest(alpha: np.ndarray) -> np.ndarray:
+        # remaining flybys × one Titan revolution per leg (shortest possible leg)
+        return np.ceil(np.abs(alpha - alpha_target) / delta_max - 1e-9) * T_TITAN
+
+    # beam state
+    alpha = np.array([alpha0])
+    g = np.array([0.0])
+    k_cur = np.array([-1])
+    # per-level back-pointers: (parent, resonance index, altitude, prograde, period)
+    levels: List[Tuple[np.ndarray, ...]] = []
+    memo: dict = {}
+    best = np.inf
+
+    for depth in range(max_flybys):
+        B, K = alpha.size, ratio.size
+        stats["expanded"] += B * K
+        d_alpha = np.abs(alpha_k[None, :] - alpha[:, None])  # (B, K)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h = rp_from_turn(vinf_t, d_alpha) - R_TITAN
+        ok = np.isfinite(d_alpha) & (d_alpha <= delta_max) & (h >= h_min) & (h <= h_max)
+        ok &= np.arange(K)[None, :] != k_cur[:, None]
+        b_idx, k_idx = np.nonzero(ok)
+        if b_idx.size == 0:
+            return
+
+        # replay the flyby through the patched-conics mapping and keep the matching turn direction
+        a_in = alpha[b_idx]
+        V_in = np.sqrt(VT**2 + vinf_t**2 + 2.0 * VT * vinf_t * np.cos(a_in))
+        psi = np.arctan2(vinf_t * np.sin(a_in), VT + vinf_t * np.cos(a_in))
+        hh = h[b_idx, k_idx]
+        V_pro = post_flyby_vinf_saturn(V_in, psi, hh, prograde=True)[0]
+        V_ret = post_flyby_vinf_saturn(V_in, psi, hh, prograde=False)[0]
+        P_pro, P_ret = _orbit_period(V_pro), _orbit_period(V_ret)
+        P_want = periods[k_idx]
+        use_pro = np.abs(P_pro - P_want) <= np.abs(P_ret - P_want)
+        P_out = np.where(use_pro, P_pro, P_ret)
+        hit = np.abs(P_out - P_want) <= 1e-6 * P_want
+        b_idx, k_idx, hh, use_pro, P_out = b_idx[hit], k_idx[hit], hh[hit], use_pro[hit], P_out[hit]
+        stats["feasible"] += b_idx.size
+
+        g_new = g[b_idx]  # time up to this flyby; the leg after it only counts if the tour continues
+        levels.append((b_idx, k_idx, hh, use_pro, P_out))
+
+        done = np.abs(P_out - p_target) <= target_tol * p_target
+        for c in np.flatnonzero(done):
+            tof = float(g_new[c])
+            best = min(best, tof)
+            stats["tours"] += 1
+            yield _backtrack(levels, c, mn, tof)
+
+        # survivors continue with one more resonant leg
+        live = np.flatnonzero(~done)
+        g_live = g_new[live] + leg_tof[k_idx[live]]
+        a_live = alpha_k[k_idx[live]]
+        score = g_live + optimistic_rest(a_live)
+        keep = score <= best * (1.0 + bound_slack)
+        stats["bound_pruned"] += int((~keep).sum())
+        live, g_live, a_live, score = live[keep], g_live[keep], a_live[keep], score[keep]
+
+        order = np.argsort(score, kind="stable")
+        sel = []
+        for c in order:
+            key = (round(vinf_t / v_bin), round(float(P_out[live[c]]) / p_bin))
+            if memo.get(key, np.inf) <= g_live[c]:
+                stats["memo_pruned"] += 1
+                continue
+            memo[key] = g_live[c]
+            sel.append(c)
+            if len(sel) == beam_width:
+                break
+        if not sel:
+            return
+        sel = np.array(sel)
+        # compact this level to the surviving children so back-pointers stay O(beam_width)
+        rows = live[sel]
+        lv = levels[-1]
+        levels[-1] = tuple(x[rows] for x in lv)
+        alpha, g, k_cur = a_live[sel], g_live[sel], k_idx[rows]
+
+def _backtrack(levels: list, c: int, mn: np.ndarray, tof: float) -> TitanTour:
+    # Walk parent pointers from entry c of the last level back to the root
+    res, alts, pro, pers = [], [], [], []
+    for lvl in range(len(levels) - 1, -1, -1):
+        b_idx, k_idx, hh, use_pro, P_out = levels[lvl]
+        res.append((int(mn[k_idx[c], 0]), int(mn[k_idx[c], 1])))
+        alts.append(float(hh[c]))
+        pro.append(bool(use_pro[c]))
+        pers.append(float(P_out[c]))
+        c = int(b_idx[c])
+    return TitanTour(res[::-1], alts[::-1], pro[::-1], pers[::-1], tof)
+
+__all__ = ["TitanTour", "T_TITAN", "resonance_table", "pump_angle", "search_tours"]
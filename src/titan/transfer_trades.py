@@ -0,0 +1,228 @@
+"""
+Vectorized trade study of impulsive transfers between circular, coplanar orbits about one primary:
+Hohmann, bi-elliptic (a set of intermediate apoapsis radii) and Hohmann preceded by a phasing orbit.
+Rows are (r1, r2, mu) triples, optionally with the current phase of the target; every option is
+evaluated on whole batches of rows and the cheapest feasible one is kept per row in a structured
+array. Body pairs come from a small registry seeded from constants.py that users can extend.
+Usage:
+    from titan.transfer_trades import trade_study, pair_table, add_body
+    names, r1, r2, mu = pair_table()
+    best = trade_study(r1, r2, mu)
+    best["option"], best["dv"], best["time"]
+"""
+from __future__ import annotations
+import numpy as np
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+from .constants import mu_sun, mu_earth, mu_saturn, mu_titan, a_earth, a_saturn, a_titan
+from .transfers import bielliptic_dv_array, hohmann_dv_array
+
+TWO_PI = 2.0 * np.pi
+
+# Option codes in the `option` field
+NONE       = -1  # nothing meets the time limit
+HOHMANN    = 0
+BIELLIPTIC = 1
+PHASING    = 2   # phasing orbit(s) at r1, then Hohmann
+OPTION_NAMES = {NONE: "none", HOHMANN: "hohmann", BIELLIPTIC: "bielliptic", PHASING: "phasing"}
+
+TRADE_DTYPE = np.dtype([
+    ("option", "i1"),          # best option code (HOHMANN, BIELLIPTIC, PHASING or NONE)
+    ("dv", "f8"),              # total Δv of the best option (m/s)
+    ("time", "f8"),            # wait + phasing + transfer time of the best option (s)
+    ("rb", "f8"),              # bi-elliptic intermediate apoapsis (m), NaN otherwise
+    ("revs", "i1"),            # phasing-orbit revolutions, 0 otherwise
+    ("dv_hohmann", "f8"),      # Hohmann Δv (m/s), the reference for savings
+    ("dv_bielliptic", "f8"),   # cheapest feasible bi-elliptic Δv (m/s), NaN if none
+    ("dv_phasing", "f8"),      # cheapest feasible phasing + Hohmann Δv (m/s), NaN if none
+])
+
+# ================================
+# Bodies
+# ================================
+class Body(NamedTuple):
+    mu: float       # GM of the body itself (m^3/s^2)
+    a: float        # circular orbit radius about its primary (m); 0 for a root body
+    primary: str    # name of the body it orbits; "" for a root body
+
+BODIES: Dict[str, Body] = {
+    "sun":    Body(mu_sun, 0.0, ""),
+    "earth":  Body(mu_earth, a_earth, "sun"),
+    "saturn": Body(mu_saturn, a_saturn, "sun"),
+    "titan":  Body(mu_titan, a_titan, "saturn"),
+}
+
+def add_body(name: str, mu: float, a: float, primary: str = "sun") -> Body:
+    """Register (or replace) a body on a circular orbit of radius a about `primary`."""
+    if primary not in BODIES:
+        raise KeyError(f"add_body: unknown primary {primary!r}")
+    BODIES[name] = Body(float(mu), float(a), primary)
+    return BODIES[name]
+
+def pair_table(names: Sequence[str] | None = None) -> Tuple[List[Tuple[str, str]], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every ordered (departure, arrival) pair of registered bodies that share a primary.
+    Args:
+        names : bodies to consider (default: all registered)
+    Returns:
+        (pairs, r1, r2, mu): pair names and (n_pairs,) radii (m) and primary GM (m^3/s^2)
+    """
+    names = list(BODIES) if names is None else list(names)
+    pairs = [(a, b) for a in names for b in names
+             if a != b and BODIES[a].primary and BODIES[a].primary == BODIES[b].primary]
+    r1 = np.array([BODIES[a].a for a, _ in pairs])
+    r2 = np.array([BODIES[b].a for _, b in pairs])
+    mu = np.array([BODIES[BODIES[a].primary].mu for a, _ in pairs])
+    return pairs, r1, r2, mu
+
+# ================================
+# Phasing geometry
+# ================================
+def _wait(lead: np.ndarray, lead_req: np.ndarray, drift_sign: np.ndarray, drift_inv: np.ndarray) -> np.ndarray:
+    # Time until the target lead angle drifts from `lead` to `lead_req`. The lead changes at
+    # n2 - n1 = -drift_sign / drift_inv; equal periods (drift_sign 0) give NaN, i.e. never.
+    w = lead - lead_req
+    w *= drift_sign
+    np.mod(w, TWO_PI, out=w)
+    with np.errstate(invalid="ignore"):
+        w *= drift_inv
+    return w
+
+def _phasing(r1: np.ndarray, mu: np.ndarray, n1: np.ndarray, n2: np.ndarray, lead: np.ndarray,
+             lead_req: np.ndarray, revs: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Tangent phasing orbit at r1 flown for `revs` revolutions so the lead reaches lead_req when the
+    # spacecraft is back at the burn point: revs·Tp·n2 = lead_req - lead + 2π(revs + j), with the
+    # integer j giving the period closest to the circular one. Returns (Δv for both burns, revs·Tp).
+    T1 = TWO_PI / n1
+    base = np.mod(lead_req - lead, TWO_PI)
+    j = np.round((n2 * revs * T1 - base) / TWO_PI)
+    Tp = (base + TWO_PI * j) / (n2 * revs)
+    a_p = np.cbrt(mu * (Tp / TWO_PI)**2)
+    with np.errstate(invalid="ignore"):
+        v_p = np.sqrt(mu * (2.0 / r1 - 1.0 / a_p))
+    dv = 2.0 * np.abs(v_p - n1 * r1)
+    dv[(Tp <= 0) | (a_p <= 0.5 * r1)] = np.nan  # no orbit, or the far apsis goes through the primary
+    return dv, revs * Tp
+
+# ================================
+# Trade study
+# ================================
+def _trade_batch(r1, r2, mu, lead, t_max, rb_ratios, phasing_revs, out) -> None:
+    # Evaluate all options for one batch of rows and fill `out` (a TRADE_DTYPE view)
+    n1 = np.sqrt(mu / r1**3)
+    n2 = np.sqrt(mu / r2**3)
+    if lead is not None:
+        drift_sign = np.sign(n1 - n2)
+        with np.errstate(divide="ignore"):
+            drift_inv = 1.0 / np.abs(n1 - n2)
+
+    dv1, dv2, tof_h = hohmann_dv_array(r1, r2, mu)
+    dv_h = dv1 + dv2
+    lead_h = np.mod(np.pi - n2 * tof_h, TWO_PI)
+    t_h = tof_h + (_wait(lead, lead_h, drift_sign, drift_inv) if lead is not None else 0.0)
+    out["dv_hohmann"] = dv_h
+
+    ok = t_h <= t_max  # NaN (never) and inf times fail against a finite limit, NaN always fails
+    ok &= np.isfinite(t_h)
+    best_dv = np.where(ok, dv_h, np.inf)
+    best_t = np.where(ok, t_h, np.nan)
+    option = np.where(ok, HOHMANN, NONE).astype(np.int8)
+
+    # bi-elliptic: keep the cheapest intermediate radius that meets the time limit
+    r_max = np.maximum(r1, r2)
+    dv_b = np.full(r1.shape, np.inf)
+    t_b = np.full(r1.shape, np.nan)
+    rb_b = np.full(r1.shape, np.nan)
+    for ratio in rb_ratios:
+        rb = ratio * r_max
+        d1, d2, d3, tof = bielliptic_dv_array(r1, r2, rb, mu)
+        dv = d1 + d2 + d3
+        if lead is not None:
+            tof = tof + _wait(lead, np.mod(-n2 * tof, TWO_PI), drift_sign, drift_inv)
+        better = tof <= t_max
+        better &= np.isfinite(tof)
+        better &= dv < dv_b
+        np.copyto(dv_b, dv, where=better)
+        np.copyto(t_b, tof, where=better)
+        np.copyto(rb_b, rb, where=better)
+    use = dv_b < best_dv
+    np.copyto(best_dv, dv_b, where=use)
+    np.copyto(best_t, t_b, where=use)
+    option[use] = BIELLIPTIC
+    out["dv_bielliptic"] = np.where(np.isfinite(dv_b), dv_b, np.nan)
+
+    # phasing then Hohmann (needs the target phase)
+    dv_p = np.full(r1.shape, np.inf)
+    t_p = np.full(r1.shape, np.nan)
+    k_p = np.zeros(r1.shape, np.int8)
+    if lead is not None:
+        for revs in range(1, phasing_revs + 1):
+            dv, t = _phasing(r1, mu, n1, n2, lead, lead_h, revs)
+            dv = dv + dv_h
+            t = t + tof_h
+            better = t <= t_max
+            better &= dv < dv_p  # NaN Δv (no phasing orbit) never wins
+            np.copyto(dv_p, dv, where=better)
+            np.copyto(t_p, t, where=better)
+            k_p[better] = revs
+        use = dv_p < best_dv
+        np.copyto(best_dv, dv_p, where=use)
+        np.copyto(best_t, t_p, where=use)
+        option[use] = PHASING
+        k_p[~use] = 0
+    out["revs"] = k_p
+    out["dv_phasing"] = np.where(np.isfinite(dv_p), dv_p, np.nan)
+
+    out["option"] = option
+    out["rb"] = np.where(option == BIELLIPTIC, rb_b, np.nan)
+    out["dv"] = np.where(np.isfinite(best_dv), best_dv, np.nan)
+    out["time"] = best_t
+
+def trade_study(r1: float | np.ndarray, r2: float | np.ndarray, mu: float | np.ndarray,
+                phase: float | np.ndarray | None = None, t_max: float | np.ndarray = np.inf,
+                rb_ratios: Sequence[float] = (2.0, 5.0, 15.0, 50.0), phasing_revs: int = 3,
+                batch_size: int = 1 << 14, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Cheapest transfer option per row (minimum total Δv among options that fit in t_max).
+    Args:
+        r1, r2       : departure / arrival circular-orbit radii (m), broadcast together with mu
+        mu           : primary GM (m^3/s^2)
+        phase        : current angle of the target ahead of the spacecraft (rad). When given, each
+                       option's time includes the wait for its departure geometry and the phasing
+                       option is evaluated; when None, times are transfer times only.
+        t_max        : time limit per row (s)
+        rb_ratios    : bi-elliptic intermediate apoapsis radii as multiples of max(r1, r2)
+        phasing_revs : phasing orbits of 1 .. phasing_revs revolutions are considered
+        batch_size   : rows evaluated per batch (bounds the temporaries)
+        out          : optional TRADE_DTYPE array (e.g. a memmap) to fill instead of allocating
+    Returns:
+        Structured TRADE_DTYPE array of the broadcast shape, flattened to 1-D.
+    """
+    args = [r1, r2, mu, t_max] + ([phase] if phase is not None else [])
+    # broadcast views only (no copies); each batch gathers its rows into small float arrays
+    views = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x)) for x in args))
+    if min(rb_ratios, default=2.0) <= 1.0:
+        raise ValueError("trade_study: rb_ratios must be > 1 (rb = max(r1, r2) is a Hohmann with a coast)")
+    shape = views[0].shape
+    n = views[0].size
+    if out is None:
+        out = np.empty(n, dtype=TRADE_DTYPE)
+    elif out.shape != (n,) or out.dtype != TRADE_DTYPE:
+        raise ValueError(f"trade_study: out must be a ({n},) TRADE_DTYPE array")
+
+    for i0 in range(0, n, batch_size):
+        b = slice(i0, min(i0 + batch_size, n))
+        idx = np.unravel_index(np.arange(b.start, b.stop), shape)
+        r1b, r2b, mub, t_maxb, *rest = (np.asarray(v[idx], dtype=float) for v in views)
+        _trade_batch(r1b, r2b, mub, np.mod(rest[0], TWO_PI) if rest else None, t_maxb,
+                     rb_ratios, phasing_revs, out[b])
+    return out
+
+def summarize(result: np.ndarray) -> Dict[str, int]:
+    """Number of rows won by each option."""
+    codes, counts = np.unique(result["option"], return_counts=True)
+    return {OPTION_NAMES[int(c)]: int(k) for c, k in zip(codes, counts)}
+
+__all__ = [
+    "NONE", "HOHMANN", "BIELLIPTIC", "PHASING", "OPTION_NAMES", "TRADE_DTYPE",
+    "Body", "BODIES", "add_body", "pair_table", "trade_study", "summarize",
+]
@@ -0,0 +1,117 @@
+"""
+Hohmann transfer utilities for circular heliocentric orbits.
+Usage:
+    from titan.transfers import hohmann_dv, vis_viva
+    from titan.transfers import hohmann_dv_array, vis_viva_array   # broadcasting variants
+    from titan.transfers import bielliptic_dv, bielliptic_dv_array
+"""
+from __future__ import annotations
+import numpy as np
+from typing import Tuple
+
+def hohmann_dv(r1: float, r2: float, mu: float) -> Tuple[float, float, float]:
+    """
+    Hohmann transfer between circular orbits of radii r1 -> r2 (about same primary).
+    Returns:
+        dv1 : injection Δv at r1 (m/s)
+        dv2 : circularization Δv at r2 (m/s)
+        tof : time of flight (s)
+    """
+    a_t = 0.5 * (r1 + r2)                           # transfer semi-major axis
+    v1  = np.sqrt(mu / r1)                          # circular speeds
+    v2  = np.sqrt(mu / r2)
+    v_peri = np.sqrt(mu * (2.0 / r1 - 1.0 / a_t))   # transfer speeds
+    v_apo  = np.sqrt(mu * (2.0 / r2 - 1.0 / a_t))
+    dv1 = abs(v_peri - v1)
+    dv2 = abs(v2 - v_apo)
+    tof = np.pi * np.sqrt(a_t**3 / mu)              # half an ellipse
+    return float(dv1), float(dv2), float(tof)
+
+def vis_viva(mu: float, r: float, a: float) -> float:
+    """Speed from vis-viva at radius r on an orbit with semi-major axis a around GM=mu."""
+    return float(np.sqrt(mu * (2.0 / r - 1.0 / a)))
+
+def _out_buffer(out: np.ndarray | None, *args) -> np.ndarray:
+    # float64 result buffer of the broadcast shape of args (or the caller's `out`)
+    if out is None:
+        return np.empty(np.broadcast_shapes(*(np.shape(x) for x in args)))
+    return out
+
+def vis_viva_array(mu: float | np.ndarray, r: float | np.ndarray, a: float | np.ndarray,
+                   out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Array version of vis_viva: broadcasts mu, r and a and evaluates in place in one buffer.
+    NaN where the orbit does not reach r (2/r < 1/a).
+    """
+    out = _out_buffer(out, mu, r, a)
+    np.divide(2.0, r, out=out)
+    out -= np.divide(1.0, a)
+    out *= mu
+    with np.errstate(invalid="ignore"):
+        return np.sqrt(out, out=out)
+
+def hohmann_dv_array(r1: float | np.ndarray, r2: float | np.ndarray, mu: float | np.ndarray
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Array version of hohmann_dv: broadcasts r1, r2 and mu.
+    Uses the closed forms dv1 = v1 |sqrt(2 r2 / (r1 + r2)) - 1| and
+    dv2 = v2 |1 - sqrt(2 r1 / (r1 + r2))|, so no transfer speeds are materialized.
+    Returns:
+        (dv1, dv2, tof) arrays of the broadcast shape (m/s, m/s, s)
+    """
+    shape = np.broadcast_shapes(np.shape(r1), np.shape(r2), np.shape(mu))
+    s = np.add(r1, r2, out=np.empty(shape))         # 2 a_t
+    dv1 = np.divide(r2, s, out=np.empty(shape))
+    dv1 *= 2.0
+    np.sqrt(dv1, out=dv1)
+    dv1 -= 1.0
+    np.abs(dv1, out=dv1)
+    dv1 *= np.sqrt(np.divide(mu, r1))
+    dv2 = np.divide(r1, s, out=np.empty(shape))
+    dv2 *= 2.0
+    np.sqrt(dv2, out=dv2)
+    np.subtract(1.0, dv2, out=dv2)
+    np.abs(dv2, out=dv2)
+    dv2 *= np.sqrt(np.divide(mu, r2))
+    s *= 0.5                                        # a_t, reused for the half-period
+    tof = np.power(s, 3, out=s)
+    tof /= mu
+    np.sqrt(tof, out=tof)
+    tof *= np.pi
+    return dv1, dv2, tof
+
+def bielliptic_dv(r1: float, r2: float, rb: float, mu: float) -> Tuple[float, float, float, float]:
+    """
+    Bi-elliptic transfer r1 -> rb -> r2 between circular orbits (rb >= max(r1, r2)): a half ellipse
+    out to rb, a burn there onto a second half ellipse down (or up) to r2, then circularization.
+    Returns:
+        dv1, dv2, dv3 : burns at r1, rb and r2 (m/s)
+        tof           : time of flight, both half ellipses (s)
+    """
+    dv1, dv2, dv3, tof = bielliptic_dv_array(r1, r2, rb, mu)
+    return float(dv1), float(dv2), float(dv3), float(tof)
+
+def bielliptic_dv_array(r1: float | np.ndarray, r2: float | np.ndarray, rb: float | np.ndarray,
+                        mu: float | np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Array version of bielliptic_dv: broadcasts r1, r2, rb and mu.
+    With s1 = r1 + rb and s2 = r2 + rb, uses the closed forms dv1 = v1 |sqrt(2 rb / s1) - 1|,
+    dv2 = sqrt(2 mu / rb) |sqrt(r2 / s2) - sqrt(r1 / s1)|, dv3 = v2 |sqrt(2 rb / s2) - 1| and
+    tof = pi (s1^1.5 + s2^1.5) / sqrt(8 mu).
+    Returns:
+        (dv1, dv2, dv3, tof) arrays of the broadcast shape (m/s, m/s, m/s, s)
+    """
+    s1 = np.add(r1, rb)
+    s2 = np.add(r2, rb)
+    dv1 = np.abs(np.sqrt(2.0 * np.divide(rb, s1)) - 1.0)
+    dv1 *= np.sqrt(np.divide(mu, r1))
+    dv2 = np.abs(np.sqrt(np.divide(r2, s2)) - np.sqrt(np.divide(r1, s1)))
+    dv2 *= np.sqrt(2.0 * np.divide(mu, rb))
+    dv3 = np.abs(np.sqrt(2.0 * np.divide(rb, s2)) - 1.0)
+    dv3 *= np.sqrt(np.divide(mu, r2))
+    tof = s1 * np.sqrt(s1)
+    tof += s2 * np.sqrt(s2)
+    tof *= np.pi / np.sqrt(8.0 * np.asarray(mu))
+    return dv1, dv2, dv3, tof
+
+__all__ = ["hohmann_dv", "vis_viva", "hohmann_dv_array", "vis_viva_array", "bielliptic_dv", "bielliptic_dv_array"]